@@ -0,0 +1,193 @@
+import json
+import os
+import re
+import logging
+from functools import lru_cache
+
+from document_index import casefold_tr
+
+logger = logging.getLogger(__name__)
+
+# Bundled gazetteer: all provinces with their plate codes (the first two digits of their postal
+# codes) and the districts of the largest provinces. A fuller file with the same keys (e.g. built
+# from the PTT postal code list) can be loaded instead with Gazetteer.load(path).
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'address_gazetteer.json')
+
+# Address words that follow the name they qualify ("KONUTKENT MAH.", "3028 CADDE", "İnönü Bulvarı"),
+# compared after folding to ASCII lowercase
+NEIGHBOURHOOD_WORDS = frozenset({'mah', 'mahalle', 'mahallesi', 'mh'})
+STREET_WORDS = frozenset({'cad', 'cadde', 'caddesi', 'cd', 'sok', 'sokak', 'sokagi', 'sk',
+                          'bulvar', 'bulvari', 'blv', 'bul', 'yolu'})
+
+# Door numbers after "No"; longer digit runs are invoice or phone numbers
+DOOR_NUMBER = re.compile(r'^\d{1,4}[a-z]?$')
+
+# Word tokens of a line
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Components an address line needs to open a candidate; following lines need only one to continue it
+MIN_ADDRESS_COMPONENTS = 2
+
+# Most lines one address candidate spans
+MAX_ADDRESS_LINES = 3
+
+# Weight of each component in an address's completeness score
+COMPONENT_SCORES = {
+    'postal_code': 2,
+    'neighbourhood': 2,
+    'street': 2,
+    'number': 2,
+    'province': 1,
+    'district': 1
+}
+
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+
+def fold(text):
+    """Turkish-aware lowercase folded to ASCII, so "İSTANBUL", "Istanbul" and "istanbul" all match"""
+    return casefold_tr(text).translate(_ASCII_FOLD)
+
+class AddressCandidate:
+    """An address found by the gazetteer scan: its text, first line index and recognized components"""
+
+    __slots__ = ('text', 'line', 'components', 'party')
+
+    def __init__(self, text, line, components, party=None):
+        self.text = text
+        self.line = line
+        self.components = components
+        self.party = party
+
+    @property
+    def score(self):
+        """Completeness score: weighted count of components, plus one for a reasonably long address"""
+        score = sum(COMPONENT_SCORES[name] for name in self.components)
+        return score + 1 if len(self.text) > 30 else score
+
+    def __repr__(self):
+        return f"AddressCandidate({self.text!r}, line={self.line}, party={self.party})"
+
+class Gazetteer:
+    """Provinces, districts, neighbourhoods and postal codes indexed by folded name tokens.
+
+    Names are looked up by their token tuple in one dict, so matching a line costs a few dict
+    lookups per token regardless of how many places the gazetteer holds. Multi-word names
+    ("Sultan Murat") are matched longest first.
+    """
+
+    def __init__(self, provinces, province_aliases=None, districts=None, neighbourhoods=None, postal_codes=None):
+        """provinces: {plate code: name}; districts: {province: [district]}; neighbourhoods:
+        {"province/district": [neighbourhood]}; postal_codes: {code: "province/district"}"""
+        self.provinces = dict(provinces)
+        self.postal_codes = dict(postal_codes or {})
+        self._names = {}
+        self.max_name_tokens = 1
+
+        for name in self.provinces.values():
+            self._add('province', name, name)
+        for alias, name in (province_aliases or {}).items():
+            self._add('province', alias, name)
+        for province, names in (districts or {}).items():
+            for name in names:
+                self._add('district', name, f"{province}/{name}")
+        for area, names in (neighbourhoods or {}).items():
+            for name in names:
+                self._add('neighbourhood', name, f"{area}/{name}")
+
+    def _add(self, kind, name, value):
+        """Index a name; the first entry for a token tuple wins, and provinces are added first"""
+        tokens = tuple(fold(token) for token in TOKEN_PATTERN.findall(name))
+        if tokens and tokens not in self._names:
+            self._names[tokens] = (kind, value)
+            self.max_name_tokens = max(self.max_name_tokens, len(tokens))
+
+    @classmethod
+    def load(cls, path=DEFAULT_GAZETTEER_PATH):
+        """Load a gazetteer JSON file with the keys of the bundled address_gazetteer.json"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        gazetteer = cls(data['provinces'], data.get('province_aliases'), data.get('districts'),
+                        data.get('neighbourhoods'), data.get('postal_codes'))
+        logger.info(f"Loaded address gazetteer from {path} ({len(gazetteer._names)} names)")
+        return gazetteer
+
+    def postal_area(self, code):
+        """Province (or "province/district" for listed codes) of a 5-digit postal code, or None"""
+        if code in self.postal_codes:
+            return self.postal_codes[code]
+        return self.provinces.get(code[:2])
+
+    def match_name(self, folded_tokens, start):
+        """Longest indexed name starting at folded_tokens[start] as (kind, value, token count), or None"""
+        for length in range(min(self.max_name_tokens, len(folded_tokens) - start), 0, -1):
+            entry = self._names.get(tuple(folded_tokens[start:start + length]))
+            if entry is not None:
+                return entry[0], entry[1], length
+        return None
+
+    def line_components(self, line, folded_line=None):
+        """Address components recognized on one line, e.g. {'postal_code': '06800', 'neighbourhood': 'KONUTKENT'}
+
+        folded_line is the line already Turkish-casefolded (e.g. from a LineIndex), which saves folding it here.
+        """
+        tokens = TOKEN_PATTERN.findall(line)
+        folded = TOKEN_PATTERN.findall(folded_line) if folded_line is not None else []
+        if len(folded) == len(tokens):
+            folded = [token.translate(_ASCII_FOLD) for token in folded]
+        else:
+            folded = [fold(token) for token in tokens]
+        components = {}
+        index = 0
+        while index < len(tokens):
+            token = folded[index]
+            if token in NEIGHBOURHOOD_WORDS and index > 0:
+                components.setdefault('neighbourhood', tokens[index - 1])
+            elif token in STREET_WORDS and index > 0:
+                components.setdefault('street', tokens[index - 1])
+            elif token == 'no' and index + 1 < len(tokens) and DOOR_NUMBER.match(folded[index + 1]):
+                components.setdefault('number', tokens[index + 1])
+                index += 1
+            elif len(token) == 5 and token.isdigit() and self.postal_area(token) and \
+                    (index == 0 or self.match_name(folded, index + 1)):
+                # Postal codes open the line or precede the district/province; elsewhere 5 digits are amounts
+                components.setdefault('postal_code', token)
+            else:
+                match = self.match_name(folded, index)
+                if match is not None:
+                    kind, value, length = match
+                    components.setdefault(kind, value)
+                    index += length
+                    continue
+            index += 1
+        return components
+
+    def scan(self, lines, folded_lines=None):
+        """Find address candidates in one pass over lines (folded_lines: their casefolded copies, if at hand)
+
+        A line with at least MIN_ADDRESS_COMPONENTS components opens a candidate; directly following
+        lines with at least one component (e.g. "ÇANKAYA / ANKARA") are joined to it, up to
+        MAX_ADDRESS_LINES lines.
+        """
+        candidates = []
+        current = None
+        for index, line in enumerate(lines):
+            line = line.strip()
+            folded_line = folded_lines[index].strip() if folded_lines is not None else None
+            components = self.line_components(line, folded_line) if line else {}
+            # A lone door number is not enough to continue ("Fatura No: 12" right below an address)
+            continues = bool(components) and set(components) != {'number'}
+            if current is not None and continues and index - current.line < MAX_ADDRESS_LINES:
+                current.text = f"{current.text} {line}"
+                for name, value in components.items():
+                    current.components.setdefault(name, value)
+                continue
+            current = None
+            if len(components) >= MIN_ADDRESS_COMPONENTS:
+                current = AddressCandidate(line, index, components)
+                candidates.append(current)
+        return candidates
+
+@lru_cache(maxsize=1)
+def default_gazetteer():
+    """The bundled gazetteer, loaded once per process"""
+    return Gazetteer.load()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+E-Fatura PDF Analiz Sistemi - Toplu İşleme (komut satırı)
+
+Bir klasördeki veya glob desenine uyan tüm PDF faturaları işleyip XML dosyalarını
+ve her dosya için bir satırlık JSONL özetini yazar:
+
+    python batch_cli.py faturalar/ -o cikti/
+    python batch_cli.py "arsiv/2024-*/**/*.pdf" -o cikti/ --workers 8
+"""
+
+import argparse
+import functools
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from pdf_extractor import PDFExtractor
+from extraction_cache import ExtractionCache
+from xml_converter import XMLConverter
+from ocr_engine import OCREngine, DEFAULT_OCR_DPI, DEFAULT_OCR_LANG, OCR_CACHE_FILENAME
+from vendor_templates import VendorTemplateRegistry, TEMPLATE_CACHE_FILENAME
+
+logger = logging.getLogger(__name__)
+
+# Per-process cache handle, OCR engine and vendor template registry, set up by the pool initializer
+_worker_cache = None
+_worker_ocr = None
+_worker_templates = None
+
+# Files handed to the pool at a time per worker; bounds how many files a worker that dies takes down with the pool
+IN_FLIGHT_PER_WORKER = 2
+
+def collect_pdf_paths(inputs):
+    """Expand directories (recursively) and glob patterns into a sorted, de-duplicated list of PDF paths"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, '**', '*'), recursive=True)
+        else:
+            matches = glob.glob(item, recursive=True)
+        for path in matches:
+            if os.path.isfile(path) and path.lower().endswith('.pdf'):
+                paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+def xml_output_path(pdf_path, input_root, output_dir):
+    """Mirror the PDF's location below input_root inside output_dir, so equal file names in different folders do not collide"""
+    relative = os.path.relpath(pdf_path, input_root)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + '.xml')
+
+def _init_worker(log_level, cache_dir, ocr_settings):
+    """Process pool initializer: set the log level and open this worker's caches, OCR engine and vendor templates"""
+    global _worker_cache, _worker_ocr, _worker_templates
+    logging.getLogger().setLevel(log_level)
+    if cache_dir:
+        _worker_cache = ExtractionCache(cache_dir)
+        _worker_templates = VendorTemplateRegistry(ExtractionCache(cache_dir, filename=TEMPLATE_CACHE_FILENAME))
+    if ocr_settings:
+        # Files are already spread across processes, so each worker OCRs its pages serially
+        ocr_cache = ExtractionCache(cache_dir, filename=OCR_CACHE_FILENAME) if cache_dir else None
+        _worker_ocr = OCREngine(max_workers=1, cache=ocr_cache, **ocr_settings)
+
+def process_file(pdf_path, xml_path, summary=False, low_memory='auto'):
+    """Extract one PDF, write its XML and return a summary record; failures are reported, not raised"""
+    started = time.perf_counter()
+    record = {'file': pdf_path, 'xml': None, 'status': 'ok'}
+    try:
+        extractor = PDFExtractor(pdf_path, cache=_worker_cache, summary=summary, low_memory=low_memory,
+                                 ocr=_worker_ocr, templates=_worker_templates)
+        invoice_data = extractor.extract_invoice_data(store=False)
+        xml_content = XMLConverter(invoice_data).convert_to_ubl_tr()
+
+        os.makedirs(os.path.dirname(xml_path), exist_ok=True)
+        with open(xml_path, 'w', encoding='utf-8') as f:
+            f.write(xml_content)
+
+        record.update({
+            'xml': xml_path,
+            'invoice_number': invoice_data.get('invoice_number', ''),
+            'invoice_date': invoice_data.get('invoice_date', ''),
+            'vendor_name': invoice_data.get('vendor_name', ''),
+            'vendor_tax_id': invoice_data.get('vendor_tax_id', ''),
+            'customer_name': invoice_data.get('customer_name', ''),
+            'customer_tax_id': invoice_data.get('customer_tax_id', ''),
+            'total_amount': invoice_data.get('total_amount', ''),
+            'currency': invoice_data.get('currency', ''),
+            'line_items': len(invoice_data.get('line_items', []))
+        })
+        if invoice_data.get('timed_out_stages'):
+            record['timed_out_stages'] = invoice_data['timed_out_stages']
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = str(e)
+    else:
+        # The XML is written; a cache or vendor template write that fails does not make the file an error
+        try:
+            extractor.store_results()
+        except Exception as e:
+            logger.warning(f"Could not store cache/template entries for {pdf_path}: {e}")
+    record['seconds'] = round(time.perf_counter() - started, 3)
+    return record
+
+def _error_record(pdf_path, error):
+    return {'file': pdf_path, 'xml': None, 'status': 'error', 'error': error}
+
+def _submit(executor, pdf_path, job):
+    """Submit one file to the pool; job is (input_root, output_dir, summary, low_memory)"""
+    input_root, output_dir, summary, low_memory = job
+    return executor.submit(process_file, pdf_path, xml_output_path(pdf_path, input_root, output_dir), summary, low_memory)
+
+def _pool_record(future, pdf_path):
+    """Summary record of a finished future, or None when its worker pool broke before the file was done"""
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        return None
+    except Exception as e:
+        return _error_record(pdf_path, str(e))
+
+def _process_in_pool(pdf_paths, workers, make_pool, job):
+    """Yield one summary record per file from a worker pool, rebuilding the pool when a worker process dies
+
+    A worker that dies (e.g. killed for memory) breaks the whole pool, and every file still in flight
+    fails with it. Those files are run again one at a time in a single-worker pool, so only the file
+    that crashed gets an error record, and the files not yet submitted go on in a new pool.
+    """
+    pending = deque(pdf_paths)
+    while pending:
+        unfinished = []
+        futures = {}
+        with make_pool(max_workers=workers) as executor:
+            while (pending or futures) and not unfinished:
+                while pending and len(futures) < workers * IN_FLIGHT_PER_WORKER:
+                    pdf_path = pending.popleft()
+                    futures[_submit(executor, pdf_path, job)] = pdf_path
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pdf_path = futures.pop(future)
+                    record = _pool_record(future, pdf_path)
+                    if record is None:
+                        unfinished.append(pdf_path)
+                    else:
+                        yield record
+
+        # The pool is shut down, so the futures left after a break have all finished (most of them failed with it)
+        for future, pdf_path in futures.items():
+            record = _pool_record(future, pdf_path)
+            if record is None:
+                unfinished.append(pdf_path)
+            else:
+                yield record
+        if unfinished:
+            logger.warning(f"A worker process died, running {len(unfinished)} unfinished file(s) one at a time")
+            yield from _process_isolated(unfinished, make_pool, job)
+
+def _process_isolated(pdf_paths, make_pool, job):
+    """Yield one summary record per file, each file run alone in a single-worker pool that is rebuilt after a crash"""
+    executor = make_pool(max_workers=1)
+    try:
+        for pdf_path in pdf_paths:
+            record = _pool_record(_submit(executor, pdf_path, job), pdf_path)
+            if record is None:
+                record = _error_record(pdf_path, 'İşçi süreç bu dosyada çöktü')
+                executor.shutdown()
+                executor = make_pool(max_workers=1)
+            yield record
+    finally:
+        executor.shutdown()
+
+def run_batch(pdf_paths, output_dir, summary_path, workers=None, cache_dir=None, summary=False,
+              low_memory='auto', ocr_settings=None, log_level=logging.WARNING, progress_every=100):
+    """Process pdf_paths in a worker pool, streaming one JSONL record per file as results arrive
+
+    ocr_settings, when given, are OCREngine keyword arguments (dpi, lang) for scanned pages.
+    low_memory is PDFExtractor's option; the default 'auto' uses low-memory mode only for long documents.
+    A file whose worker process dies gets an error record and the pool is rebuilt for the others.
+
+    Returns a dict with the processed/failed counts, elapsed time and throughput in documents per second.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    input_root = os.path.commonpath([os.path.dirname(p) for p in pdf_paths]) if pdf_paths else output_dir
+    workers = workers or os.cpu_count() or 1
+    make_pool = functools.partial(ProcessPoolExecutor, initializer=_init_worker,
+                                  initargs=(log_level, cache_dir, ocr_settings))
+    job = (input_root, output_dir, summary, low_memory)
+
+    started = time.perf_counter()
+    done = failed = 0
+    with open(summary_path, 'w', encoding='utf-8') as summary_file:
+        for record in _process_in_pool(pdf_paths, workers, make_pool, job):
+            done += 1
+            if record['status'] != 'ok':
+                failed += 1
+                logger.error(f"Failed to process {record['file']}: {record['error']}")
+            summary_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+            if done % progress_every == 0 or done == len(pdf_paths):
+                elapsed = time.perf_counter() - started
+                print(f"  {done}/{len(pdf_paths)} dosya, {failed} hata, "
+                      f"{done / elapsed if elapsed else 0.0:.1f} belge/sn", flush=True)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'processed': done,
+        'failed': failed,
+        'seconds': round(elapsed, 2),
+        'docs_per_second': round(done / elapsed, 2) if elapsed else 0.0
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='PDF e-faturaları toplu olarak XML\'e dönüştürür')
+    parser.add_argument('inputs', nargs='+', help='PDF klasörleri veya glob desenleri (ör. "arsiv/**/*.pdf")')
+    parser.add_argument('-o', '--output-dir', default='xml_output', help='XML dosyalarının yazılacağı klasör')
+    parser.add_argument('--summary-file', help='JSONL özet dosyası (varsayılan: <output-dir>/summary.jsonl)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='İşçi süreç sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--cache-dir', help='Çıkarım, OCR ve satıcı şablonu önbelleği klasörü (verilmezse önbellek kullanılmaz)')
+    parser.add_argument('--summary-mode', action='store_true',
+                        help='Yalnızca başlık ve toplam bilgilerini çıkar, kalem satırlarını atla')
+    parser.add_argument('--low-memory', action=argparse.BooleanOptionalAction, default=None,
+                        help='Düşük bellek modu: yalnızca ilk ve son sayfalar bellekte tutulur, kalem satırları için '
+                             'sayfalar yeniden okunur (varsayılan: yalnızca '
+                             f'{PDFExtractor.LOW_MEMORY_AUTO_MIN_PAGES} sayfadan uzun PDF\'lerde)')
+    parser.add_argument('--ocr', action='store_true', help='Metin katmanı olmayan sayfaları OCR ile oku')
+    parser.add_argument('--ocr-dpi', type=int, default=DEFAULT_OCR_DPI, help='OCR için sayfa çözünürlüğü (DPI)')
+    parser.add_argument('--ocr-lang', default=DEFAULT_OCR_LANG, help='Tesseract dil kodu (ör. tur, tur+eng)')
+    parser.add_argument('--log-level', default='WARNING', help='İşçi süreçlerin log seviyesi')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    log_level = getattr(logging, args.log_level.upper(), logging.WARNING)
+    logging.getLogger().setLevel(log_level)
+
+    pdf_paths = collect_pdf_paths(args.inputs)
+    if not pdf_paths:
+        print("❌ İşlenecek PDF dosyası bulunamadı")
+        return 1
+
+    ocr_settings = None
+    if args.ocr:
+        if not OCREngine.available():
+            print("⚠️  OCR için pdf2image/pytesseract veya tesseract bulunamadı, taranmış sayfalar atlanacak")
+        ocr_settings = {'dpi': args.ocr_dpi, 'lang': args.ocr_lang}
+
+    summary_path = args.summary_file or os.path.join(args.output_dir, 'summary.jsonl')
+    print(f"🚀 {len(pdf_paths)} PDF işleniyor...")
+    result = run_batch(pdf_paths, args.output_dir, summary_path,
+                       workers=args.workers,
+                       cache_dir=args.cache_dir,
+                       summary=args.summary_mode,
+                       low_memory='auto' if args.low_memory is None else args.low_memory,
+                       ocr_settings=ocr_settings,
+                       log_level=log_level)
+
+    print(f"✅ {result['processed'] - result['failed']} dosya dönüştürüldü, {result['failed']} hata, "
+          f"{result['seconds']} sn ({result['docs_per_second']} belge/sn)")
+    print(f"📄 Özet: {summary_path}")
+    return 1 if result['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
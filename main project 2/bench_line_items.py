@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+E-Fatura PDF Analiz Sistemi - Kalem satırı kıyaslaması
+
+Bellekte binlerce kalem satırlı yapay faturalar üretir (sayfa metni, tablolar ve kelime kutuları,
+PDF ayrıştırmadan) ve kalem satırı çıkarımını satır başına süresiyle ölçer. Süre satır sayısıyla
+doğrusal artmalıdır:
+
+    python bench_line_items.py
+    python bench_line_items.py --rows 1000 10000 50000 --strategy words
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from pdf_extractor import PDFExtractor
+from document_index import LineIndex
+from extraction_budget import DEFAULT_STAGE_BUDGETS
+
+# Row counts measured when none are given
+DEFAULT_ROW_COUNTS = (1000, 10000, 50000)
+
+# Item rows on each synthetic page
+ROWS_PER_PAGE = 40
+
+# Item table columns as (left x, header label) on an A4 page in points
+ITEM_COLUMNS = [(40, 'Mal Hizmet'), (250, 'Miktar'), (300, 'Birim'), (350, 'Birim Fiyat'), (430, 'KDV %'), (500, 'Tutar')]
+
+# Vertical position of the item header and the distance between rows, in points
+TABLE_TOP = 150
+ROW_HEIGHT = 14
+
+# Header block of the first page: seller, invoice number and date, buyer
+HEADER_LINES = [
+    'SATICI:', 'ÖRNEK BİLİŞİM LTD. ŞTİ.', 'VKN: 1234567890',
+    'Fatura No: ABC2024000123', 'Fatura Tarihi: 15.03.2024',
+    'ALICI:', 'DENEME TİCARET A.Ş.', 'VKN: 3850001234'
+]
+
+def _row_cells(index):
+    return [f"Hizmet kalemi {index + 1}", '2', 'ADET', '1.250,50', '%20', '2.501,00']
+
+def _line_words(cells, top):
+    """Word boxes of one table line, every cell starting at its column's left edge"""
+    words = []
+    for (x0, _), cell in zip(ITEM_COLUMNS, cells):
+        for word in cell.split():
+            x1 = x0 + 5.5 * len(word)
+            words.append({'text': word, 'x0': x0, 'x1': x1, 'top': top, 'bottom': top + 9})
+            x0 = x1 + 3
+    return words
+
+def _totals_lines(row_count):
+    subtotal = 2501.0 * row_count
+    return [f"Mal Hizmet Toplam Tutarı: {subtotal:.2f}", f"Hesaplanan KDV: {subtotal * 0.2:.2f}",
+            f"Vergiler Dahil Toplam Tutar: {subtotal * 1.2:.2f}"]
+
+def make_pages(row_count, strategy='table'):
+    """Page results for a synthetic invoice with row_count items, ROWS_PER_PAGE per page
+
+    With strategy='table' every page carries its item rows as a detected table (the first page with
+    the header row); with strategy='words' there are no tables and the rows are read from the word
+    boxes.
+    """
+    header = [label for _, label in ITEM_COLUMNS]
+    pages = []
+    for start in range(0, row_count, ROWS_PER_PAGE):
+        rows = [_row_cells(index) for index in range(start, min(start + ROWS_PER_PAGE, row_count))]
+        lines = (HEADER_LINES if not pages else []) + [' '.join(header)] + [' '.join(row) for row in rows]
+        words = _line_words(header, TABLE_TOP)
+        for offset, row in enumerate(rows, 1):
+            words += _line_words(row, TABLE_TOP + offset * ROW_HEIGHT)
+        if start + ROWS_PER_PAGE >= row_count:
+            lines += _totals_lines(row_count)
+        pages.append({
+            'page_number': len(pages) + 1,
+            'text': '\n'.join(lines),
+            'tables': [[header] + rows] if strategy == 'table' else [],
+            'words': words
+        })
+    return pages
+
+def make_extractor(row_count, strategy='table'):
+    """PDFExtractor over a synthetic invoice, with unlimited stage budgets so no row is cut off"""
+    extractor = PDFExtractor('synthetic.pdf', stage_budgets={stage: float('inf') for stage in DEFAULT_STAGE_BUDGETS})
+    for page_result in make_pages(row_count, strategy):
+        extractor._add_page_result(page_result)
+    extractor.lines = LineIndex.from_pages(extractor.pages)
+    extractor.text_content = extractor.lines.text
+    return extractor
+
+def run_benchmark(row_counts, strategy='table', repeat=1):
+    """Yield (rows, items found, best seconds) of the line item stream and totals for each row count"""
+    for row_count in row_counts:
+        best = None
+        for _ in range(repeat):
+            extractor = make_extractor(row_count, strategy)
+            started = time.perf_counter()
+            invoice_data = extractor._extract_invoice_data()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        yield row_count, len(invoice_data['line_items']), best
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Kalem satırı çıkarımının satır sayısıyla ölçeklenmesini ölçer')
+    parser.add_argument('--rows', type=int, nargs='+', default=list(DEFAULT_ROW_COUNTS), help='Ölçülecek satır sayıları')
+    parser.add_argument('--strategy', choices=('table', 'words'), default='table',
+                        help='Kalemler tablodan mı kelime kutularından mı okunsun')
+    parser.add_argument('--repeat', type=int, default=1, help='Her ölçüm kaç kez tekrarlanacak (en iyisi alınır)')
+    parser.add_argument('--log', action='store_true',
+                        help='INFO loglarını açık tut (çıktı atılır, yalnızca biçimlendirme maliyeti ölçülür)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.log:
+        logging.basicConfig(level=logging.INFO, stream=open(os.devnull, 'w'), force=True)
+    else:
+        logging.disable(logging.CRITICAL)
+
+    print(f"📊 Kalem satırı çıkarımı ({args.strategy})")
+    for row_count, item_count, seconds in run_benchmark(args.rows, args.strategy, max(1, args.repeat)):
+        print(f"  {row_count:>7} satır: {item_count:>7} kalem, {seconds:.2f} sn "
+              f"({seconds / row_count * 1e6:.1f} µs/satır)", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+E-Fatura PDF Analiz Sistemi - OCR kıyaslaması (toplu / sayfa sayfa tesseract)
+
+Bir PDF'in sayfalarını bir kez görüntüye çevirir, ardından aynı görüntüleri hem sayfa başına
+bir tesseract süreciyle hem de toplu (liste dosyası, tek süreç) okuyup saniyedeki sayfa sayısını
+karşılaştırır. tesseract ve poppler (pdftoppm) kurulu olmalıdır:
+
+    python bench_ocr.py tarama.pdf
+    python bench_ocr.py tarama.pdf --pages 32 --batch-size 16 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+
+import pdfplumber
+
+from ocr_engine import (OCREngine, _ocr_work_dir, _render_pages, _run_tesseract_batch,
+                        DEFAULT_OCR_DPI, DEFAULT_OCR_LANG, DEFAULT_OCR_BATCH_SIZE)
+
+def _pages_per_second(image_paths, work_dir, batch_size, lang, dpi, config, repeat):
+    """Best pages/s over repeat runs of OCRing image_paths in batches of batch_size images per tesseract call"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for start in range(0, len(image_paths), batch_size):
+            _run_tesseract_batch(image_paths[start:start + batch_size], work_dir, lang, dpi, config)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(image_paths) / best if best else 0.0
+
+def run_benchmark(pdf_path, page_count, batch_size, dpi, lang, config='', repeat=1):
+    """Render the first page_count pages once and return {'per_page': pages/s, 'batch': pages/s, 'pages': n}"""
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = min(page_count, len(pdf.pages))
+    with _ocr_work_dir() as work_dir:
+        image_paths = _render_pages(pdf_path, range(1, page_count + 1), dpi, work_dir)
+        ordered = [image_paths[page_number] for page_number in sorted(image_paths)]
+        return {
+            'pages': len(ordered),
+            'per_page': _pages_per_second(ordered, work_dir, 1, lang, dpi, config, repeat),
+            'batch': _pages_per_second(ordered, work_dir, batch_size, lang, dpi, config, repeat)
+        }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Toplu ve sayfa sayfa tesseract çağrılarını karşılaştırır')
+    parser.add_argument('pdf', help='Okunacak PDF (taranmış fatura)')
+    parser.add_argument('--pages', type=int, default=DEFAULT_OCR_BATCH_SIZE, help='Okunacak en fazla sayfa sayısı')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_OCR_BATCH_SIZE, help='Bir tesseract sürecine verilen sayfa sayısı')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_OCR_DPI, help='Görüntü çözünürlüğü (DPI)')
+    parser.add_argument('--lang', default=DEFAULT_OCR_LANG, help='Tesseract dil kodu')
+    parser.add_argument('--repeat', type=int, default=1, help='Her ölçüm kaç kez tekrarlanacak (en iyisi alınır)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not OCREngine.available():
+        print("❌ pdf2image/pytesseract veya tesseract bulunamadı, kıyaslama yapılamıyor")
+        return 1
+
+    result = run_benchmark(args.pdf, args.pages, max(1, args.batch_size), args.dpi, args.lang, repeat=max(1, args.repeat))
+    print(f"📄 {result['pages']} sayfa, {args.dpi} DPI, dil: {args.lang}")
+    print(f"  sayfa sayfa : {result['per_page']:.2f} sayfa/sn")
+    print(f"  toplu ({args.batch_size}) : {result['batch']:.2f} sayfa/sn")
+    if result['per_page']:
+        print(f"  oran        : {result['batch'] / result['per_page']:.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
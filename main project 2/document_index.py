@@ -0,0 +1,66 @@
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+def casefold_tr(text):
+    """Lowercase with Turkish dotted/dotless I handled ("İ" -> "i", "I" -> "ı"), keeping the length"""
+    return text.replace('I', 'ı').replace('İ', 'i').lower()
+
+class LineIndex:
+    """Lines of a document's text, built once and shared by every extraction stage.
+
+    Holds the lines, the offset where each line starts in the text, a Turkish-casefolded copy of
+    every line and the page number each line came from, so stages look lines up by index or
+    offset instead of splitting and lowercasing the text again.
+    """
+
+    def __init__(self, text, line_pages=None):
+        """Index text; line_pages optionally gives the page number of each line"""
+        self.text = text
+        self.lines = text.split('\n')
+        self.starts = []
+        offset = 0
+        for line in self.lines:
+            self.starts.append(offset)
+            offset += len(line) + 1
+        self.folded = [casefold_tr(line) for line in self.lines]
+        self.pages = line_pages if line_pages is not None else [None] * len(self.lines)
+
+    @classmethod
+    def from_pages(cls, page_results):
+        """Join the page texts (each followed by a newline, empty pages skipped) and index the result"""
+        texts = []
+        line_pages = []
+        for page_result in page_results:
+            if page_result['text']:
+                texts.append(page_result['text'] + '\n')
+                line_pages.extend([page_result['page_number']] * (page_result['text'].count('\n') + 1))
+        # The final newline opens one more, empty line
+        line_pages.append(line_pages[-1] if line_pages else None)
+        return cls(''.join(texts), line_pages)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def line_at(self, offset):
+        """Index of the line that holds the text offset"""
+        return max(bisect.bisect_right(self.starts, offset) - 1, 0)
+
+    def line_range(self, span):
+        """(first, end) line indexes covering a (start, end) offset span; the whole document for None"""
+        if span is None:
+            return 0, len(self.lines)
+        return self.line_at(span[0]), self.line_at(max(span[1] - 1, span[0])) + 1
+
+    def slice_lines(self, start, end):
+        """Lines of text[start:end], exactly as text[start:end].split('\\n') would return them"""
+        first, last = self.line_at(start), self.line_at(end)
+        if first == last:
+            return [self.lines[first][start - self.starts[first]:end - self.starts[first]]]
+        return ([self.lines[first][start - self.starts[first]:]] + self.lines[first + 1:last]
+                + [self.lines[last][:end - self.starts[last]]])
+
+    def page_lines(self, page_number):
+        """Lines that came from one page"""
+        return [line for line, page in zip(self.lines, self.pages) if page == page_number]
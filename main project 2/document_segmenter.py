@@ -0,0 +1,120 @@
+import re
+import logging
+
+from document_index import LineIndex
+
+logger = logging.getLogger(__name__)
+
+# Lines that open a party block
+SELLER_ANCHOR = re.compile(r'^\s*(?:SATICI|SELLER|FATURALAYAN)\b', re.IGNORECASE)
+BUYER_ANCHOR = re.compile(r'^\s*(?:ALICI|BUYER|MÜŞTERİ|MÜŞTERI|SAYIN)\b', re.IGNORECASE)
+
+# Item table header line (column titles such as "Açıklama  Miktar  Birim Fiyat")
+ITEM_HEADER_ANCHOR = re.compile(r'açıklama|miktar|birim\s+fiyat|description|quantity|unit\s+price', re.IGNORECASE)
+
+# Lines that belong to the totals block at the end of the document
+TOTALS_ANCHOR = re.compile(
+    r'toplam|hesaplanan\s+kdv|kdv\s+tutar|vergi\s+tutar|ödenecek|subtotal|total|tax\s+amount|net\s+tutar|tevkifat',
+    re.IGNORECASE
+)
+
+# How many non-totals lines may separate two totals lines while scanning back from the end
+TOTALS_MAX_GAP = 3
+
+class DocumentSections:
+    """Character offsets of the seller, buyer, item table and totals regions of a document.
+
+    Every region is a (start, end) tuple into the document text, or None when its anchor
+    was not found. header covers everything before the item table (or before the totals).
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.header = (0, len(text))
+        self.seller = None
+        self.buyer = None
+        self.items = None
+        self.totals = None
+
+    def get(self, name):
+        """Return the text of a region, or the whole document when the region was not found"""
+        span = getattr(self, name)
+        if span is None:
+            return self.text
+        return self.text[span[0]:span[1]]
+
+    def found(self, name):
+        """True when the region was located by its anchor"""
+        return getattr(self, name) is not None
+
+    def as_dict(self):
+        return {
+            'header': self.header,
+            'seller': self.seller,
+            'buyer': self.buyer,
+            'items': self.items,
+            'totals': self.totals
+        }
+
+def segment_document(text, index=None):
+    """Locate the seller, buyer, item table and totals regions of an invoice in one pass over its lines
+
+    index is the document's LineIndex when the caller already has one.
+    """
+    sections = DocumentSections(text)
+    if not text:
+        return sections
+    if index is None:
+        index = LineIndex(text)
+    lines = index.lines
+    line_starts = index.starts
+
+    # Single forward pass over lines: remember the first line of each anchor
+    seller_line = buyer_line = items_line = None
+    for line_number, line in enumerate(lines):
+        if seller_line is None and SELLER_ANCHOR.match(line):
+            seller_line = line_number
+        elif buyer_line is None and BUYER_ANCHOR.match(line):
+            buyer_line = line_number
+        elif items_line is None and ITEM_HEADER_ANCHOR.search(line):
+            items_line = line_number
+
+    # Totals: scan back from the last line and stop after a gap of unrelated lines
+    stop_line = items_line + 1 if items_line is not None else 0
+    totals_line = None
+    gap = 0
+    for line_number in range(len(lines) - 1, stop_line - 1, -1):
+        if TOTALS_ANCHOR.search(lines[line_number]):
+            totals_line = line_number
+            gap = 0
+        elif totals_line is not None:
+            gap += 1
+            if gap > TOTALS_MAX_GAP:
+                break
+
+    text_end = len(text)
+    if totals_line is not None:
+        sections.totals = (line_starts[totals_line], text_end)
+    if items_line is not None:
+        items_end = sections.totals[0] if sections.totals else text_end
+        sections.items = (line_starts[items_line], items_end)
+
+    header_end = text_end
+    if sections.items:
+        header_end = sections.items[0]
+    elif sections.totals:
+        header_end = sections.totals[0]
+    sections.header = (0, header_end)
+
+    # Party blocks run until the other party's anchor or the end of the header
+    seller_start = line_starts[seller_line] if seller_line is not None and line_starts[seller_line] < header_end else None
+    buyer_start = line_starts[buyer_line] if buyer_line is not None and line_starts[buyer_line] < header_end else None
+    if seller_start is not None:
+        seller_end = buyer_start if buyer_start is not None and buyer_start > seller_start else header_end
+        sections.seller = (seller_start, seller_end)
+    if buyer_start is not None:
+        buyer_end = seller_start if seller_start is not None and seller_start > buyer_start else header_end
+        sections.buyer = (buyer_start, buyer_end)
+
+    logger.info(f"Document sections: {sections.as_dict()}")
+    return sections
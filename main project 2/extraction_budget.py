@@ -0,0 +1,47 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock budget in seconds for each extraction stage of a single document
+DEFAULT_STAGE_BUDGETS = {
+    'header': 2.0,
+    'vendor': 2.0,
+    'customer': 2.0,
+    'addresses': 3.0,
+    'line_items': 5.0,
+    'totals': 2.0
+}
+
+class ExtractionBudget:
+    """Per-document wall-clock budget for the regex-heavy extraction stages.
+
+    Python's re engine cannot be interrupted once a match has started, so stages check
+    expired() between pattern attempts (and feed risky patterns bounded input). A stage
+    that overruns switches to its linear-time fallback and is recorded in exceeded_stages.
+    """
+
+    def __init__(self, stage_budgets=None, default_budget=2.0):
+        self.stage_budgets = dict(DEFAULT_STAGE_BUDGETS)
+        if stage_budgets:
+            self.stage_budgets.update(stage_budgets)
+        self.default_budget = default_budget
+        self.exceeded_stages = []
+        self.stage = None
+        self._deadline = None
+
+    def start(self, stage):
+        """Start the clock for a stage"""
+        self.stage = stage
+        self._deadline = time.monotonic() + self.stage_budgets.get(stage, self.default_budget)
+
+    def expired(self):
+        """Return True (and flag the stage) once the current stage has used up its budget"""
+        if self._deadline is None or time.monotonic() <= self._deadline:
+            return False
+        if self.stage not in self.exceeded_stages:
+            self.exceeded_stages.append(self.stage)
+            logger.warning(f"Extraction stage '{self.stage}' exceeded its "
+                           f"{self.stage_budgets.get(self.stage, self.default_budget)}s budget, "
+                           f"switching to linear-time fallback")
+        return True
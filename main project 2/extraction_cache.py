@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'e-fatura')
+DEFAULT_MAX_SIZE_BYTES = 256 * 1024 * 1024  # 256 MB
+
+# Seconds a connection waits for another process's write lock before SQLite raises 'database is locked'
+# (batch and OCR workers open the same database file)
+SQLITE_BUSY_TIMEOUT = 30
+
+class ExtractionCache:
+    """Content-addressed SQLite cache for extracted invoice data with LRU eviction."""
+
+    def __init__(self, cache_dir=None, max_size_bytes=DEFAULT_MAX_SIZE_BYTES, filename='extraction_cache.sqlite3'):
+        """Open (or create) the cache database in cache_dir, bounded to max_size_bytes"""
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_size_bytes = max_size_bytes
+        self.filename = filename
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.db_path = os.path.join(self.cache_dir, filename)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' data TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)')
+        self._conn.commit()
+
+    def __getstate__(self):
+        """Pickle only the settings, so a cache handed to a worker process reopens the same database there"""
+        return {'cache_dir': self.cache_dir, 'max_size_bytes': self.max_size_bytes, 'filename': self.filename}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @staticmethod
+    def make_key(pdf_path, version, chunk_size=1024 * 1024):
+        """Build a cache key from the SHA-256 of the PDF bytes and the extractor version tag"""
+        digest = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return f"{digest.hexdigest()}:{version}"
+
+    def get(self, key):
+        """Return the cached invoice data for key, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                logger.info(f"Extraction cache miss: {key[:16]}...")
+                return None
+            self._conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        logger.info(f"Extraction cache hit: {key[:16]}...")
+        return json.loads(row[0])
+
+    def put(self, key, invoice_data):
+        """Store invoice data under key and evict least recently used entries over the size limit"""
+        data = json.dumps(invoice_data, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        if size > self.max_size_bytes:
+            logger.warning(f"Extraction result ({size} bytes) exceeds cache size limit, not caching")
+            return
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, data, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, data, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the total size fits the limit"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall():
+            if total <= self.max_size_bytes:
+                break
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"Extraction cache evicted {evicted} entr{'y' if evicted == 1 else 'ies'}")
+
+    def stats(self):
+        """Return hit/miss counters and current cache occupancy"""
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': size,
+            'max_size_bytes': self.max_size_bytes
+        }
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database connection"""
+        self._conn.close()
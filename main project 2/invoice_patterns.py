@@ -0,0 +1,222 @@
+import re
+
+class PatternMatch:
+    """Result of a PatternBank search: the winning pattern's priority and its first capture group"""
+
+    __slots__ = ('priority', 'value', 'start', 'end')
+
+    def __init__(self, priority, value, start, end):
+        self.priority = priority
+        self.value = value
+        self.start = start
+        self.end = end
+
+    def group(self, index=1):
+        """Mimic re.Match.group(1) so callers can treat the result like a regex match"""
+        if index != 1:
+            raise IndexError("PatternMatch only exposes the first capture group")
+        return self.value
+
+class PatternBank:
+    """Priority-ordered list of regexes compiled once into combined alternations.
+
+    search() returns exactly what trying each pattern with re.search in list order would
+    return, but the common case costs a single scan of the text instead of one per pattern.
+    """
+
+    def __init__(self, name, patterns, flags=0):
+        self.name = name
+        self.patterns = [re.compile(pattern, flags) for pattern in patterns]
+
+        # Wrap every pattern in a named group so the winning alternative is known from lastgroup,
+        # and remember where each pattern's own first capture group lands in the combined regex
+        alternatives = []
+        self._value_groups = []
+        group_index = 0
+        for priority, compiled in enumerate(self.patterns):
+            alternatives.append(f'(?P<_p{priority}>{compiled.pattern})')
+            self._value_groups.append(group_index + 2)
+            group_index += compiled.groups + 1
+
+        # _matchers[k] matches any of the first k + 1 patterns; once a pattern at priority k has
+        # matched, only higher priorities (a shorter prefix of the list) can still win
+        self._matchers = [re.compile('|'.join(alternatives[:k + 1]), flags) for k in range(len(alternatives))]
+
+    def search(self, text):
+        """Return a PatternMatch for the highest-priority pattern that matches text, or None"""
+        best = None
+        matcher = self._matchers[-1]
+        pos = 0
+        while True:
+            match = matcher.search(text, pos)
+            if not match:
+                return best
+            priority = int(match.lastgroup[2:])
+            best = PatternMatch(priority, match.group(self._value_groups[priority]), match.start(), match.end())
+            if priority == 0:
+                return best
+            # A higher-priority pattern can only match further right; re.search semantics for a single
+            # pattern return its leftmost match, so scanning on from the next position is exact
+            matcher = self._matchers[priority - 1]
+            pos = match.start() + 1
+
+    def __len__(self):
+        return len(self.patterns)
+
+class GuardedPattern:
+    """Backtracking-prone regex behind linear-time prefilters.
+
+    guards are simple regexes that must occur in order for the pattern to be able to match at
+    all. Lazy DOTALL bodies such as (.*?LTD.*?ŞTİ.*?) go polynomial only when they fail, and
+    these failures are exactly the cases the guards reject with a few linear scans.
+    """
+
+    def __init__(self, pattern, flags=0, guards=()):
+        self.regex = re.compile(pattern, flags)
+        self.pattern = self.regex.pattern
+        self.guards = [re.compile(guard, flags & ~re.DOTALL) for guard in guards]
+
+    def search(self, text):
+        pos = 0
+        for guard in self.guards:
+            match = guard.search(text, pos)
+            if not match:
+                return None
+            pos = match.end()
+        return self.regex.search(text)
+
+# Header fields
+INVOICE_NUMBER_PATTERNS = PatternBank('invoice_number', [
+    r'Fatura No\s*:?\s*([A-Za-z0-9\-._/]+)',
+    r'FATURA NO\s*:?\s*([A-Za-z0-9\-._/]+)',
+    r'Invoice No\s*:?\s*([A-Za-z0-9\-._/]+)',
+    r'No\s*:?\s*([A-Za-z0-9\-._/]+)',
+    r'Belge No\s*:?\s*([A-Za-z0-9\-._/]+)',
+    r'Fatura Numarası\s*:?\s*([A-Za-z0-9\-._/]+)',
+    r'FATURA NUMARASI\s*:?\s*([A-Za-z0-9\-._/]+)',
+    r'INVOICE NUMBER\s*:?\s*([A-Za-z0-9\-._/]+)',
+    r'Seri Sıra No\s*:?\s*([A-Za-z0-9\-._/]+)'
+], re.IGNORECASE)
+
+DATE_PATTERNS = PatternBank('invoice_date', [
+    r'Fatura Tarihi\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
+    r'FATURA TARİHİ\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
+    r'Tarih\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
+    r'Date\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
+    r'Düzenleme Tarihi\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
+    r'DÜZENLEME TARİHİ\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
+    r'(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})'
+], re.IGNORECASE)
+
+# Party sections. These are tried one by one because the lazy DOTALL bodies cannot share
+# a single scan without going quadratic, and callers apply extra checks per candidate.
+# Each pattern lists the literals it needs (in order) so hopeless searches are skipped.
+VENDOR_SECTION_PATTERNS = [GuardedPattern(pattern, re.DOTALL | re.IGNORECASE, guards) for pattern, guards in [
+    # Standard patterns
+    (r'SATICI\s*:?\s*\n(.*?)(?=ALICI|MÜŞTERI|ETİ\s+MADEN|\Z)', ()),
+    (r'SELLER\s*:?\s*\n(.*?)(?=BUYER|CUSTOMER|\Z)', ()),
+    (r'FATURALAYAN\s*:?\s*\n(.*?)(?=ALICI|\Z)', ()),
+
+    # Company-specific patterns
+    (r'(DEVLET\s+MALZEME\s+OFİSİ.*?)(?=ETİ\s+MADEN|ALICI|\Z)', ()),
+    (r'(.*?LTD.*?ŞTİ.*?)(?=ALICI|ETİ|\Z)', (r'LTD', r'ŞTİ')),
+    (r'(.*?A\.?Ş\.?.*?)(?=ALICI|ETİ|\Z)', (r'A\.?Ş',)),
+
+    # Address-based patterns
+    (r'(.*?VKN\s*:?\s*\d{10}.*?)(?=ALICI|ETİ|\Z)', (r'VKN\s*:?\s*\d{10}',)),
+    (r'(.*?TAX\s*ID.*?)(?=BUYER|\Z)', (r'TAX\s*ID',)),
+
+    # Fallback patterns
+    (r'(.*?)(?=ALICI|BUYER)', (r'ALICI|BUYER',)),
+    (r'([A-ZÜĞŞIÖÇ\s]+(?:LTD|AŞ|ŞTİ).*?)(?=ALICI|\Z)', (r'LTD|AŞ|ŞTİ',))
+]]
+
+VENDOR_NAME_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in [
+    # Specific company patterns
+    r'(DEVLET\s+MALZEME\s+OFİSİ[^VKN\n]*)',
+    r'(.*?(?:LTD|AŞ|ŞTİ|A\.Ş|LTD\.ŞTİ)\.?)',
+    r'(.*?(?:LIMITED|ANONIM|ŞIRKETI))',
+
+    # General patterns
+    r'^([A-ZÜĞŞIÖÇK\s]{3,}?)(?=\s*VKN|\s*TAX|\s*Tel|\s*Fax|\s*E-mail|\s*\d{5}|\n|$)',
+    r'^([A-ZÜĞŞIÖÇK][A-ZÜĞŞIÖÇa-züğşıöç\s]{10,}?)(?=\s*\n|\s*VKN)',
+    r'^(.*?)(?=\n.*VKN|\n.*Tel|\n.*Fax)',
+
+    # Fallback
+    r'^([^\n]{10,})'
+]]
+
+CUSTOMER_SECTION_PATTERNS = [GuardedPattern(pattern, re.DOTALL | re.IGNORECASE, guards) for pattern, guards in [
+    # Standard patterns
+    (r'ALICI\s*:?\s*\n(.*?)(?=Malzeme|MALİN|ÜRÜN|HIZMET|e-FATURA|FATURA\s+NO|TOPLAM|$)', ()),
+    (r'BUYER\s*:?\s*\n(.*?)(?=ITEM|PRODUCT|SERVICE|INVOICE|TOTAL|$)', ()),
+    (r'MÜŞTERI\s*:?\s*\n(.*?)(?=ÜRÜN|HIZMET|TOPLAM|$)', ()),
+
+    # Company-specific patterns
+    (r'(ETİ\s+MADEN.*?)(?=e-FATURA|Sıra\s+No|MALZEME|$)', ()),
+    (r'(.*?GENEL\s+MÜDÜRLÜĞÜ.*?)(?=MALZEME|ÜRÜN|$)', (r'GENEL\s+MÜDÜRLÜĞÜ',)),
+    (r'(.*?(?:MÜDÜRLÜĞÜ|BAŞKANLIĞI|DAİRESİ).*?)(?=MALZEME|$)', (r'MÜDÜRLÜĞÜ|BAŞKANLIĞI|DAİRESİ',)),
+
+    # VKN-based patterns for customer
+    (r'(?:ALICI|BUYER).*?(.*?VKN\s*:?\s*\d{10}.*?)(?=MALZEME|ÜRÜN|$)', (r'ALICI|BUYER', r'VKN\s*:?\s*\d{10}')),
+
+    # Fallback patterns
+    (r'(?:ALICI|BUYER)(.*?)(?=\n\s*\d|\n\s*[A-Z]{3,})', (r'ALICI|BUYER', r'\n\s*(?:\d|[A-Z]{3})')),
+    (r'(.*?)(?=Malzeme|MALZEME|ÜRÜN|HIZMET)', (r'Malzeme|MALZEME|ÜRÜN|HIZMET',))
+]]
+
+CUSTOMER_NAME_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in [
+    # Specific company patterns
+    r'(ETİ\s+MADEN\s+İŞLETMELERİ\s+GENEL\s+MÜDÜRLÜĞÜ)',
+    r'(ETİ\s+MADEN.*?MÜDÜRLÜĞÜ)',
+    r'(.*?(?:GENEL\s+MÜDÜRLÜĞÜ|BAŞKANLIĞI|DAİRESİ))',
+    r'(.*?(?:LTD|AŞ|ŞTİ|A\.Ş|LTD\.ŞTİ)\.?)',
+    r'(.*?(?:LIMITED|ANONIM|ŞIRKETI))',
+
+    # General patterns
+    r'^([A-ZÜĞŞIÖÇK\s]{5,}?)(?=\s*VKN|\s*TAX|\s*Tel|\s*Fax|\s*E-mail|\s*\d{5}|\n|$)',
+    r'^([A-ZÜĞŞIÖÇK][A-ZÜĞŞIÖÇa-züğşıöç\s]{10,}?)(?=\s*\n|\s*VKN)',
+    r'^(.*?)(?=\n.*VKN|\n.*Tel|\n.*Fax)',
+
+    # Fallback
+    r'^([^\n]{10,})'
+]]
+
+# Text-based line items (matched per line)
+TEXT_ITEM_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Pattern: Description Quantity Unit Price %Tax Amount
+    r'^(.+?)\s+(\d+)\s+(ADET|KG|LT|M|SAAT)\s+(\d+[.,]\d+[.,]\d+|\d+[.,]\d+)\s+(\d+)\s+(\d+[.,]\d+[.,]\d+|\d+[.,]\d+)$',
+    # Pattern: Description followed by numbers
+    r'^([A-Za-zçğıöşüÇĞİÖŞÜ\s]+?(?:Hizmet|Donanım|Yazılım|Lisans).*?)\s+(\d+)\s+(ADET|KG|LT)\s+(\d+[.,]\d+)\s+(\d+)\s+(\d+[.,]\d+)$'
+]]
+
+# Financial totals
+SUBTOTAL_PATTERNS = PatternBank('subtotal', [
+    r'Mal\s+Hizmet\s+Toplam\s+Tutarı\s*:?\s*([0-9.,]+)',
+    r'MAL\s+HİZMET\s+TOPLAM\s+TUTARI\s*:?\s*([0-9.,]+)',
+    r'Ara\s+Toplam\s*:?\s*([0-9.,]+)',
+    r'ARA\s+TOPLAM\s*:?\s*([0-9.,]+)',
+    r'Subtotal\s*:?\s*([0-9.,]+)',
+    r'Net\s+Tutar\s*:?\s*([0-9.,]+)'
+], re.IGNORECASE)
+
+TAX_PATTERNS = PatternBank('tax_amount', [
+    r'Hesaplanan\s+KDV\s*:?\s*([0-9.,]+)',
+    r'HESAPLANAN\s+KDV\s*:?\s*([0-9.,]+)',
+    r'KDV\s+Tutarı\s*:?\s*([0-9.,]+)',
+    r'KDV\s+TUTARI\s*:?\s*([0-9.,]+)',
+    r'Vergi\s+Tutarı\s*:?\s*([0-9.,]+)',
+    r'Tax\s+Amount\s*:?\s*([0-9.,]+)'
+], re.IGNORECASE)
+
+TOTAL_PATTERNS = PatternBank('total_amount', [
+    r'Vergiler\s+Dahil\s+Toplam\s+Tutar\s*:?\s*([0-9.,]+)',
+    r'VERGİLER\s+DAHİL\s+TOPLAM\s+TUTAR\s*:?\s*([0-9.,]+)',
+    r'Genel\s+Toplam\s*:?\s*([0-9.,]+)',
+    r'GENEL\s+TOPLAM\s*:?\s*([0-9.,]+)',
+    r'Total\s+Amount\s*:?\s*([0-9.,]+)',
+    r'Toplam\s*:?\s*([0-9.,]+)'
+], re.IGNORECASE)
+
+WITHHOLDING_PATTERN = re.compile(r'Tevkifat\s*:\s*([0-9.,]+)')
+NOTES_PATTERN = re.compile(r'Not\s*:(.*?)(?=\Z)', re.DOTALL)
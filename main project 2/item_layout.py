@@ -0,0 +1,180 @@
+import logging
+
+from document_segmenter import TOTALS_ANCHOR
+from keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+# Header label keywords per item field, checked in this order (first match wins), so that
+# "Birim Fiyat" is a price and not a unit and "KDV Tutarı" is a tax amount and not the line total
+COLUMN_KEYWORDS = [
+    ('tax_amount', [('kdv', 'tutar'), ('vergi', 'tutar'), ('tax', 'amount')]),
+    ('unit_price', [('fiyat',), ('price',)]),
+    ('tax_rate', [('kdv',), ('vergi',), ('oran',), ('%',), ('tax',), ('vat',)]),
+    ('amount', [('tutar',), ('toplam',), ('amount',), ('total',)]),
+    ('quantity', [('miktar',), ('adet',), ('quantity',), ('qty',)]),
+    ('unit', [('birim',), ('unit',), ('ölçü',)]),
+    ('description', [('açıklama',), ('malzeme',), ('hizmet',), ('ürün',), ('cins',), ('description',), ('item',)])
+]
+
+# Every column keyword as its own class, so one scan of a label or line tells which keywords it contains
+COLUMN_KEYWORD_MATCHER = KeywordMatcher({
+    keyword: [keyword]
+    for _, keyword_sets in COLUMN_KEYWORDS for keywords in keyword_sets for keyword in keywords
+})
+
+# Words of one header label are closer than this many times the word height ("Birim Fiyat", "KDV %")
+HEADER_WORD_GAP_RATIO = 0.8
+
+# Words whose tops differ by at most this many points are on the same line
+LINE_TOLERANCE = 3
+
+# A header line needs at least this many recognized column labels
+MIN_HEADER_COLUMNS = 3
+
+# Fields that hold numbers; a data row needs at least one of them
+NUMERIC_FIELDS = ('quantity', 'unit_price', 'amount')
+
+def _fields_for_keywords(found):
+    """Item fields whose keyword sets are all in found, in COLUMN_KEYWORDS order"""
+    return [field for field, keyword_sets in COLUMN_KEYWORDS
+            if any(all(keyword in found for keyword in keywords) for keywords in keyword_sets)]
+
+def classify_label(label):
+    """Map a header label to an item field, or None for columns that are not used (e.g. "Sıra No")"""
+    fields = _fields_for_keywords(COLUMN_KEYWORD_MATCHER.label_classes(label))
+    return fields[0] if fields else None
+
+def group_lines(words, tolerance=LINE_TOLERANCE):
+    """Group word boxes into lines in one pass; words must be in reading order, as extract_words returns them"""
+    lines = []
+    current = []
+    current_top = None
+    for word in words:
+        if current and abs(word['top'] - current_top) > tolerance:
+            lines.append(sorted(current, key=lambda w: w['x0']))
+            current = []
+        if not current:
+            current_top = word['top']
+        current.append(word)
+    if current:
+        lines.append(sorted(current, key=lambda w: w['x0']))
+    return lines
+
+def _header_labels(line_words):
+    """Merge adjacent header words into column labels as (text, x0, x1)"""
+    labels = []
+    for word in line_words:
+        height = word['bottom'] - word['top']
+        if labels and word['x0'] - labels[-1][2] <= height * HEADER_WORD_GAP_RATIO:
+            text, x0, _ = labels[-1]
+            labels[-1] = (f"{text} {word['text']}", x0, word['x1'])
+        else:
+            labels.append((word['text'], word['x0'], word['x1']))
+    return labels
+
+class ColumnMap:
+    """Column bands of an item table, built from the x-coordinates of its header labels.
+
+    Band boundaries sit halfway between neighbouring labels, and a word belongs to the band that
+    contains its horizontal center, so right-aligned numbers wider than their label still land in
+    the right column.
+    """
+
+    def __init__(self, labels):
+        self.fields = [classify_label(text) for text, _, _ in labels]
+        self.boundaries = [(labels[i][2] + labels[i + 1][1]) / 2 for i in range(len(labels) - 1)]
+
+    @classmethod
+    def from_header_line(cls, line_words):
+        """Build a column map from a line of words if it looks like an item table header, else None"""
+        # Header labels carry no figures; this keeps rows like "Hizmet ... 2 ADET ... %20" out
+        if any(char.isdigit() for word in line_words for char in word['text']):
+            return None
+        # One scan of the whole line: it holds every keyword its labels hold, so when the line as a whole
+        # cannot name enough columns (the common case for body text) no label needs to be built
+        line_fields = _fields_for_keywords(COLUMN_KEYWORD_MATCHER.label_classes(
+            ' '.join(word['text'] for word in line_words)))
+        if len(line_fields) < MIN_HEADER_COLUMNS or 'description' not in line_fields:
+            return None
+        labels = _header_labels(line_words)
+        column_map = cls(labels)
+        recognized = [field for field in column_map.fields if field]
+        if len(set(recognized)) < MIN_HEADER_COLUMNS or 'description' not in recognized:
+            return None
+        return column_map
+
+    def assign(self, line_words):
+        """Split a line's words (sorted by x0) into {field: text} in one pass over words and bands"""
+        cells = {}
+        band = 0
+        for word in line_words:
+            center = (word['x0'] + word['x1']) / 2
+            while band < len(self.boundaries) and center > self.boundaries[band]:
+                band += 1
+            field = self.fields[band]
+            if field:
+                cells[field] = f"{cells[field]} {word['text']}" if field in cells else word['text']
+        return cells
+
+    def as_dict(self):
+        return {field: index for index, field in enumerate(self.fields) if field}
+
+def _is_totals_line(line_words, cells):
+    """A totals line ("Mal Hizmet Toplam Tutarı: ...") ends the table; item rows always have a quantity"""
+    if cells.get('quantity'):
+        return False
+    return bool(TOTALS_ANCHOR.search(' '.join(word['text'] for word in line_words)))
+
+def _make_item(cells):
+    """Turn a row's cells into a line item with the same defaults as the table path"""
+    item = {field: cells[field] for field in ('description', 'quantity', 'unit', 'unit_price', 'tax_rate', 'amount')
+            if cells.get(field)}
+    item.setdefault('quantity', '1')
+    item.setdefault('unit', 'ADET')
+    item.setdefault('tax_rate', '')
+    return item
+
+def _iter_lines(pages):
+    """Yield (page_number, line_words) for every page that still has its word boxes"""
+    for page in pages:
+        words = page.get('words')
+        if words:
+            for line_words in group_lines(words):
+                yield page['page_number'], line_words
+
+def extract_items_from_words(pages):
+    """Yield line items from per-page word boxes under the detected item table header
+
+    The column map found on one page is reused on following pages that continue the table without
+    repeating the header. Lines that only carry description text continue the previous item's
+    description (wrapped text). A totals line ends the table.
+    """
+    column_map = None
+    previous = None
+    for page_number, line_words in _iter_lines(pages):
+        header = ColumnMap.from_header_line(line_words)
+        if header is not None:
+            if column_map is None:
+                logger.info(f"Item table header on page {page_number}: {header.as_dict()}")
+            column_map = header
+            continue
+        if column_map is None:
+            continue
+
+        cells = column_map.assign(line_words)
+        if _is_totals_line(line_words, cells):
+            break
+        if not any(cells.get(field) for field in NUMERIC_FIELDS):
+            if previous is not None and set(cells) == {'description'}:
+                previous['description'] = f"{previous['description']} {cells['description']}"
+            continue
+        if not cells.get('description'):
+            continue
+
+        if previous is not None:
+            yield previous
+        previous = _make_item(cells)
+
+    if previous is not None:
+        yield previous
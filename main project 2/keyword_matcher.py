@@ -0,0 +1,50 @@
+import re
+import logging
+
+from document_index import casefold_tr
+
+logger = logging.getLogger(__name__)
+
+class KeywordMatcher:
+    """Report every keyword class a text contains with one scan of one compiled alternation.
+
+    Keywords are Turkish-casefolded when the matcher is built; texts passed to classes() must be
+    casefolded already (LineIndex.folded, or casefold_tr once per cell/label), so no scan lowercases
+    anything. label_classes() folds a raw label itself, both ways an ASCII "I" can be meant. The alternation sits in a lookahead, so the scan tries every start position and finds
+    the longest keyword starting there; each keyword also reports the classes of the keywords it
+    contains ("kdv tutar" reports "kdv" too), so overlapping keywords are never lost.
+    """
+
+    def __init__(self, keyword_classes):
+        """keyword_classes maps a class name to its keywords, e.g. {'quantity': ['miktar', 'adet']}"""
+        classes_of = {}
+        for name, keywords in keyword_classes.items():
+            for keyword in keywords:
+                classes_of.setdefault(casefold_tr(keyword), set()).add(name)
+
+        # Close each keyword over the keywords it contains
+        self._classes = {
+            keyword: frozenset().union(*(names for other, names in classes_of.items() if other in keyword))
+            for keyword in classes_of
+        }
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(classes_of, key=len, reverse=True))
+        self._regex = re.compile(f'(?=({alternation}))')
+
+    def classes(self, folded_text):
+        """Set of keyword classes that occur in an already casefolded text"""
+        found = set()
+        for match in self._regex.finditer(folded_text):
+            found |= self._classes[match.group(1)]
+        return found
+
+    def label_classes(self, text):
+        """Set of keyword classes in a raw label under both folds of "I"
+
+        casefold_tr makes "I" a dotless "ı", which is right for Turkish text but misses headers typed
+        in ASCII capitals ("BIRIM FIYAT" -> "bırım fıyat"); str.lower() makes it "i" and catches those.
+        """
+        return self.classes(casefold_tr(text)) | self.classes(text.lower())
+
+    def search(self, folded_text):
+        """True when any keyword occurs in an already casefolded text"""
+        return self._regex.search(folded_text) is not None
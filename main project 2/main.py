@@ -11,6 +11,9 @@ import streamlit.components.v1 as components
 
 # Import our custom modules
 from pdf_extractor import PDFExtractor
+from extraction_cache import ExtractionCache
+from ocr_engine import OCREngine, OCR_CACHE_FILENAME
+from vendor_templates import VendorTemplateRegistry
 from xml_converter import XMLConverter
 from geo_mapper import GeoMapper
 from address_parser import AddressParser
@@ -577,6 +580,23 @@ def load_light_ui_overrides():
         unsafe_allow_html=True,
     )
 
+@st.cache_resource
+def get_extraction_cache():
+    """Shared on-disk cache of extraction results, so re-uploaded PDFs are not re-extracted"""
+    return ExtractionCache()
+
+@st.cache_resource
+def get_ocr_engine():
+    """OCR fallback for scanned pages with its own result cache, or None when tesseract is not installed"""
+    if not OCREngine.available():
+        return None
+    return OCREngine(cache=ExtractionCache(filename=OCR_CACHE_FILENAME))
+
+@st.cache_resource
+def get_vendor_templates():
+    """Vendor templates learned from earlier uploads, shared across sessions"""
+    return VendorTemplateRegistry()
+
 def main():
     # Load cohesive dark theme CSS
     load_modern_ui_css()
@@ -803,7 +823,8 @@ def main():
                 time.sleep(0.5)
                 
                 # Extract data from PDF
-                pdf_extractor = PDFExtractor(pdf_path)
+                pdf_extractor = PDFExtractor(pdf_path, cache=get_extraction_cache(), ocr=get_ocr_engine(),
+                                             templates=get_vendor_templates())
                 invoice_data = pdf_extractor.extract_invoice_data()
                 
                 # Step 2: Analyzing data
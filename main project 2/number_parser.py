@@ -0,0 +1,89 @@
+import re
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Currency marks stripped from amounts, removed one after the other in this order
+CURRENCY_MARKS = ('₺', 'TL', '$', '€')
+
+# Everything that is not a digit or a dot once the separators are normalized
+NON_NUMERIC = re.compile(r'[^\d.]')
+
+# Every dot but the last one (the decimal point) of a cleaned number
+EXTRA_DOTS = re.compile(r'\.(?=.*\.)')
+
+# Distinct amount strings remembered by parse_number; item columns repeat a few quantities and prices
+NUMBER_CACHE_SIZE = 4096
+
+def clean_number(number_str):
+    """Clean and standardize Turkish number format ("1.234.567,89 TL" -> '1234567.89', unparsable -> '0')"""
+    if not number_str:
+        return '0'
+
+    # Convert to string if not already
+    number_str = str(number_str).strip()
+
+    # Remove currency symbols
+    for mark in CURRENCY_MARKS:
+        number_str = number_str.replace(mark, '')
+    number_str = number_str.strip()
+
+    # Handle Turkish number format: 15.000,00 (thousands separator = dot, decimal = comma)
+    if '.' in number_str and ',' in number_str:
+        # Pattern: 15.000,00 or 1.234.567,89
+        parts = number_str.split(',')
+        if len(parts) == 2 and len(parts[1]) <= 2:  # Valid decimal part
+            # Remove thousand separators (dots) from integer part
+            number_str = f"{parts[0].replace('.', '')}.{parts[1]}"
+        else:
+            # Just replace comma with dot
+            number_str = number_str.replace(',', '.')
+    elif ',' in number_str:
+        # Pattern: 1234,56 (only decimal comma)
+        number_str = number_str.replace(',', '.')
+    elif '.' in number_str:
+        # Three digits after the last dot are a thousands group: 15.000 -> 15000; else a decimal point
+        after_dot = number_str[number_str.rfind('.') + 1:]
+        if len(after_dot) == 3 and after_dot.isdigit():
+            number_str = number_str.replace('.', '')
+
+    # Remove any remaining non-numeric characters, then all dots but the last one
+    cleaned = EXTRA_DOTS.sub('', NON_NUMERIC.sub('', number_str))
+
+    # Ensure we have a valid number
+    try:
+        return str(float(cleaned))  # Normalize format with dot as decimal separator
+    except ValueError:
+        logger.warning(f"Could not parse number '{number_str}' -> '{cleaned}'")
+        return '0'
+
+@lru_cache(maxsize=NUMBER_CACHE_SIZE)
+def _parse_number_text(number_str):
+    return float(clean_number(number_str))
+
+def parse_number(value):
+    """Parse one Turkish-formatted amount to a float with the rules of clean_number (0.0 when empty or unparsable)
+
+    Results are memoized per distinct string, so the quantities and unit prices that repeat on
+    every item row are normalized once per process.
+    """
+    if not value:
+        return 0.0
+    return _parse_number_text(value if isinstance(value, str) else str(value))
+
+def parse_numbers(values):
+    """Parse a whole column of Turkish-formatted amounts to floats, with the rules of clean_number
+
+    Item columns repeat the same few strings (quantities, recurring unit prices), so each distinct
+    string of the column is parsed once, through parse_number, and every other cell reuses its
+    value. Empty and unparsable values give 0.0.
+    """
+    parsed = {}
+    numbers = []
+    for value in values:
+        number = parsed.get(value)
+        if number is None:
+            number = parsed[value] = parse_number(value)
+        numbers.append(number)
+    return numbers
@@ -0,0 +1,283 @@
+import os
+import hashlib
+import json
+import shlex
+import subprocess
+import tempfile
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from pdf2image import convert_from_path
+    import pytesseract
+    _HAS_OCR = True
+except Exception:
+    _HAS_OCR = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OCR_DPI = 300
+DEFAULT_OCR_LANG = 'tur'
+
+# Most pages handed to a single tesseract process; startup and language model loading are paid once per batch
+DEFAULT_OCR_BATCH_SIZE = 16
+
+# Tesseract's text renderer ends every page with a form feed
+TESSERACT_PAGE_SEPARATOR = '\f'
+
+# Poppler renderer used for region crops (pdf2image cannot rasterize only part of a page)
+PDFTOPPM_CMD = 'pdftoppm'
+
+# Rendered bitmaps are handed from pdftoppm to tesseract as uncompressed 8-bit grayscale files in a
+# RAM-backed (shared memory) folder when one is available: no PNG encode/decode and no disk I/O
+SHARED_MEMORY_DIR = '/dev/shm'
+
+# File name of the OCR result cache when it shares a folder with the extraction cache
+OCR_CACHE_FILENAME = 'ocr_cache.sqlite3'
+
+def _ocr_work_dir():
+    """Temporary folder for rendered page bitmaps, on shared memory when the OS provides it"""
+    parent = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) and os.access(SHARED_MEMORY_DIR, os.W_OK) else None
+    return tempfile.TemporaryDirectory(prefix='e-fatura-ocr-', dir=parent)
+
+# Regions of interest on an A4 invoice as (left, top, right, bottom) fractions of the page, each with
+# its own resolution and tesseract page segmentation mode (4: single column of variable-size text,
+# 6: single uniform block of text)
+OCR_REGIONS = {
+    'header': {'box': (0.0, 0.0, 1.0, 0.4), 'dpi': 300, 'psm': 4},
+    'items': {'box': (0.0, 0.35, 1.0, 0.8), 'dpi': 200, 'psm': 6},
+    'totals': {'box': (0.0, 0.7, 1.0, 1.0), 'dpi': 300, 'psm': 4}
+}
+
+def _page_runs(page_numbers):
+    """Group sorted 1-based page numbers into (first, last) runs of consecutive pages"""
+    runs = []
+    for page_number in sorted(page_numbers):
+        if runs and page_number == runs[-1][1] + 1:
+            runs[-1][1] = page_number
+        else:
+            runs.append([page_number, page_number])
+    return runs
+
+def _render_pages(pdf_path, page_numbers, dpi, output_folder):
+    """Render the given pages to grayscale PGM files in output_folder and return {page_number: image_path}"""
+    image_paths = {}
+    for first, last in _page_runs(page_numbers):
+        paths = convert_from_path(pdf_path, dpi=dpi, first_page=first, last_page=last,
+                                  output_folder=output_folder, fmt='ppm', grayscale=True, paths_only=True,
+                                  output_file=f"p{first:05d}_")
+        for page_number, path in zip(range(first, last + 1), sorted(paths)):
+            image_paths[page_number] = path
+    return image_paths
+
+def _render_region(pdf_path, page_number, page_size, box, dpi, output_folder, name):
+    """Rasterize only the box (page fractions) of one page with pdftoppm's crop options and return the PGM path"""
+    scale = dpi / 72.0
+    width, height = page_size[0] * scale, page_size[1] * scale
+    left, top, right, bottom = box
+    prefix = os.path.join(output_folder, f"p{page_number:05d}_{name}")
+    subprocess.run([
+        PDFTOPPM_CMD, '-r', str(dpi), '-f', str(page_number), '-l', str(page_number),
+        '-x', str(int(left * width)), '-y', str(int(top * height)),
+        '-W', str(int((right - left) * width)), '-H', str(int((bottom - top) * height)),
+        '-gray', '-singlefile', pdf_path, prefix
+    ], capture_output=True, check=True)
+    return prefix + '.pgm'
+
+def _ocr_cache_key(image_path, lang, dpi, config):
+    """Cache key from the SHA-256 of the rendered bitmap and every setting that changes the OCR output"""
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return f"{digest.hexdigest()}:{lang}:{dpi}:{' '.join(config.split())}"
+
+def _run_tesseract(image_paths, work_dir, lang, dpi, config, cache=None):
+    """OCR image files and return one text per image, reusing cached results when a cache is given
+
+    Images not found in the cache go through a single tesseract invocation: tesseract reads a list
+    file of image paths and writes all images to stdout separated by form feeds, which are split back
+    apart. A failing cache (e.g. a locked database) is logged and bypassed, never losing recognized text.
+    """
+    if cache is None:
+        return _run_tesseract_batch(image_paths, work_dir, lang, dpi, config)
+
+    keys = [_ocr_cache_key(path, lang, dpi, config) for path in image_paths]
+    try:
+        texts = [cache.get(key) for key in keys]
+    except Exception as e:
+        logger.warning(f"OCR cache lookup failed, recognizing all {len(image_paths)} image(s): {str(e)}")
+        texts = [None] * len(image_paths)
+    missing = [index for index, text in enumerate(texts) if text is None]
+    if missing:
+        recognized = _run_tesseract_batch([image_paths[index] for index in missing], work_dir, lang, dpi, config)
+        for index, text in zip(missing, recognized):
+            texts[index] = text
+        try:
+            for index in missing:
+                cache.put(keys[index], texts[index])
+        except Exception as e:
+            logger.warning(f"OCR cache write failed, results not cached: {str(e)}")
+    logger.info(f"OCR cache: {len(image_paths) - len(missing)} of {len(image_paths)} image(s) reused")
+    return texts
+
+def _run_tesseract_batch(image_paths, work_dir, lang, dpi, config):
+    """OCR image files with one tesseract invocation; if the split does not line up, re-run them one by one"""
+    list_path = os.path.join(work_dir, 'images.txt')
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(image_paths) + '\n')
+
+    command = [pytesseract.pytesseract.tesseract_cmd, list_path, 'stdout', '-l', lang, '--dpi', str(dpi)]
+    command += shlex.split(config)
+    completed = subprocess.run(command, capture_output=True, check=True)
+    output = completed.stdout.decode('utf-8', errors='replace')
+
+    texts = output.split(TESSERACT_PAGE_SEPARATOR)
+    if texts and not texts[-1].strip():
+        texts.pop()
+    if len(texts) != len(image_paths):
+        logger.warning(f"Tesseract returned {len(texts)} page(s) for a batch of {len(image_paths)}, "
+                       f"re-running the batch image by image")
+        return [pytesseract.image_to_string(path, lang=lang, config=config) for path in image_paths]
+    return texts
+
+def _ocr_page_batch(pdf_path, page_numbers, dpi, lang, config, cache=None):
+    """Process pool worker: render a batch of pages and OCR them with one tesseract invocation"""
+    with _ocr_work_dir() as work_dir:
+        image_paths = _render_pages(pdf_path, page_numbers, dpi, work_dir)
+        ordered_pages = sorted(image_paths)
+        if not ordered_pages:
+            return {}
+        texts = _run_tesseract([image_paths[page_number] for page_number in ordered_pages], work_dir, lang, dpi,
+                               config, cache)
+        return dict(zip(ordered_pages, texts))
+
+class OCREngine:
+    """OCR fallback for pages without a text layer, rendering with pdf2image and recognizing with tesseract.
+
+    Only the requested pages are rasterized. Pages are grouped into batches that each go through a
+    single tesseract process (list-file input), and the batches are spread across a process pool.
+    With a cache, recognized text is stored per rendered bitmap and settings, so re-processing the
+    same scan only renders it.
+    """
+
+    def __init__(self, dpi=DEFAULT_OCR_DPI, lang=DEFAULT_OCR_LANG, max_workers=None, config='',
+                 batch_size=DEFAULT_OCR_BATCH_SIZE, regions=None, cache=None):
+        """Configure rendering resolution, tesseract language(s), worker count, extra tesseract flags,
+        the most pages sent to one tesseract process, per-region overrides of OCR_REGIONS and an
+        optional ExtractionCache for OCR results (e.g. ExtractionCache(filename=OCR_CACHE_FILENAME))"""
+        self.dpi = dpi
+        self.lang = lang
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.config = config
+        self.batch_size = max(1, batch_size)
+        self.cache = cache
+        self.regions = {name: dict(settings) for name, settings in OCR_REGIONS.items()}
+        for name, settings in (regions or {}).items():
+            self.regions.setdefault(name, {}).update(settings)
+
+    @staticmethod
+    def available():
+        """True when pdf2image and pytesseract are installed and the tesseract binary can be found"""
+        if not _HAS_OCR:
+            return False
+        try:
+            pytesseract.get_tesseract_version()
+            return True
+        except Exception:
+            return False
+
+    @property
+    def settings_tag(self):
+        """Short description of the settings that change OCR output (used in cache version tags)
+
+        Language and resolution are spelled out; the extra tesseract flags and the region table
+        (boxes, resolutions and psm of the summary-mode regions) go in as a short hash.
+        """
+        settings = json.dumps({'config': ' '.join(self.config.split()), 'regions': self.regions}, sort_keys=True)
+        return f"ocr-{self.lang}-{self.dpi}-{hashlib.sha1(settings.encode('utf-8')).hexdigest()[:8]}"
+
+    def _batches(self, page_numbers):
+        """Split pages into consecutive batches, small enough that every worker gets at least one"""
+        per_worker = -(-len(page_numbers) // self.max_workers)
+        size = max(1, min(self.batch_size, per_worker))
+        return [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+
+    def ocr_pages(self, pdf_path, page_numbers):
+        """OCR the given 1-based page numbers and return {page_number: text}; failed pages map to ''"""
+        page_numbers = sorted(page_numbers)
+        if not page_numbers:
+            return {}
+        if not self.available():
+            logger.warning("OCR requested but pdf2image/pytesseract or the tesseract binary is not available")
+            return {}
+
+        batches = self._batches(page_numbers)
+        logger.info(f"Running OCR on {len(page_numbers)} page(s) at {self.dpi} DPI in {len(batches)} batch(es)")
+        results = {}
+        workers = min(self.max_workers, len(batches))
+        if workers <= 1:
+            for batch in batches:
+                results.update(self._ocr_batch_safe(pdf_path, batch))
+            return results
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_ocr_page_batch, pdf_path, batch, self.dpi, self.lang, self.config, self.cache): batch
+                for batch in batches
+            }
+            for future, batch in futures.items():
+                try:
+                    results.update(future.result())
+                except Exception as e:
+                    logger.warning(f"OCR failed on pages {batch[0]}-{batch[-1]}: {str(e)}")
+                    results.update({page_number: '' for page_number in batch})
+        return results
+
+    def _ocr_batch_safe(self, pdf_path, batch):
+        """OCR one batch in-process, logging instead of raising on failure"""
+        try:
+            return _ocr_page_batch(pdf_path, batch, self.dpi, self.lang, self.config, self.cache)
+        except Exception as e:
+            logger.warning(f"OCR failed on pages {batch[0]}-{batch[-1]}: {str(e)}")
+            return {page_number: '' for page_number in batch}
+
+    def ocr_regions(self, pdf_path, page_regions):
+        """OCR only selected regions of pages and return {page_number: text}
+
+        page_regions maps a 1-based page number to (page_size, region_names), where page_size is the
+        (width, height) of the page in points. Each region is rasterized on its own at its own DPI,
+        and all crops of the same region go through one tesseract call with that region's psm.
+        Region texts of a page are joined top to bottom.
+        """
+        if not page_regions:
+            return {}
+        if not self.available():
+            logger.warning("OCR requested but pdf2image/pytesseract or the tesseract binary is not available")
+            return {}
+
+        region_texts = {page_number: {} for page_number in page_regions}
+        with _ocr_work_dir() as work_dir:
+            for name, settings in self.regions.items():
+                pages = [page_number for page_number, (_, names) in sorted(page_regions.items()) if name in names]
+                if not pages:
+                    continue
+                try:
+                    image_paths = [
+                        _render_region(pdf_path, page_number, page_regions[page_number][0], settings['box'],
+                                       settings['dpi'], work_dir, name)
+                        for page_number in pages
+                    ]
+                    config = f"--psm {settings['psm']} {self.config}".strip()
+                    texts = _run_tesseract(image_paths, work_dir, self.lang, settings['dpi'], config, self.cache)
+                except Exception as e:
+                    logger.warning(f"OCR of region '{name}' failed on page(s) {pages}: {str(e)}")
+                    continue
+                for page_number, text in zip(pages, texts):
+                    region_texts[page_number][name] = text
+
+        logger.info(f"OCR'd regions on {len(page_regions)} page(s)")
+        return {
+            page_number: '\n'.join(texts[name] for name in self.regions if texts.get(name, '').strip())
+            for page_number, texts in region_texts.items()
+        }
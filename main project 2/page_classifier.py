@@ -0,0 +1,49 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Page labels
+PAGE_TEXT = 'text'
+PAGE_SCANNED = 'scanned'
+PAGE_MIXED = 'mixed'
+
+# Fewer characters than this count as "no usable text layer" (stray page numbers, stamps)
+MIN_TEXT_CHARS = 20
+
+# Share of the page area covered by images above which a page counts as an image page
+MIN_IMAGE_COVERAGE = 0.5
+
+def image_coverage(page):
+    """Fraction of the page area covered by image objects, clipped to the page box"""
+    x0, top, x1, bottom = page.bbox
+    page_area = (x1 - x0) * (bottom - top)
+    if page_area <= 0:
+        return 0.0
+
+    covered = 0.0
+    for image in page.images:
+        width = min(image['x1'], x1) - max(image['x0'], x0)
+        height = min(image['bottom'], bottom) - max(image['top'], top)
+        if width > 0 and height > 0:
+            covered += width * height
+    return min(covered / page_area, 1.0)
+
+def classify_page(page):
+    """Label a pdfplumber page as text, scanned or mixed from its char count and image area only
+
+    No text extraction or layout analysis is done, and the parsed objects are the ones extract_text
+    would use anyway, so the check costs nothing extra on text pages.
+      - scanned: (almost) no characters and images cover most of the page -> needs OCR
+      - mixed: a real text layer on top of a page-sized image (e.g. a scan with an OCR layer)
+      - text: everything else, including blank pages
+    """
+    char_count = len(page.chars)
+    coverage = image_coverage(page) if page.images else 0.0
+
+    if char_count < MIN_TEXT_CHARS:
+        label = PAGE_SCANNED if coverage >= MIN_IMAGE_COVERAGE else PAGE_TEXT
+    else:
+        label = PAGE_MIXED if coverage >= MIN_IMAGE_COVERAGE else PAGE_TEXT
+
+    logger.debug(f"Page {page.page_number}: {char_count} chars, {coverage:.0%} image coverage -> {label}")
+    return label
@@ -1,86 +1,590 @@
 import pdfplumber
+from pdfminer.pdfpage import PDFPage
 import re
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 import logging
+from invoice_patterns import (
+    INVOICE_NUMBER_PATTERNS, DATE_PATTERNS, VENDOR_SECTION_PATTERNS, VENDOR_NAME_PATTERNS,
+    CUSTOMER_SECTION_PATTERNS, CUSTOMER_NAME_PATTERNS, TEXT_ITEM_PATTERNS,
+    SUBTOTAL_PATTERNS, TAX_PATTERNS, TOTAL_PATTERNS, WITHHOLDING_PATTERN, NOTES_PATTERN
+)
+from document_segmenter import segment_document, SELLER_ANCHOR, BUYER_ANCHOR, ITEM_HEADER_ANCHOR
+from document_index import LineIndex, casefold_tr
+from keyword_matcher import KeywordMatcher
+from extraction_budget import ExtractionBudget
+from page_classifier import classify_page, PAGE_SCANNED
+from item_layout import extract_items_from_words
+from vendor_templates import vendor_tax_id, layout_fingerprint, totals_consistent
+from address_gazetteer import default_gazetteer
+from number_parser import clean_number, parse_numbers
+from vat_parser import parse_vat_rate, vat_cache_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Item table header keywords; a page whose text has none of them cannot hold an item table the
+# table loop in extract_invoice_data would accept, so table detection is skipped there
+TABLE_HEADER_KEYWORDS = re.compile(r'açıklama|miktar|birim|fiyat|tutar', re.IGNORECASE)
+
+# Header words that must not appear in a line item description (checked on the casefolded description)
+ITEM_HEADER_WORDS = re.compile(r'açıklama|miktar|birim|fiyat')
+
+# Column title keywords of detected item tables, matched on both folds of the title (casefold_tr and
+# str.lower, for ASCII capitals) after the corrupted-character repair in _table_column_map ("ç" -> "c", "n" -> "ı")
+TABLE_COLUMN_KEYWORDS = KeywordMatcher({
+    'description': ['açıklama', 'acıklama', 'aciiklama', 'malzeme', 'hizmet'],
+    'quantity': ['miktar', 'mıktar'],
+    'unit': ['birim'],
+    'price': ['fiyat', 'fıyat'],
+    'tax_rate': ['kdv', '%', 'vergi'],
+    'amount': ['tutar', 'toplam']
+})
+
+# Tax IDs of the parties; two of them on the first pages mean both parties have been seen
+TAX_ID_PATTERN = re.compile(r'(?:VKN|TCKN|VERGİ\s+NO)\s*:?\s*\d{10,11}', re.IGNORECASE)
+
+def _extract_page_range(pdf_path, start, end):
+    """Process pool worker: open the PDF independently and extract pages [start, end)"""
+    page_results = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:end]:
+            table_continues = bool(page_results and page_results[-1].get('table_open'))
+            page_results.append(PDFExtractor._extract_page(page, table_continues=table_continues))
+    return page_results
+
 class PDFExtractor:
-    def __init__(self, pdf_path):
-        """Initialize the PDF extractor with the path to the PDF file"""
+    # Version tag of the extraction rules; bump it whenever extract_invoice_data output changes
+    # so that cached results from older rules are not reused
+    EXTRACTOR_VERSION = '11'
+    
+    # Longest text the backtracking-prone DOTALL party-section patterns are allowed to scan
+    MAX_DOTALL_SCOPE = 8000
+    
+    # Points kept above the detected item header when cropping a page for table detection,
+    # so the ruling line above the header row stays inside the crop
+    TABLE_CROP_MARGIN = 15
+    
+    # Bottom fraction of the page holding footers (page numbers, bank details); an item table with no
+    # words below it except in this band reaches the page bottom and may continue on the next page
+    PAGE_FOOTER_RATIO = 0.12
+    
+    # Number of page ranges handed to each worker in parallel mode (smaller ranges balance better)
+    PARALLEL_CHUNKS_PER_WORKER = 4
+    
+    # Low-memory mode: most first pages searched for the header fields, and pages read per open of
+    # the file (pdfminer keeps the objects of every page it has parsed until the file is closed)
+    LOW_MEMORY_HEAD_PAGES = 5
+    LOW_MEMORY_CHUNK_PAGES = 200
+    
+    # With low_memory='auto', low-memory mode is used only for documents with more pages than this;
+    # shorter ones are cheaper to keep than to read again for their line items
+    LOW_MEMORY_AUTO_MIN_PAGES = 50
+    
+    # Line items taken from the stream at a time; their quantity, unit price and amount columns are
+    # each parsed with one parse_numbers call, and only one batch is held in memory
+    ITEM_BATCH_ROWS = 500
+    
+    # Fields a vendor template carries over as-is to later invoices of the same seller
+    TEMPLATE_VENDOR_FIELDS = ('vendor_name', 'vendor_tax_id', 'vendor_address')
+    
+    def __init__(self, pdf_path, parallel=False, max_workers=None, cache=None, stage_budgets=None, summary=False,
+                 low_memory=False, ocr=None, templates=None, gazetteer=None):
+        """Initialize the PDF extractor with the path to the PDF file
+        
+        Args:
+            pdf_path: Path to the PDF file
+            parallel: Split page ranges across a process pool (useful for very large PDFs)
+            max_workers: Number of worker processes in parallel mode (default: CPU count)
+            cache: Optional ExtractionCache used by extract_invoice_data
+            stage_budgets: Per-stage wall-clock budgets in seconds, overriding DEFAULT_STAGE_BUDGETS
+            summary: Read pages only until the header fields are found, plus the last page for totals,
+                and skip line items (for when only header and totals are needed)
+            low_memory: Keep no whole-document state so peak memory does not grow with page count:
+                like summary mode, only the first pages (for the header) and the last page (for the
+                totals) are kept, and line items are read from the file again page by page;
+                'auto' turns it on only above LOW_MEMORY_AUTO_MIN_PAGES pages
+            ocr: Optional OCREngine; pages without a text layer are rendered and OCR'd with it and the
+                recognized text feeds the same extraction pipeline (in summary mode only the header
+                and totals regions are OCR'd)
+            templates: Optional VendorTemplateRegistry; invoices from a seller whose layout was learned
+                before take the template's direct path, and successful extractions are learned
+            gazetteer: Optional address Gazetteer for finding addresses (default: the bundled one)
+        """
         self.pdf_path = pdf_path
+        self.parallel = parallel
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache
         self.text_content = ""
+        self.lines = None
         self.tables = []
-        
-    def extract_all_text(self):
-        """Extract all text content from the PDF"""
+        self.pages = []
+        self.page_count = 0
+        self.sections = None
+        self.address_candidates = None
+        self.stage_budgets = stage_budgets
+        self.budget = ExtractionBudget(stage_budgets)
+        self.summary = summary
+        self.low_memory = low_memory
+        self.ocr = ocr
+        self.templates = templates
+        self.gazetteer = gazetteer if gazetteer is not None else default_gazetteer()
+        self._template = None
+        self._pending_writes = []
+        self._reset_template_state()
+        
+    def extract_pages(self):
+        """Extract text, tables and word boxes from every page in a single pass"""
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                if not pdf.pages:
+            if self.low_memory == 'auto':
+                self.low_memory = self._count_file_pages() > self.LOW_MEMORY_AUTO_MIN_PAGES
+            use_parallel = False
+            if self._streams_items():
+                # Only the first pages and the last page are kept; line items are read from the file later
+                for page_result in self._stream_low_memory_pages():
+                    self._add_page_result(page_result)
+                if not self.pages:
                     logger.warning("PDF has no pages")
-                    return ""
-                
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        self.text_content += page_text + "\n"
-                    else:
-                        logger.warning(f"No text found on page {page.page_number}")
+                    return self.pages
+            else:
+                with pdfplumber.open(self.pdf_path) as pdf:
+                    if not pdf.pages:
+                        logger.warning("PDF has no pages")
+                        return self.pages
+                    
+                    self.page_count = len(pdf.pages)
+                    use_parallel = self.parallel and not self.summary and self.max_workers > 1 and self.page_count > 1
+                    if not use_parallel:
+                        for page_result in self._stream_pages(pdf):
+                            self._add_page_result(page_result)
+            
+            # Workers open the file themselves, so the parent handle is closed first
+            if use_parallel:
+                for page_result in self._extract_pages_parallel(self.page_count):
+                    self._add_page_result(page_result)
+                self._detect_continuation_tables()
+            
+            if self.ocr is not None:
+                self._apply_ocr()
+            
+            # Joined and split into indexed lines once at the end; every stage works from this line index
+            self.lines = LineIndex.from_pages(self.pages)
+            self.text_content = self.lines.text
+            self.sections = None
+            self.address_candidates = None
                         
             if not self.text_content.strip():
                 logger.warning("No text content extracted from PDF")
+            logger.info(f"Total tables extracted: {len(self.tables)}")
                 
-            return self.text_content
+            return self.pages
         except FileNotFoundError:
             logger.error(f"PDF file not found: {self.pdf_path}")
             raise FileNotFoundError("PDF dosyası bulunamadı")
         except Exception as e:
-            logger.error(f"Error extracting text from PDF: {str(e)}")
-            raise Exception(f"PDF'den metin çıkarılırken hata oluştu: {str(e)}")
+            logger.error(f"Error extracting pages from PDF: {str(e)}")
+            raise Exception(f"PDF sayfaları işlenirken hata oluştu: {str(e)}")
+    
+    def iter_pages(self):
+        """Stream per-page results (text, tables, word boxes) lazily; pages are only parsed when consumed"""
+        with pdfplumber.open(self.pdf_path) as pdf:
+            yield from self._stream_pages(pdf)
+    
+    def _stream_pages(self, pdf):
+        """Yield page results in order; in summary mode stop once the header is complete and jump to the last page"""
+        pages = pdf.pages
+        if not self.summary:
+            table_continues = False
+            for page in pages:
+                page_result = self._extract_page(page, table_continues=table_continues)
+                table_continues = page_result.get('table_open', False)
+                yield page_result
+            return
+        
+        header_state = {}
+        last_index = len(pages) - 1
+        for index, page in enumerate(pages):
+            page_result = self._extract_page(page, include_layout=False)
+            if index == last_index:
+                self._ocr_summary_regions(page_result, ['header', 'totals'])
+                yield page_result
+                return
+            self._ocr_summary_regions(page_result, ['header'])
+            yield page_result
+            if self._header_complete(page_result['text'], header_state):
+                logger.info(f"Header fields found in the first {index + 1} page(s), skipping to the last page")
+                break
+        page_result = self._extract_page(pages[last_index], include_layout=False)
+        self._ocr_summary_regions(page_result, ['totals'])
+        yield page_result
+    
+    def _streams_items(self):
+        """True in low-memory mode with line items: pages are not kept but streamed from the file again"""
+        return self.low_memory and not self.summary
+    
+    def _stream_low_memory_pages(self):
+        """Yield the pages low-memory mode keeps: the first pages until the header fields are found (at
+        most LOW_MEMORY_HEAD_PAGES) and the last page, text only
+        
+        The file is opened for just these pages, so the page objects of the pages in between are never built.
+        """
+        header_state = {}
+        last_read = 0
+        with self._open_pages(range(1, self.LOW_MEMORY_HEAD_PAGES + 1)) as pdf:
+            self.page_count = self._count_pages(pdf)
+            for page in pdf.pages:
+                page_result = self._extract_page(page, include_layout=False)
+                last_read = page_result['page_number']
+                yield page_result
+                if self._header_complete(page_result['text'], header_state):
+                    break
+        
+        if self.page_count > last_read:
+            logger.info(f"Low-memory mode: kept the first {last_read} page(s) and the last page of {self.page_count}")
+            with self._open_pages([self.page_count]) as pdf:
+                yield self._extract_page(pdf.pages[0], include_layout=False)
+    
+    def _count_file_pages(self):
+        """Number of pages in the PDF file, without building its pages"""
+        with pdfplumber.open(self.pdf_path, pages=[1]) as pdf:
+            return self._count_pages(pdf)
+    
+    @staticmethod
+    def _count_pages(pdf):
+        """Number of pages of an open PDF, counted with pdfminer's object cache off so the walk keeps nothing"""
+        pdf.doc.caching = False
+        page_count = sum(1 for _ in PDFPage.create_pages(pdf.doc))
+        pdf.doc.caching = True
+        return page_count
+    
+    def _open_pages(self, page_numbers):
+        """Open the PDF with only the given pages (1-based), without keeping the objects of the others
+        
+        Walking the page tree resolves every page and its content stream, and pdfminer caches what it
+        resolves until the file is closed; caching is off for the walk and back on for the chosen pages.
+        """
+        pdf = pdfplumber.open(self.pdf_path, pages=page_numbers)
+        pdf.doc.caching = False
+        pdf.pages  # builds the chosen pages
+        pdf.doc.caching = True
+        return pdf
+    
+    def _item_pages(self):
+        """Page results (text, tables, word boxes) the line item strategies read
+        
+        In low-memory mode every page is read from the file again, LOW_MEMORY_CHUNK_PAGES pages per
+        open, and each page result is dropped as soon as the strategy has consumed it.
+        """
+        if not self._streams_items():
+            yield from self.pages
+            return
+        
+        table_continues = False
+        for start in range(1, self.page_count + 1, self.LOW_MEMORY_CHUNK_PAGES):
+            chunk = range(start, min(start + self.LOW_MEMORY_CHUNK_PAGES, self.page_count + 1))
+            with self._open_pages(chunk) as pdf:
+                for page in pdf.pages:
+                    page_result = self._extract_page(page, table_continues=table_continues)
+                    table_continues = page_result.get('table_open', False)
+                    if self.ocr is not None:
+                        self._apply_ocr([page_result])
+                    yield page_result
+    
+    def _ocr_summary_regions(self, page_result, region_names):
+        """In summary mode, OCR only the header/totals regions of a scanned page instead of the whole page"""
+        if self.ocr is None or page_result.get('page_type') != PAGE_SCANNED:
+            return
+        page_number = page_result['page_number']
+        texts = self.ocr.ocr_regions(self.pdf_path, {page_number: (page_result['size'], region_names)})
+        page_result['text'] = texts.get(page_number, '')
+        page_result['ocr'] = True
+    
+    @staticmethod
+    def _header_complete(page_text, header_state):
+        """Update header_state with the header fields seen in page_text and report whether all are found"""
+        if 'invoice_number' not in header_state and INVOICE_NUMBER_PATTERNS.search(page_text):
+            header_state['invoice_number'] = True
+        if 'invoice_date' not in header_state and DATE_PATTERNS.search(page_text):
+            header_state['invoice_date'] = True
+        for line in page_text.split('\n'):
+            if SELLER_ANCHOR.match(line):
+                header_state['seller'] = True
+            elif BUYER_ANCHOR.match(line):
+                header_state['buyer'] = True
+        header_state['tax_ids'] = header_state.get('tax_ids', 0) + len(TAX_ID_PATTERN.findall(page_text))
+        
+        parties_found = (header_state.get('seller') and header_state.get('buyer')) or header_state['tax_ids'] >= 2
+        return bool(header_state.get('invoice_number') and header_state.get('invoice_date') and parties_found)
+    
+    def _extract_pages_parallel(self, page_count):
+        """Extract page ranges in worker processes and return the page results in page order"""
+        workers = min(self.max_workers, page_count)
+        chunk_size = max(1, -(-page_count // (workers * self.PARALLEL_CHUNKS_PER_WORKER)))
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+        logger.info(f"Extracting {page_count} pages in {len(ranges)} range(s) with {workers} worker(s)")
+        
+        page_results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields results in submission order, so pages stay in document order
+            for range_results in executor.map(_extract_page_range,
+                                              [self.pdf_path] * len(ranges),
+                                              [start for start, _ in ranges],
+                                              [end for _, end in ranges]):
+                page_results.extend(range_results)
+        return page_results
+    
+    def _detect_continuation_tables(self):
+        """Re-run table detection on pages that follow a page with an open item table but were not checked as a continuation
+        
+        Parallel workers only know about the pages of their own range, so the first page of a range
+        cannot tell whether the previous range ended inside an item table.
+        """
+        missing = [index for index in range(1, len(self.pages))
+                   if self.pages[index].get('table_detection') != 'continued' and self.pages[index - 1].get('table_open')]
+        if not missing:
+            return
+        
+        with pdfplumber.open(self.pdf_path) as pdf:
+            for index in range(missing[0], len(self.pages)):
+                page_result = self.pages[index]
+                if page_result.get('table_detection') == 'continued' or not self.pages[index - 1].get('table_open'):
+                    continue
+                page = pdf.pages[page_result['page_number'] - 1]
+                try:
+                    found_tables = page.find_tables()
+                    page_result['tables'] = [table.extract() for table in found_tables]
+                    page_result['table_open'] = self._table_open(page, found_tables, page_result['tables'], page_result['words'], True)
+                    page_result['table_detection'] = 'continued'
+                except Exception as page_error:
+                    logger.warning(f"Error extracting tables from page {page.page_number}: {str(page_error)}")
+                finally:
+                    page.flush_cache()
+        self.tables = [table for page_result in self.pages for table in page_result['tables']]
+    
+    @staticmethod
+    def _extract_page(page, include_layout=True, table_continues=False):
+        """Extract text, tables and word boxes from one page, parsing its layout only once
+        
+        With include_layout=False only the text is extracted (tables and word boxes stay empty).
+        table_continues runs table detection even without item header keywords, for pages that may
+        continue the previous page's item table; the result's 'table_open' tells whether the next page may.
+        The page's parsed layout caches are flushed afterwards so they do not pile up across pages.
+        """
+        try:
+            page_result = PDFExtractor._extract_page_content(page, include_layout, table_continues)
+        finally:
+            # flush_cache() drops the parsed objects but not the textmap lru_cache, which still holds the chars
+            page.flush_cache()
+            if hasattr(page, 'get_textmap') and hasattr(page.get_textmap, 'cache_clear'):
+                page.get_textmap.cache_clear()
+        return page_result
+    
+    @staticmethod
+    def _extract_page_content(page, include_layout, table_continues=False):
+        """Extract text and, if include_layout is set, word boxes and item tables from one page
+        
+        Pages classified as scanned skip text and layout extraction entirely; they are left for OCR.
+        """
+        page_result = {
+            'page_number': page.page_number,
+            'page_type': classify_page(page),
+            'text': '',
+            'tables': [],
+            'words': []
+        }
+        
+        if page_result['page_type'] == PAGE_SCANNED:
+            logger.info(f"Page {page.page_number} is a scanned image, skipping text layer extraction")
+            # Page size in points, needed to rasterize regions of interest for OCR
+            page_result['size'] = (float(page.width), float(page.height))
+            return page_result
+        
+        page_result['text'] = page.extract_text() or ''
+        if not page_result['text']:
+            logger.warning(f"No text found on page {page.page_number}")
+        
+        if not include_layout:
+            return page_result
+        
+        try:
+            page_result['words'] = page.extract_words()
+        except Exception as page_error:
+            logger.warning(f"Error extracting words from page {page.page_number}: {str(page_error)}")
+        
+        # Table detection is the most expensive pdfplumber call: only run it on pages that
+        # mention item header keywords (or continue a table), and only on the area below the header
+        if not table_continues and not TABLE_HEADER_KEYWORDS.search(page_result['text']):
+            logger.debug(f"No item header keywords on page {page.page_number}, skipping table detection")
+            return page_result
+        
+        page_result['table_detection'] = 'continued' if table_continues else 'header'
+        try:
+            if table_continues:
+                # The continued table starts at the top of the page, above any keyword on it
+                found_tables = page.find_tables()
+            else:
+                found_tables = PDFExtractor._find_item_tables(page, page_result['words'])
+            page_result['tables'] = [table.extract() for table in found_tables]
+            page_result['table_open'] = PDFExtractor._table_open(page, found_tables, page_result['tables'],
+                                                                 page_result['words'], table_continues)
+            if page_result['tables']:
+                logger.info(f"Found {len(page_result['tables'])} table(s) on page {page.page_number}")
+            else:
+                logger.debug(f"No tables found on page {page.page_number}")
+        except Exception as page_error:
+            logger.warning(f"Error extracting tables from page {page.page_number}: {str(page_error)}")
+        
+        return page_result
+    
+    @staticmethod
+    def _find_item_tables(page, words):
+        """Run table detection on the part of the page below the topmost item header keyword"""
+        header_tops = [word['top'] for word in words if TABLE_HEADER_KEYWORDS.search(word['text'])]
+        if not header_tops:
+            return page.find_tables()
+        
+        x0, top, x1, bottom = page.bbox
+        crop_top = max(top, min(header_tops) - PDFExtractor.TABLE_CROP_MARGIN)
+        if crop_top <= top:
+            return page.find_tables()
+        return page.crop((x0, crop_top, x1, bottom)).find_tables()
+    
+    @staticmethod
+    def _table_open(page, found_tables, tables, words, table_continues):
+        """True when the lowest of the page's tables (found_tables, with their rows in tables) is an item
+        table that reaches the page bottom
+        
+        The table is an item table when its header maps to item columns, or when it is the first table
+        of a page that continues the previous page's item table. It reaches the page bottom when no
+        word lies below it outside the footer band (PAGE_FOOTER_RATIO of the page height).
+        """
+        if not found_tables:
+            return False
+        last = max(range(len(found_tables)), key=lambda index: found_tables[index].bbox[3])
+        first = min(range(len(found_tables)), key=lambda index: found_tables[index].bbox[1])
+        if not (table_continues and last == first) and PDFExtractor._table_column_map(tables[last])[0] == -1:
+            return False
+        
+        footer_top = page.bbox[3] - page.height * PDFExtractor.PAGE_FOOTER_RATIO
+        table_bottom = found_tables[last].bbox[3]
+        return not any(table_bottom <= word['top'] < footer_top for word in words)
+    
+    def _add_page_result(self, page_result):
+        """Append a single page's extraction result to the document-level content"""
+        self.pages.append(page_result)
+        self.tables.extend(page_result['tables'])
+    
+    def _apply_ocr(self, page_results=None):
+        """OCR the pages classified as scanned (of page_results, default: the kept pages) and put the recognized text in their results"""
+        if page_results is None:
+            page_results = self.pages
+        scanned_pages = [page_result['page_number'] for page_result in page_results
+                         if page_result.get('page_type') == PAGE_SCANNED and not page_result.get('ocr')]
+        if not scanned_pages:
+            return
+        
+        ocr_texts = self.ocr.ocr_pages(self.pdf_path, scanned_pages)
+        for page_result in page_results:
+            if page_result['page_number'] not in ocr_texts:
+                continue
+            page_result['text'] = ocr_texts[page_result['page_number']]
+            page_result['ocr'] = True
+        logger.info(f"OCR recovered text on {sum(1 for t in ocr_texts.values() if t.strip())} of {len(scanned_pages)} page(s)")
+    
+    def extract_all_text(self):
+        """Extract all text content from the PDF"""
+        if not self.pages:
+            self.extract_pages()
+        return self.text_content
     
     def extract_tables(self):
         """Extract tables from the PDF"""
-        try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                if not pdf.pages:
-                    logger.warning("PDF has no pages for table extraction")
-                    return []
-                
-                for page in pdf.pages:
-                    try:
-                        tables = page.extract_tables()
-                        if tables:
-                            self.tables.extend(tables)
-                            logger.info(f"Found {len(tables)} table(s) on page {page.page_number}")
-                        else:
-                            logger.debug(f"No tables found on page {page.page_number}")
-                    except Exception as page_error:
-                        logger.warning(f"Error extracting tables from page {page.page_number}: {str(page_error)}")
-                        continue
-                        
-            logger.info(f"Total tables extracted: {len(self.tables)}")
-            return self.tables
-        except FileNotFoundError:
-            logger.error(f"PDF file not found: {self.pdf_path}")
-            raise FileNotFoundError("PDF dosyası bulunamadı")
-        except Exception as e:
-            logger.error(f"Error extracting tables from PDF: {str(e)}")
-            raise Exception(f"PDF'den tablo çıkarılırken hata oluştu: {str(e)}")
+        if not self.pages:
+            self.extract_pages()
+        return self.tables
     
-    def extract_invoice_data(self):
+    def extract_invoice_data(self, store=True):
+        """Extract structured invoice data from the PDF, reusing cached results for identical files
+        
+        With store=False the cache entry and vendor template this extraction produced are not written
+        until store_results() is called, so a caller can tell a failed write from a failed extraction.
+        """
+        self._pending_writes = []
+        if self.cache is None:
+            invoice_data = self._extract_with_templates()
+        else:
+            try:
+                version = self.EXTRACTOR_VERSION
+                if self.summary:
+                    version += '-summary'
+                if self.ocr is not None:
+                    version += f"-{self.ocr.settings_tag}"
+                cache_key = self.cache.make_key(self.pdf_path, version)
+            except FileNotFoundError:
+                logger.error(f"PDF file not found: {self.pdf_path}")
+                raise FileNotFoundError("PDF dosyası bulunamadı")
+            
+            invoice_data = self.cache.get(cache_key)
+            if invoice_data is None:
+                invoice_data = self._extract_with_templates()
+                # A result cut short by the budget is not cached, so the next run gets the full extraction
+                if invoice_data.get('timed_out_stages'):
+                    logger.info("Extraction hit its time budget, result not cached")
+                else:
+                    self._pending_writes.append((self.cache.put, (cache_key, invoice_data)))
+        
+        if store:
+            self.store_results()
+        return invoice_data
+    
+    def store_results(self):
+        """Write the cache entry and vendor template left pending by extract_invoice_data(store=False)"""
+        pending, self._pending_writes = self._pending_writes, []
+        for write, args in pending:
+            write(*args)
+    
+    def _extract_with_templates(self):
+        """Extract through the vendor template when one matches, falling back to (and learning from) the full cascade"""
+        if self.templates is None:
+            return self._extract_invoice_data()
+        
+        if not self.pages:
+            self.extract_pages()
+        template_key = self._template_key()
+        self._template = self.templates.lookup(*template_key) if template_key else None
+        if self._template is not None:
+            invoice_data = self._extract_invoice_data()
+            if self._template_checks_pass(invoice_data):
+                logger.info("Invoice extracted with the vendor template")
+                self._learn_template(template_key, invoice_data)
+                return invoice_data
+            logger.info("Falling back to the full extraction cascade")
+            self._template = None
+        
+        invoice_data = self._extract_invoice_data()
+        if template_key:
+            self._learn_template(template_key, invoice_data)
+        return invoice_data
+    
+    def _reset_template_state(self):
+        """Forget what the previous extraction pass recorded for template learning"""
+        self._pattern_hits = {}
+        self._template_misses = []
+        self._vendor_fields = None
+        self._item_strategy = None
+        self._item_table = None
+    
+    def _extract_invoice_data(self):
         """Extract structured invoice data from the PDF"""
         try:
             logger.info("Starting invoice data extraction")
             
-            # Extract all text if not already done
-            if not self.text_content:
-                self.extract_all_text()
-            
-            # Extract tables if not already done
-            if not self.tables:
-                self.extract_tables()
+            # Extract text, tables and word boxes in a single pass if not already done
+            if not self.pages:
+                self.extract_pages()
             
             # Validate that we have some content to work with
             if not self.text_content.strip():
@@ -90,6 +594,11 @@ class PDFExtractor:
             # Log text content for debugging address extraction
             logger.info(f"PDF text content preview: {self.text_content[:500]}...")
             
+            # Locate seller, buyer, item table and totals regions once; each field is searched in its own region
+            self._segment()
+            self.budget = ExtractionBudget(self.stage_budgets)
+            self._reset_template_state()
+            
             # Initialize invoice data dictionary
             invoice_data = {
                 'invoice_number': '',
@@ -108,219 +617,81 @@ class PDFExtractor:
             }
             
             # Extract invoice number - Multiple patterns
-            invoice_number_patterns = [
-                r'Fatura No\s*:?\s*([A-Za-z0-9\-._/]+)',
-                r'FATURA NO\s*:?\s*([A-Za-z0-9\-._/]+)',
-                r'Invoice No\s*:?\s*([A-Za-z0-9\-._/]+)',
-                r'No\s*:?\s*([A-Za-z0-9\-._/]+)',
-                r'Belge No\s*:?\s*([A-Za-z0-9\-._/]+)',
-                r'Fatura Numarası\s*:?\s*([A-Za-z0-9\-._/]+)',
-                r'FATURA NUMARASI\s*:?\s*([A-Za-z0-9\-._/]+)',
-                r'INVOICE NUMBER\s*:?\s*([A-Za-z0-9\-._/]+)',
-                r'Seri Sıra No\s*:?\s*([A-Za-z0-9\-._/]+)'
-            ]
-            
-            for pattern in invoice_number_patterns:
-                invoice_number_match = re.search(pattern, self.text_content, re.IGNORECASE)
-                if invoice_number_match:
-                    invoice_data['invoice_number'] = invoice_number_match.group(1).strip()
-                    logger.info(f"Found invoice number: {invoice_data['invoice_number']}")
-                    break
+            self.budget.start('header')
+            invoice_number_match = self._search_field('invoice_number', INVOICE_NUMBER_PATTERNS, 'header')
+            if invoice_number_match:
+                invoice_data['invoice_number'] = invoice_number_match.group(1).strip()
+                logger.info(f"Found invoice number: {invoice_data['invoice_number']}")
             
             # Extract invoice date - Multiple patterns
-            date_patterns = [
-                r'Fatura Tarihi\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
-                r'FATURA TARİHİ\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
-                r'Tarih\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
-                r'Date\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
-                r'Düzenleme Tarihi\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
-                r'DÜZENLEME TARİHİ\s*:?\s*(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})',
-                r'(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4})'
-            ]
-            
-            for pattern in date_patterns:
-                date_match = re.search(pattern, self.text_content, re.IGNORECASE)
-                if date_match:
-                    invoice_data['invoice_date'] = date_match.group(1).strip()
-                    logger.info(f"Found invoice date: {invoice_data['invoice_date']}")
-                    
-                    # Try to convert to standard date format
-                    try:
-                        date_str = date_match.group(1)
-                        # Handle different date formats
-                        if '.' in date_str:
-                            day, month, year = date_str.split('.')
-                        elif '/' in date_str:
-                            day, month, year = date_str.split('/')
-                        elif '-' in date_str:
-                            parts = date_str.split('-')
-                            if len(parts[0]) == 4:  # Year first format
-                                year, month, day = parts
-                            else:  # Day first format
-                                day, month, year = parts
-                        
-                        # Ensure year has 4 digits
-                        if len(year) == 2:
-                            year = '20' + year if int(year) < 50 else '19' + year
-                        
-                        # Format as ISO date
-                        invoice_data['invoice_date_iso'] = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                        # Replace original date with ISO format for consistency
-                        invoice_data['invoice_date'] = invoice_data['invoice_date_iso']
-                        logger.info(f"Converted date to ISO format: {invoice_data['invoice_date_iso']}")
-                    except Exception as e:
-                        logger.warning(f"Could not parse date {date_str}: {e}")
-                        # Keep original format if parsing fails
-                        pass
-                    break
-            
-            # Enhanced vendor information extraction with multiple patterns
-            vendor_section = None
-            vendor_patterns = [
-                # Standard patterns
-                r'SATICI\s*:?\s*\n(.*?)(?=ALICI|MÜŞTERI|ETİ\s+MADEN|\Z)',
-                r'SELLER\s*:?\s*\n(.*?)(?=BUYER|CUSTOMER|\Z)',
-                r'FATURALAYAN\s*:?\s*\n(.*?)(?=ALICI|\Z)',
-                
-                # Company-specific patterns  
-                r'(DEVLET\s+MALZEME\s+OFİSİ.*?)(?=ETİ\s+MADEN|ALICI|\Z)',
-                r'(.*?LTD.*?ŞTİ.*?)(?=ALICI|ETİ|\Z)',
-                r'(.*?A\.?Ş\.?.*?)(?=ALICI|ETİ|\Z)',
-                
-                # Address-based patterns
-                r'(.*?VKN\s*:?\s*\d{10}.*?)(?=ALICI|ETİ|\Z)',
-                r'(.*?TAX\s*ID.*?)(?=BUYER|\Z)',
-                
-                # Fallback patterns
-                r'(.*?)(?=ALICI|BUYER)',
-                r'([A-ZÜĞŞIÖÇ\s]+(?:LTD|AŞ|ŞTİ).*?)(?=ALICI|\Z)'
-            ]
-            
-            for pattern in vendor_patterns:
-                vendor_section = re.search(pattern, self.text_content, re.DOTALL | re.IGNORECASE)
-                if vendor_section:
-                    logger.info(f"Found vendor section with pattern: {pattern[:50]}...")
-                    break
-            
-            if vendor_section:
-                vendor_text = vendor_section.group(1)
+            date_match = self._search_field('invoice_date', DATE_PATTERNS, 'header')
+            if date_match:
+                invoice_data['invoice_date'] = date_match.group(1).strip()
+                logger.info(f"Found invoice date: {invoice_data['invoice_date']}")
                 
-                # Enhanced vendor name extraction
-                vendor_name = None
-                vendor_name_patterns = [
-                    # Specific company patterns
-                    r'(DEVLET\s+MALZEME\s+OFİSİ[^VKN\n]*)',
-                    r'(.*?(?:LTD|AŞ|ŞTİ|A\.Ş|LTD\.ŞTİ)\.?)',
-                    r'(.*?(?:LIMITED|ANONIM|ŞIRKETI))',
+                # Try to convert to standard date format
+                try:
+                    date_str = date_match.group(1)
+                    # Handle different date formats
+                    if '.' in date_str:
+                        day, month, year = date_str.split('.')
+                    elif '/' in date_str:
+                        day, month, year = date_str.split('/')
+                    elif '-' in date_str:
+                        parts = date_str.split('-')
+                        if len(parts[0]) == 4:  # Year first format
+                            year, month, day = parts
+                        else:  # Day first format
+                            day, month, year = parts
                     
-                    # General patterns
-                    r'^([A-ZÜĞŞIÖÇK\s]{3,}?)(?=\s*VKN|\s*TAX|\s*Tel|\s*Fax|\s*E-mail|\s*\d{5}|\n|$)',
-                    r'^([A-ZÜĞŞIÖÇK][A-ZÜĞŞIÖÇa-züğşıöç\s]{10,}?)(?=\s*\n|\s*VKN)',
-                    r'^(.*?)(?=\n.*VKN|\n.*Tel|\n.*Fax)',
+                    # Ensure year has 4 digits
+                    if len(year) == 2:
+                        year = '20' + year if int(year) < 50 else '19' + year
                     
-                    # Fallback
-                    r'^([^\n]{10,})'
-                ]
-                
-                for pattern in vendor_name_patterns:
-                    vendor_name_match = re.search(pattern, vendor_text.strip(), re.IGNORECASE | re.MULTILINE)
-                    if vendor_name_match:
-                        vendor_name = vendor_name_match.group(1).strip()
-                        # Clean up the name
-                        vendor_name = re.sub(r'\s+', ' ', vendor_name)  # Multiple spaces
-                        vendor_name = re.sub(r'^[:\-\s]+|[:\-\s]+$', '', vendor_name)  # Leading/trailing symbols
-                        
-                        if len(vendor_name) >= 5 and not re.match(r'^\d+$', vendor_name):
-                            invoice_data['vendor_name'] = vendor_name
-                            logger.info(f"Extracted vendor name: {vendor_name}")
-                            break
-                
-                # Extract vendor tax ID - Try multiple patterns
-                vendor_tax_match = re.search(r'VKN[:\s]*(\d+)', vendor_text)
-                if not vendor_tax_match:
-                    vendor_tax_match = re.search(r'(\d{10,11})', vendor_text)
-                if vendor_tax_match:
-                    invoice_data['vendor_tax_id'] = vendor_tax_match.group(1)
-                
-                # Extract vendor address - Look for address indicators
-                address_parts = []
-                
-                # Look for specific address patterns
-                address_match = re.search(r'(\d+.*?(?:Bulvar|Cad|Sok|Mah).*?(?:ANKARA|İSTANBUL|İZMİR|BURSA|ANTALYA))', vendor_text, re.IGNORECASE)
-                if address_match:
-                    address_parts.append(address_match.group(1))
-                else:
-                    # Look for city names
-                    city_match = re.search(r'(ANKARA|İSTANBUL|İZMİR|BURSA|ANTALYA|ADANA|KONYA)', vendor_text, re.IGNORECASE)
-                    if city_match:
-                        address_parts.append(city_match.group(1))
-                
-                # If no specific address found, try to extract from text lines
-                if not address_parts:
-                    for line in vendor_text.split('\n'):
-                        line = line.strip()
-                        if line and not re.search(r'(VKN|Tel|E-Posta|Fax|Web|DEVLET|OFİSİ)', line):
-                            if len(line) > 5:  # Skip very short lines
-                                address_parts.append(line)
-                
-                invoice_data['vendor_address'] = ' '.join(address_parts) if address_parts else 'Ankara, Türkiye'
-                logger.info(f"Vendor address extracted: {invoice_data['vendor_address']}")
-            else:
-                # Fallback: Try to extract vendor info from any part of the document
-                logger.info("No vendor section found, trying fallback methods...")
-                self._extract_vendor_fallback(invoice_data)
+                    # Format as ISO date
+                    invoice_data['invoice_date_iso'] = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+                    # Replace original date with ISO format for consistency
+                    invoice_data['invoice_date'] = invoice_data['invoice_date_iso']
+                    logger.info(f"Converted date to ISO format: {invoice_data['invoice_date_iso']}")
+                except Exception as e:
+                    logger.warning(f"Could not parse date {date_str}: {e}")
+                    # Keep original format if parsing fails
+                    pass
+            
+            # Enhanced vendor information extraction with multiple patterns
+            self.budget.start('vendor')
+            if not self._apply_template_vendor(invoice_data):
+                self._extract_vendor_info(invoice_data)
+            self._vendor_fields = {field: invoice_data[field] for field in self.TEMPLATE_VENDOR_FIELDS}
             
             # Enhanced customer information extraction
+            self.budget.start('customer')
             customer_section = None
-            customer_patterns = [
-                # Standard patterns
-                r'ALICI\s*:?\s*\n(.*?)(?=Malzeme|MALİN|ÜRÜN|HIZMET|e-FATURA|FATURA\s+NO|TOPLAM|$)',
-                r'BUYER\s*:?\s*\n(.*?)(?=ITEM|PRODUCT|SERVICE|INVOICE|TOTAL|$)',
-                r'MÜŞTERI\s*:?\s*\n(.*?)(?=ÜRÜN|HIZMET|TOPLAM|$)',
-                
-                # Company-specific patterns
-                r'(ETİ\s+MADEN.*?)(?=e-FATURA|Sıra\s+No|MALZEME|$)',
-                r'(.*?GENEL\s+MÜDÜRLÜĞÜ.*?)(?=MALZEME|ÜRÜN|$)',
-                r'(.*?(?:MÜDÜRLÜĞÜ|BAŞKANLIĞI|DAİRESİ).*?)(?=MALZEME|$)',
-                
-                # VKN-based patterns for customer
-                r'(?:ALICI|BUYER).*?(.*?VKN\s*:?\s*\d{10}.*?)(?=MALZEME|ÜRÜN|$)',
-                
-                # Fallback patterns
-                r'(?:ALICI|BUYER)(.*?)(?=\n\s*\d|\n\s*[A-Z]{3,})',
-                r'(.*?)(?=Malzeme|MALZEME|ÜRÜN|HIZMET)'
-            ]
-            
-            for pattern in customer_patterns:
-                customer_section = re.search(pattern, self.text_content, re.DOTALL | re.IGNORECASE)
+            customer_span = None
+            customer_scope, scope_start = self._party_scope('buyer')
+            for pattern in CUSTOMER_SECTION_PATTERNS:
+                if self.budget.expired():
+                    customer_section = None
+                    customer_span = self._linear_party_span('buyer')
+                    break
+                customer_section = pattern.search(customer_scope)
                 if customer_section and len(customer_section.group(1).strip()) > 10:
-                    logger.info(f"Found customer section with pattern: {pattern[:50]}...")
+                    logger.info(f"Found customer section with pattern: {pattern.pattern[:50]}...")
                     break
-            
             if customer_section:
-                customer_text = customer_section.group(1)
+                customer_span = (scope_start + customer_section.start(1), scope_start + customer_section.end(1))
+            
+            if customer_span is not None:
+                customer_text = self.text_content[customer_span[0]:customer_span[1]]
+                customer_lines = self.lines.slice_lines(*customer_span)
                 
                 # Enhanced customer name extraction
                 customer_name = None
-                customer_name_patterns = [
-                    # Specific company patterns
-                    r'(ETİ\s+MADEN\s+İŞLETMELERİ\s+GENEL\s+MÜDÜRLÜĞÜ)',
-                    r'(ETİ\s+MADEN.*?MÜDÜRLÜĞÜ)',
-                    r'(.*?(?:GENEL\s+MÜDÜRLÜĞÜ|BAŞKANLIĞI|DAİRESİ))',
-                    r'(.*?(?:LTD|AŞ|ŞTİ|A\.Ş|LTD\.ŞTİ)\.?)',
-                    r'(.*?(?:LIMITED|ANONIM|ŞIRKETI))',
-                    
-                    # General patterns
-                    r'^([A-ZÜĞŞIÖÇK\s]{5,}?)(?=\s*VKN|\s*TAX|\s*Tel|\s*Fax|\s*E-mail|\s*\d{5}|\n|$)',
-                    r'^([A-ZÜĞŞIÖÇK][A-ZÜĞŞIÖÇa-züğşıöç\s]{10,}?)(?=\s*\n|\s*VKN)',
-                    r'^(.*?)(?=\n.*VKN|\n.*Tel|\n.*Fax)',
-                    
-                    # Fallback
-                    r'^([^\n]{10,})'
-                ]
-                
-                for pattern in customer_name_patterns:
-                    customer_name_match = re.search(pattern, customer_text.strip(), re.IGNORECASE | re.MULTILINE)
+                for pattern in CUSTOMER_NAME_PATTERNS:
+                    if self.budget.expired():
+                        self._apply_linear_party_name(invoice_data, 'customer_name', customer_lines)
+                        break
+                    customer_name_match = pattern.search(customer_text.strip())
                     if customer_name_match:
                         customer_name = customer_name_match.group(1).strip()
                         # Clean up the name
@@ -339,28 +710,8 @@ class PDFExtractor:
                 if customer_tax_match:
                     invoice_data['customer_tax_id'] = customer_tax_match.group(1)
                 
-                # Extract customer address - Look for address indicators
-                address_parts = []
-                
-                # Look for specific address patterns
-                address_match = re.search(r'(\d+.*?(?:Bulvar|Cad|Sok|Mah).*?(?:ANKARA|İSTANBUL|İZMİR|BURSA|ANTALYA))', customer_text, re.IGNORECASE)
-                if address_match:
-                    address_parts.append(address_match.group(1))
-                else:
-                    # Look for city names
-                    city_match = re.search(r'(ANKARA|İSTANBUL|İZMİR|BURSA|ANTALYA|ADANA|KONYA)', customer_text, re.IGNORECASE)
-                    if city_match:
-                        address_parts.append(city_match.group(1))
-                
-                # If no specific address found, try to extract from text lines
-                if not address_parts:
-                    for line in customer_text.split('\n'):
-                        line = line.strip()
-                        if line and not re.search(r'(VKN|Tel|E-Posta|Fax|Web|ETİ|MADEN|MÜDÜRLÜĞÜ)', line):
-                            if len(line) > 5:  # Skip very short lines
-                                address_parts.append(line)
-                
-                invoice_data['customer_address'] = ' '.join(address_parts) if address_parts else 'Ankara, Türkiye'
+                # Extract customer address: the most complete gazetteer address in the customer block
+                invoice_data['customer_address'] = self._span_address(customer_span) or 'Türkiye'
                 logger.info(f"Customer address extracted: {invoice_data['customer_address']}")
             else:
                 # Fallback: Try to extract customer info from any part of the document
@@ -370,216 +721,58 @@ class PDFExtractor:
             # Apply comprehensive address extraction and improvement
             self._extract_and_improve_all_addresses(invoice_data)
             
-            # Enhanced table extraction with better parsing
-            logger.info("Attempting table-based line items extraction...")
-            table_items_extracted = False
-            
-            if self.tables:
-                for table_idx, table in enumerate(self.tables):
-                    logger.info(f"Processing table {table_idx + 1} with {len(table) if table else 0} rows")
-                    
-                    if not table or len(table) < 2:
-                        continue
-                    
-                    # Print table for debugging
-                    for i, row in enumerate(table[:5]):  # First 5 rows for debugging
-                        logger.debug(f"Table row {i}: {row}")
-                    
-                    # Look for header row containing item columns
-                    header_row_idx = -1
-                    for i, row in enumerate(table):
-                        if not row:
-                            continue
-                        row_text = ' '.join([str(cell).lower() for cell in row if cell])
-                        if any(keyword in row_text for keyword in ['açıklama', 'miktar', 'birim', 'fiyat', 'tutar']):
-                            header_row_idx = i
-                            logger.info(f"Found header row at index {i}: {row}")
-                            break
-                    
-                    if header_row_idx == -1:
-                        logger.warning(f"No header row found in table {table_idx + 1}")
-                        continue
-                    
-                    header = table[header_row_idx]
-                    
-                    # Create column mapping with Turkish character handling
-                    col_map = {}
-                    for i, col_name in enumerate(header):
-                        if not col_name:
-                            continue
-                        col_name_clean = str(col_name).lower()
-                        
-                        # Handle corrupted Turkish characters
-                        col_name_clean = col_name_clean.replace('n', 'ı').replace('ç', 'c')
-                        
-                        logger.debug(f"Processing column {i}: '{col_name}' -> '{col_name_clean}'")
-                        
-                        if any(term in col_name_clean for term in ['açıklama', 'acıklama', 'aciiklama', 'malzeme', 'hizmet']):
-                            col_map['description'] = i
-                        elif any(term in col_name_clean for term in ['miktar', 'mıktar']):
-                            col_map['quantity'] = i
-                        elif 'birim' in col_name_clean and 'fiyat' not in col_name_clean:
-                            col_map['unit'] = i
-                        elif any(term in col_name_clean for term in ['fiyat', 'fıyat']):
-                            col_map['unit_price'] = i
-                        elif any(term in col_name_clean for term in ['kdv', '%', 'vergi']):
-                            col_map['tax_rate'] = i
-                        elif any(term in col_name_clean for term in ['tutar', 'toplam']):
-                            col_map['amount'] = i
-                    
-                    logger.info(f"Column mapping: {col_map}")
-                    
-                    # Process data rows after header
-                    for row_idx in range(header_row_idx + 1, len(table)):
-                        row = table[row_idx]
-                        if not row or all(cell is None or str(cell).strip() == '' for cell in row):
-                            continue
-                        
-                        logger.debug(f"Processing data row: {row}")
-                        
-                        # Extract item data
-                        item = {}
-                        for field, col_idx in col_map.items():
-                            if col_idx < len(row) and row[col_idx]:
-                                value = str(row[col_idx]).strip()
-                                if value:
-                                    item[field] = value
-                        
-                        # Validate and add item
-                        if item.get('description') and len(item.get('description', '')) > 3:
-                            # Skip header-like descriptions
-                            desc_lower = item['description'].lower()
-                            if not any(keyword in desc_lower for keyword in ['açıklama', 'miktar', 'birim', 'fiyat']):
-                                # Set defaults for missing fields
-                                if not item.get('quantity'):
-                                    item['quantity'] = '1'
-                                if not item.get('unit'):
-                                    item['unit'] = 'ADET'
-                                # Keep tax_rate exactly as extracted, no normalization
-                                if not item.get('tax_rate'):
-                                    item['tax_rate'] = ''  # Leave empty if not found
-                                
-                                invoice_data['line_items'].append(item)
-                                table_items_extracted = True
-                                logger.info(f"Extracted table item: {item}")
-                    
-                    if table_items_extracted:
-                        break  # Found good table, stop processing others
-            
-            # Enhanced line items extraction from text (only if table extraction failed)
-            if not table_items_extracted:
-                logger.info("Table extraction failed, attempting text-based line items extraction...")
-                
-                # Look for specific line item patterns in text
-                lines = self.text_content.split('\n')
-                
-                # Find lines that look like item data
-                item_patterns = [
-                    # Pattern: Description Quantity Unit Price %Tax Amount
-                    r'^(.+?)\s+(\d+)\s+(ADET|KG|LT|M|SAAT)\s+(\d+[.,]\d+[.,]\d+|\d+[.,]\d+)\s+(\d+)\s+(\d+[.,]\d+[.,]\d+|\d+[.,]\d+)$',
-                    # Pattern: Description followed by numbers
-                    r'^([A-Za-zçğıöşüÇĞİÖŞÜ\s]+?(?:Hizmet|Donanım|Yazılım|Lisans).*?)\s+(\d+)\s+(ADET|KG|LT)\s+(\d+[.,]\d+)\s+(\d+)\s+(\d+[.,]\d+)$'
-                ]
-                
-                for line in lines:
-                    line = line.strip()
-                    if len(line) < 20:  # Skip short lines
-                        continue
-                    
-                    for pattern in item_patterns:
-                        match = re.match(pattern, line, re.IGNORECASE)
-                        if match:
-                            groups = match.groups()
-                            if len(groups) >= 6:
-                                item = {
-                                    'description': groups[0].strip(),
-                                    'quantity': self._clean_number(groups[1]),
-                                    'unit': groups[2].strip(),
-                                    'unit_price': self._clean_number(groups[3]),
-                                    'tax_rate': groups[4].strip(),  # Keep exact format
-                                    'amount': self._clean_number(groups[5])
-                                }
-                                
-                                # Validate item
-                                if len(item['description']) > 5 and float(item['unit_price']) > 0:
-                                    invoice_data['line_items'].append(item)
-                                    logger.info(f"Extracted text-based item: {item}")
-                
-                # If still no items found, try manual extraction for common e-invoice formats
-                if not invoice_data['line_items']:
-                    logger.info("Trying manual extraction for standard e-invoice format...")
-                    manual_items = self._manual_extract_common_items()
-                    if manual_items:
-                        invoice_data['line_items'].extend(manual_items)
-                        logger.info(f"Extracted {len(manual_items)} items using manual method")
+            # Line items are consumed as a stream of batches, each added to the item totals as it arrives
+            # (summary mode skips line items entirely)
+            item_totals = {'subtotal': 0.0, 'tax': 0.0}
+            if not self.summary:
+                for items, amounts in self._iter_item_batches():
+                    self._add_item_totals(items, amounts, item_totals)
+                    invoice_data['line_items'].extend(items)
+                logger.info(f"Extracted {len(invoice_data['line_items'])} line items")
+                logger.debug(f"VAT rate cache: {vat_cache_stats()}")
             
             # Enhanced totals extraction with multiple patterns
+            self.budget.start('totals')
             logger.info("Extracting financial totals...")
             
             # Subtotal patterns
-            subtotal_patterns = [
-                r'Mal\s+Hizmet\s+Toplam\s+Tutarı\s*:?\s*([0-9.,]+)',
-                r'MAL\s+HİZMET\s+TOPLAM\s+TUTARI\s*:?\s*([0-9.,]+)',
-                r'Ara\s+Toplam\s*:?\s*([0-9.,]+)',
-                r'ARA\s+TOPLAM\s*:?\s*([0-9.,]+)',
-                r'Subtotal\s*:?\s*([0-9.,]+)',
-                r'Net\s+Tutar\s*:?\s*([0-9.,]+)'
-            ]
-            
-            for pattern in subtotal_patterns:
-                subtotal_match = re.search(pattern, self.text_content, re.IGNORECASE)
-                if subtotal_match:
-                    invoice_data['subtotal'] = self._clean_number(subtotal_match.group(1))
-                    logger.info(f"Found subtotal: {invoice_data['subtotal']}")
-                    break
+            subtotal_match = self._search_field('subtotal', SUBTOTAL_PATTERNS, 'totals')
+            if subtotal_match:
+                invoice_data['subtotal'] = self._clean_number(subtotal_match.group(1))
+                logger.info(f"Found subtotal: {invoice_data['subtotal']}")
             
             # Tax amount patterns
-            tax_patterns = [
-                r'Hesaplanan\s+KDV\s*:?\s*([0-9.,]+)',
-                r'HESAPLANAN\s+KDV\s*:?\s*([0-9.,]+)',
-                r'KDV\s+Tutarı\s*:?\s*([0-9.,]+)',
-                r'KDV\s+TUTARI\s*:?\s*([0-9.,]+)',
-                r'Vergi\s+Tutarı\s*:?\s*([0-9.,]+)',
-                r'Tax\s+Amount\s*:?\s*([0-9.,]+)'
-            ]
-            
-            for pattern in tax_patterns:
-                tax_match = re.search(pattern, self.text_content, re.IGNORECASE)
-                if tax_match:
-                    invoice_data['tax_amount'] = self._clean_number(tax_match.group(1))
-                    logger.info(f"Found tax amount: {invoice_data['tax_amount']}")
-                    break
+            tax_match = self._search_field('tax_amount', TAX_PATTERNS, 'totals')
+            if tax_match:
+                invoice_data['tax_amount'] = self._clean_number(tax_match.group(1))
+                logger.info(f"Found tax amount: {invoice_data['tax_amount']}")
             
             # Total amount patterns
-            total_patterns = [
-                r'Vergiler\s+Dahil\s+Toplam\s+Tutar\s*:?\s*([0-9.,]+)',
-                r'VERGİLER\s+DAHİL\s+TOPLAM\s+TUTAR\s*:?\s*([0-9.,]+)',
-                r'Genel\s+Toplam\s*:?\s*([0-9.,]+)',
-                r'GENEL\s+TOPLAM\s*:?\s*([0-9.,]+)',
-                r'Total\s+Amount\s*:?\s*([0-9.,]+)',
-                r'Toplam\s*:?\s*([0-9.,]+)'
-            ]
-            
-            for pattern in total_patterns:
-                total_match = re.search(pattern, self.text_content, re.IGNORECASE)
-                if total_match:
-                    invoice_data['total_amount'] = self._clean_number(total_match.group(1))
-                    logger.info(f"Found total amount: {invoice_data['total_amount']}")
-                    break
+            total_match = self._search_field('total_amount', TOTAL_PATTERNS, 'totals')
+            if total_match:
+                invoice_data['total_amount'] = self._clean_number(total_match.group(1))
+                logger.info(f"Found total amount: {invoice_data['total_amount']}")
             
             # If totals are missing, try to calculate from line items
-            self._calculate_missing_totals(invoice_data)
+            self._calculate_missing_totals(invoice_data, item_totals)
             
             # Check for withholding tax (tevkifat)
-            withholding_match = re.search(r'Tevkifat\s*:\s*([0-9.,]+)', self.text_content)
+            withholding_match = WITHHOLDING_PATTERN.search(self.sections.get('totals'))
             if withholding_match:
                 invoice_data['withholding_tax'] = withholding_match.group(1)
             
             # Extract notes or additional information
-            notes_match = re.search(r'Not\s*:(.*?)(?=\Z)', self.text_content, re.DOTALL)
+            notes_match = NOTES_PATTERN.search(self.text_content)
             if notes_match:
                 invoice_data['notes'] = notes_match.group(1).strip()
             
+            if self.summary:
+                invoice_data['extraction_mode'] = 'summary'
+            
+            # Flag documents where a stage ran over its budget and fell back to a linear-time strategy
+            if self.budget.exceeded_stages:
+                invoice_data['timed_out_stages'] = list(self.budget.exceeded_stages)
+            
             logger.info("Invoice data extraction completed successfully")
             return invoice_data
             
@@ -590,9 +783,185 @@ class PDFExtractor:
             logger.error(f"Unexpected error during invoice data extraction: {str(e)}")
             raise Exception(f"Fatura verisi çıkarılırken beklenmeyen hata oluştu: {str(e)}")
     
+    def _extract_vendor_info(self, invoice_data):
+        """Vendor name, tax id and address from the seller section, trying the section patterns in priority order"""
+        vendor_span = None
+        vendor_scope, scope_start = self._party_scope('seller')
+        for pattern in VENDOR_SECTION_PATTERNS:
+            if self.budget.expired():
+                vendor_span = self._linear_party_span('seller')
+                break
+            vendor_section = pattern.search(vendor_scope)
+            if vendor_section:
+                if vendor_section.group(1) is not None:
+                    vendor_span = (scope_start + vendor_section.start(1), scope_start + vendor_section.end(1))
+                logger.info(f"Found vendor section with pattern: {pattern.pattern[:50]}...")
+                break
+        
+        if vendor_span is not None:
+            vendor_text = self.text_content[vendor_span[0]:vendor_span[1]]
+            vendor_lines = self.lines.slice_lines(*vendor_span)
+            
+            # Enhanced vendor name extraction
+            vendor_name = None
+            for pattern in VENDOR_NAME_PATTERNS:
+                if self.budget.expired():
+                    self._apply_linear_party_name(invoice_data, 'vendor_name', vendor_lines)
+                    break
+                vendor_name_match = pattern.search(vendor_text.strip())
+                if vendor_name_match:
+                    vendor_name = vendor_name_match.group(1).strip()
+                    # Clean up the name
+                    vendor_name = re.sub(r'\s+', ' ', vendor_name)  # Multiple spaces
+                    vendor_name = re.sub(r'^[:\-\s]+|[:\-\s]+$', '', vendor_name)  # Leading/trailing symbols
+                    
+                    if len(vendor_name) >= 5 and not re.match(r'^\d+$', vendor_name):
+                        invoice_data['vendor_name'] = vendor_name
+                        logger.info(f"Extracted vendor name: {vendor_name}")
+                        break
+            
+            # Extract vendor tax ID - Try multiple patterns
+            vendor_tax_match = re.search(r'VKN[:\s]*(\d+)', vendor_text)
+            if not vendor_tax_match:
+                vendor_tax_match = re.search(r'(\d{10,11})', vendor_text)
+            if vendor_tax_match:
+                invoice_data['vendor_tax_id'] = vendor_tax_match.group(1)
+            
+            # Extract vendor address: the most complete gazetteer address in the vendor block
+            invoice_data['vendor_address'] = self._span_address(vendor_span) or 'Türkiye'
+            logger.info(f"Vendor address extracted: {invoice_data['vendor_address']}")
+        else:
+            # Fallback: Try to extract vendor info from any part of the document
+            logger.info("No vendor section found, trying fallback methods...")
+            self._extract_vendor_fallback(invoice_data)
+    
+    def _segment(self):
+        """Locate the document regions once per extracted text, from the shared line index"""
+        if self.sections is None:
+            self.sections = segment_document(self.text_content, self.lines)
+        return self.sections
+    
+    def _search_section(self, pattern_bank, section):
+        """Search a pattern bank in one document region, widening to the whole text only if it finds nothing there
+        
+        Returns (match, scope), where scope is the region name or 'document' for the whole text.
+        """
+        section_text = self.sections.get(section)
+        match = pattern_bank.search(section_text)
+        if match is None and len(section_text) < len(self.text_content) and not self.budget.expired():
+            logger.debug(f"No {pattern_bank.name} match in {section} section, searching whole document")
+            return pattern_bank.search(self.text_content), 'document'
+        return match, section
+    
+    def _search_field(self, field, pattern_bank, section):
+        """Search one field's pattern bank, trying the vendor template's remembered pattern and region first
+        
+        The pattern and region that matched are recorded for learning the template.
+        """
+        remembered = self._template['patterns'].get(field) if self._template else None
+        if remembered:
+            scope, priority = remembered
+            text = self.text_content if scope == 'document' else self.sections.get(scope)
+            match = pattern_bank.patterns[priority].search(text)
+            if match:
+                self._pattern_hits[field] = remembered
+                return match
+            logger.info(f"Template pattern for {field} found nothing, searching all {pattern_bank.name} patterns")
+            self._template_misses.append(field)
+        
+        match, scope = self._search_section(pattern_bank, section)
+        if match:
+            self._pattern_hits[field] = [scope, match.priority]
+        return match
+    
+    def _apply_template_vendor(self, invoice_data):
+        """Take the vendor fields from the vendor template when its vendor name is in the seller section"""
+        if not self._template:
+            return False
+        vendor = self._template['vendor']
+        seller_text = ' '.join(self.sections.get('seller').split())
+        if not vendor['vendor_name'] or vendor['vendor_name'] not in seller_text:
+            logger.info("Template vendor name not found in the seller section, extracting vendor info")
+            self._template_misses.append('vendor_name')
+            return False
+        invoice_data.update(vendor)
+        logger.info(f"Vendor info taken from template: {vendor['vendor_name']}")
+        return True
+    
+    def _template_key(self):
+        """(seller tax id, layout fingerprint) of the document, or None when it cannot take part in templates"""
+        if not self.text_content.strip() or not self.pages:
+            return None
+        tax_id = vendor_tax_id(self._segment())
+        if tax_id is None:
+            return None
+        return tax_id, layout_fingerprint(self.lines.page_lines(self.pages[0]['page_number']))
+    
+    def _template_checks_pass(self, invoice_data):
+        """Checks a template-path result must pass to be accepted instead of running the full cascade"""
+        failed = []
+        if self._template_misses:
+            failed.append(f"no match for {', '.join(self._template_misses)}")
+        if not invoice_data['invoice_number'] or not invoice_data['total_amount']:
+            failed.append("missing invoice number or total")
+        if not self.summary and self._item_strategy != self._template['item_strategy']:
+            failed.append(f"line items came from the {self._item_strategy} strategy")
+        if not totals_consistent(invoice_data):
+            failed.append("subtotal + tax does not match the total")
+        if failed:
+            logger.info(f"Vendor template checks failed: {'; '.join(failed)}")
+            return False
+        return True
+    
+    def _learn_template(self, template_key, invoice_data):
+        """Store what worked on this invoice as the template for its seller and layout, if it is trustworthy"""
+        if invoice_data.get('timed_out_stages') or not totals_consistent(invoice_data):
+            return
+        if self._vendor_fields['vendor_tax_id'] != template_key[0] or not self._vendor_fields['vendor_name']:
+            return
+        if not all(field in self._pattern_hits for field in ('invoice_number', 'total_amount')):
+            return
+        
+        template = {
+            'vendor': self._vendor_fields,
+            'patterns': self._pattern_hits,
+            'item_strategy': self._item_strategy,
+            'item_table': self._item_table
+        }
+        if self._template is not None and self.summary:
+            # Summary mode reads no line items; keep what the template knows about them
+            template['item_strategy'] = self._template['item_strategy']
+            template['item_table'] = self._template['item_table']
+        if template != self._template:
+            self._pending_writes.append((self.templates.learn, (*template_key, template)))
+    
+    def _party_scope(self, party):
+        """Text the DOTALL party-section patterns run on (the party block, else the header, capped in length) and its offset"""
+        name = party if self.sections.found(party) else 'header'
+        return self.sections.get(name)[:self.MAX_DOTALL_SCOPE], getattr(self.sections, name)[0]
+    
+    def _linear_party_span(self, party):
+        """Linear-time party block: offsets of the segmenter's block without its anchor line, or None if it was not found"""
+        span = getattr(self.sections, party)
+        if span is None:
+            return None
+        anchor_line = self.lines.line_at(span[0])
+        start = self.lines.starts[anchor_line + 1] if anchor_line + 1 < len(self.lines) else span[1]
+        return min(start, span[1]), span[1]
+    
+    def _apply_linear_party_name(self, invoice_data, field, party_lines):
+        """Linear-time name fallback: the first reasonably long line of the party block"""
+        for line in party_lines:
+            name = ' '.join(line.split()).strip(':- ')
+            if len(name) >= 5 and not name.isdigit():
+                invoice_data[field] = name
+                logger.info(f"Extracted {field} with linear fallback: {name}")
+                return
+    
     def _extract_and_improve_all_addresses(self, invoice_data):
         """Comprehensive address extraction system for any e-invoice format"""
         logger.info("Starting comprehensive address extraction...")
+        self.budget.start('addresses')
         
         # Extract ALL addresses from PDF using multiple strategies
         all_addresses = self._extract_all_addresses_from_pdf()
@@ -613,9 +982,6 @@ class PDFExtractor:
                 invoice_data['customer_address'] = best_customer
                 logger.info(f"Selected customer address: {best_customer}")
         
-        # Apply fallback logic if addresses are still missing or poor
-        self._apply_fallback_addresses(invoice_data)
-        
         # Final cleanup and standardization
         if invoice_data.get('vendor_address'):
             invoice_data['vendor_address'] = self._clean_address(invoice_data['vendor_address'])
@@ -623,286 +989,58 @@ class PDFExtractor:
             invoice_data['customer_address'] = self._clean_address(invoice_data['customer_address'])
     
     def _extract_all_addresses_from_pdf(self):
-        """Extract all potential addresses using enhanced pattern matching"""
-        addresses = []
-        text_lines = self.text_content.split('\n')
-        
-        # Strategy 1: Company-specific address patterns
-        company_address_patterns = [
-            # DMO patterns
-            r'(06570\s+İnönü\s+Bulvarı.*?Yücetepe.*?ANKARA)',
-            r'(İnönü\s+Bulvarı.*?No\s*:?\s*18.*?Yücetepe.*?ANKARA)',
-            r'(Yücetepe.*?İnönü.*?Bulvarı.*?ANKARA)',
-            
-            # Eti Maden patterns
-            r'(06530\s+KIZILIRMAK\s+MAH\..*?ÇUKURAMBAR.*?ANKARA)',
-            r'(Kızılırmak\s+Mahallesi.*?1443.*?Cadde.*?Çukurambar.*?ANKARA)',
-            r'(1443\.\s*Cadde.*?Kızılırmak.*?ANKARA)',
-            
-            # Generic Turkish address patterns
-            r'(\d{5}\s+[A-ZÜĞŞIÖÇa-züğşıöç]+\s+(?:MAH|Mah|Mahallesi).*?[A-ZÜĞŞIÖÇa-züğşıöç]+)',
-            r'([A-ZÜĞŞIÖÇa-züğşıöç]+\s+(?:MAH|Mah|Mahallesi).*?\d+\.\s*(?:CADDE|Cadde|Cad).*?[A-ZÜĞŞIÖÇa-züğşıöç]+)',
-            r'([A-ZÜĞŞIÖÇa-züğşıöç]+\s+(?:BULVARI|Bulvarı|Bulvar).*?No\s*:?\s*\d+.*?[A-ZÜĞŞIÖÇa-züğşıöç]+)',
-            r'([A-ZÜĞŞIÖÇa-züğşıöç]+\s+(?:SOKAK|Sokak|Sok).*?[A-ZÜĞŞIÖÇa-züğşıöç]+)' 
-        ]
+        """Find address candidates with one gazetteer scan over the document lines, tagged with their party block
         
-        for pattern in company_address_patterns:
-            matches = re.findall(pattern, self.text_content, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                if len(match.strip()) > 15:
-                    addresses.append(match.strip())
-                    logger.info(f"Found address with pattern: {match[:50]}...")
+        The scan runs once per extracted text; the party blocks and the final address selection share its result.
+        """
+        if self.address_candidates is None:
+            self.address_candidates = self.gazetteer.scan(self.lines.lines, self.lines.folded)
+            for candidate in self.address_candidates:
+                candidate.party = self._address_party(self.lines.starts[candidate.line])
+            logger.info(f"Extracted {len(self.address_candidates)} address candidates: {self.address_candidates}")
+        return self.address_candidates
+    
+    def _span_address(self, span):
+        """Most complete gazetteer address starting inside a text span (a party block), or '' when there is none"""
+        start, end = span
+        candidates = [candidate for candidate in self._extract_all_addresses_from_pdf()
+                      if start <= self.lines.starts[candidate.line] < end]
+        if not candidates:
+            return ''
+        return max(candidates, key=lambda candidate: candidate.score).text
+    
+    def _address_party(self, offset):
+        """'vendor' or 'customer' when the text offset lies in that party's block, else None
         
-        # Strategy 2: Line-by-line analysis for other formats
-        for i, line in enumerate(text_lines):
-            line = line.strip()
-            
-            # Skip empty lines and very short lines
-            if len(line) < 10:
-                continue
-                
-            # Look for postal code + neighborhood patterns
-            if re.match(r'\d{5}\s+[A-Za-zçğıöşüÇĞİÖŞÜ]', line):
-                # Try to build complete address from this line and next few lines
-                address_parts = [line]
-                for j in range(i+1, min(i+4, len(text_lines))):
-                    next_line = text_lines[j].strip()
-                    if next_line and len(next_line) > 3 and len(next_line) < 100:
-                        # Check if this line continues the address
-                        if any(word in next_line.upper() for word in ['ANKARA', 'ISTANBUL', 'IZMIR', 'CADDE', 'SOKAK', 'BULVAR', 'MAH']):
-                            address_parts.append(next_line)
-                        elif re.match(r'^[A-Za-zçğıöşüÇĞİÖŞÜ\s/,]+$', next_line):  # Only letters and separators
-                            address_parts.append(next_line)
-                        else:
-                            break
-                    else:
-                        break
-                
-                full_address = ' '.join(address_parts)
-                if len(full_address) > 20 and any(city in full_address.upper() for city in ['ANKARA', 'ISTANBUL', 'IZMIR']):
-                    addresses.append(full_address)
-                    logger.info(f"Built address from lines: {full_address}")
-        
-        # Strategy 3: Look for company-specific address patterns
-        if 'GBA BİLİŞİM' in self.text_content:
-            gba_pattern = r'(KONUTKENT\s+MAH\..*?ÇAYYOLU.*?ANKARA)'
-            gba_match = re.search(gba_pattern, self.text_content, re.IGNORECASE | re.DOTALL)
-            if gba_match:
-                addresses.append(gba_match.group(1).strip())
-                logger.info(f"Found GBA address: {gba_match.group(1).strip()}")
-        
-        # Remove duplicates while preserving order
-        unique_addresses = []
-        for addr in addresses:
-            if addr not in unique_addresses:
-                unique_addresses.append(addr)
-        
-        logger.info(f"Extracted {len(unique_addresses)} unique addresses: {unique_addresses}")
-        return unique_addresses
+        Without a seller anchor, text above the buyer block is the seller's (the e-Arşiv layout puts
+        the seller at the top and opens the buyer block with "SAYIN").
+        """
+        if self.sections.seller and self.sections.seller[0] <= offset < self.sections.seller[1]:
+            return 'vendor'
+        if self.sections.buyer and self.sections.buyer[0] <= offset < self.sections.buyer[1]:
+            return 'customer'
+        if self.sections.seller is None and self.sections.buyer and offset < self.sections.buyer[0]:
+            return 'vendor'
+        return None
     
     def _separate_vendor_customer_addresses(self, addresses, invoice_data):
-        """Precisely separate addresses into vendor and customer based on content"""
-        vendor_addresses = []
-        customer_addresses = []
-        
-        for addr in addresses:
-            addr_lower = addr.lower()
-            
-            # Precise vendor identification
-            is_vendor = False
-            is_customer = False
-            
-            # DMO (Devlet Malzeme Ofisi) patterns - always vendor
-            if any(word in addr_lower for word in ['yücetepe', 'inönü bulvar', '06570']):
-                is_vendor = True
-                logger.info(f"Identified as VENDOR (DMO pattern): {addr}")
-            
-            # Eti Maden patterns - always customer  
-            elif any(word in addr_lower for word in ['kızılırmak', 'çukurambar', '06530', '1443']):
-                is_customer = True
-                logger.info(f"Identified as CUSTOMER (Eti Maden pattern): {addr}")
-            
-            # GBA Bilişim patterns - vendor for GBA invoices
-            elif 'konutkent' in addr_lower and 'çayyolu' in addr_lower:
-                is_vendor = True
-                logger.info(f"Identified as VENDOR (GBA pattern): {addr}")
-            
-            # General business address patterns
-            elif any(word in addr_lower for word in ['ltd', 'şti', 'a.ş', 'bilişim', 'yazılım']):
-                is_vendor = True
-                logger.info(f"Identified as VENDOR (business pattern): {addr}")
-            
-            # Assign to appropriate lists
-            if is_vendor:
-                vendor_addresses.append(addr)
-            elif is_customer:
-                customer_addresses.append(addr)
-            else:
-                # If unclear, analyze context in PDF
-                pdf_context = self._analyze_address_context(addr)
-                if pdf_context == 'vendor':
-                    vendor_addresses.append(addr)
-                elif pdf_context == 'customer':
-                    customer_addresses.append(addr)
-                else:
-                    # Last resort: add to both for scoring
-                    vendor_addresses.append(addr)
-                    customer_addresses.append(addr)
+        """Split address candidates by the party block they were found in; candidates outside both go to both"""
+        vendor_addresses = [addr for addr in addresses if addr.party != 'customer']
+        customer_addresses = [addr for addr in addresses if addr.party != 'vendor']
         
         logger.info(f"Final vendor addresses: {vendor_addresses}")
         logger.info(f"Final customer addresses: {customer_addresses}")
         
         return vendor_addresses, customer_addresses
     
-    def _analyze_address_context(self, address):
-        """Analyze where the address appears in PDF to determine if vendor or customer"""
-        lines = self.text_content.split('\n')
-        
-        for i, line in enumerate(lines):
-            if address[:20] in line:  # Check if address appears in this line
-                # Look at surrounding lines for context
-                context_lines = []
-                for j in range(max(0, i-3), min(len(lines), i+4)):
-                    context_lines.append(lines[j].lower())
-                
-                context_text = ' '.join(context_lines)
-                
-                # Vendor indicators
-                if any(word in context_text for word in ['faturalayan', 'satıcı', 'gönderen', 'vergi dairesi']):
-                    return 'vendor'
-                
-                # Customer indicators  
-                if any(word in context_text for word in ['alıcı', 'müşteri', 'sayın', 'fatura edilecek']):
-                    return 'customer'
-        
-        return 'unknown'
-    
     def _select_best_address(self, addresses, entity_type, invoice_data):
-        """Select the best address from a list of candidates"""
+        """Pick the candidate from the entity's own block with the most complete address (earliest on ties)"""
         if not addresses:
             return None
         
-        # Score addresses based on completeness and relevance
-        scored_addresses = []
-        
-        for addr in addresses:
-            score = 0
-            addr_lower = addr.lower()
-            
-            # Completeness scoring
-            if re.search(r'\d{5}', addr):  # Has postal code
-                score += 2
-            if any(word in addr_lower for word in ['mahallesi', 'mah']):  # Has neighborhood
-                score += 2
-            if any(word in addr_lower for word in ['cadde', 'sokak', 'bulvar']):  # Has street type
-                score += 2
-            if re.search(r'no[:\s]*\d+', addr_lower):  # Has street number
-                score += 2
-            if len(addr) > 30:  # Reasonable length
-                score += 1
-            
-            # Entity-specific scoring
-            if entity_type == 'vendor':
-                if any(word in addr_lower for word in ['yücetepe', 'inönü', 'devlet']):
-                    score += 3
-            elif entity_type == 'customer':
-                if any(word in addr_lower for word in ['kızılırmak', 'çukurambar', 'eti']):
-                    score += 3
-            
-            scored_addresses.append((score, addr))
-        
-        # Return the highest scored address
-        scored_addresses.sort(reverse=True)
-        best_address = scored_addresses[0][1]
-        logger.info(f"Best {entity_type} address (score: {scored_addresses[0][0]}): {best_address}")
-        
-        return best_address
-    
-    def _apply_fallback_addresses(self, invoice_data):
-        """Apply fallback addresses for known entities"""
-        # Vendor fallbacks
-        if not invoice_data.get('vendor_address') or len(invoice_data.get('vendor_address', '')) < 10:
-            if 'DEVLET MALZEME' in self.text_content:
-                invoice_data['vendor_address'] = 'İnönü Bulvarı No:18, Yücetepe, 06570 Ankara'
-                logger.info("Applied DMO fallback address")
-        
-        # Customer fallbacks  
-        if not invoice_data.get('customer_address') or len(invoice_data.get('customer_address', '')) < 10:
-            if 'ETİ MADEN' in self.text_content:
-                invoice_data['customer_address'] = 'Kızılırmak Mahallesi 1443. Cadde No:5, Çukurambar, 06530 Ankara'
-                logger.info("Applied ETİ MADEN fallback address")
-    
-    def _improve_addresses(self, invoice_data):
-        """Universal address extraction and improvement system"""
-        logger.info("Starting universal address improvement...")
-        
-        # Extract all potential addresses from the entire PDF text
-        address_patterns = [
-            r'(\d{5}\s+[A-Za-zçğıöşüÇĞİÖŞÜ\s]+(?:MAH|Mah|Mahallesi)\.?.*?(?:ANKARA|İSTANBUL|İZMİR|BURSA|ANTALYA|ADANA|KONYA))',
-            r'([A-Za-zçğıöşüÇĞİÖŞÜ\s]+(?:MAH|Mah|Mahallesi)\.?\s+\d+\.?\s*(?:CADDE|Cad|Sokak|Sok).*?(?:ANKARA|İSTANBUL|İZMİR|BURSA|ANTALYA|ADANA|KONYA))',
-            r'([A-Za-zçğıöşüÇĞİÖŞÜ\s]+(?:Bulvar|Bulvarı|Caddesi|Sokağı).*?(?:ANKARA|İSTANBUL|İZMİR|BURSA|ANTALYA|ADANA|KONYA))',
-            r'([A-Za-zçğıöşüÇĞİÖŞÜ\s]+/[A-Za-zçğıöşüÇĞİÖŞÜ\s]+(?:ANKARA|İSTANBUL|İZMİR|BURSA|ANTALYA|ADANA|KONYA))'
-        ]
-        
-        extracted_addresses = []
-        
-        for pattern in address_patterns:
-            matches = re.findall(pattern, self.text_content, re.IGNORECASE)
-            for match in matches:
-                if len(match.strip()) > 10:  # Ignore very short matches
-                    extracted_addresses.append(match.strip())
-        
-        logger.info(f"Found {len(extracted_addresses)} potential addresses: {extracted_addresses}")
-        
-        # Improve customer address
-        if not invoice_data.get('customer_address') or len(invoice_data['customer_address']) < 10:
-            # Try to find customer address from extracted addresses
-            customer_address = self._find_best_address_for_entity(extracted_addresses, 'customer', invoice_data)
-            if customer_address:
-                invoice_data['customer_address'] = customer_address
-                logger.info(f"Improved customer address: {customer_address}")
-        
-        # Improve vendor address  
-        if not invoice_data.get('vendor_address') or invoice_data['vendor_address'] == 'ANKARA':
-            vendor_address = self._find_best_address_for_entity(extracted_addresses, 'vendor', invoice_data)
-            if vendor_address:
-                invoice_data['vendor_address'] = vendor_address
-                logger.info(f"Improved vendor address: {vendor_address}")
-        
-        # Clean and standardize addresses
-        if invoice_data.get('customer_address'):
-            invoice_data['customer_address'] = self._clean_and_standardize_address(invoice_data['customer_address'])
-            
-        if invoice_data.get('vendor_address'):
-            invoice_data['vendor_address'] = self._clean_and_standardize_address(invoice_data['vendor_address'])
-    
-    def _find_best_address_for_entity(self, addresses, entity_type, invoice_data):
-        """Find the best address for a given entity (vendor/customer)"""
-        if entity_type == 'customer':
-            # Look for addresses near customer name or specific keywords
-            customer_name = invoice_data.get('customer_name', '').lower()
-            for addr in addresses:
-                # Score addresses based on context
-                if any(keyword in customer_name for keyword in ['eti', 'maden']) and 'kızılırmak' in addr.lower():
-                    return addr
-                elif 'çukurambar' in addr.lower() or 'kızılırmak' in addr.lower():
-                    return addr
-        
-        elif entity_type == 'vendor':
-            # Look for addresses near vendor name or specific keywords  
-            vendor_name = invoice_data.get('vendor_name', '').lower()
-            for addr in addresses:
-                if any(keyword in vendor_name for keyword in ['devlet', 'malzeme']) and 'yücetepe' in addr.lower():
-                    return addr
-                elif 'inönü' in addr.lower() or 'yücetepe' in addr.lower():
-                    return addr
-        
-        # Return first reasonable address if no specific match
-        for addr in addresses:
-            if len(addr) > 15:  # Reasonable length
-                return addr
-        
-        return None
+        best = max(addresses, key=lambda addr: (addr.party == entity_type, addr.score))
+        logger.info(f"Best {entity_type} address (score: {best.score}): {best.text}")
+        return best.text
     
     def _clean_address(self, address_str):
         """Clean address string by removing prefixes and fixing spacing."""
@@ -927,401 +1065,262 @@ class PDFExtractor:
 
         return address_str
 
-    def _clean_and_standardize_address(self, address):
-        """Clean and standardize address format"""
-        # Remove postal codes from the beginning
-        address = re.sub(r'^\d{5}\s+', '', address)
+    def iter_line_items(self):
+        """Yield line items as a stream, doing constant work per row
         
-        # Standardize abbreviations
-        address = re.sub(r'\bMAH\.?\b', 'Mahallesi', address, flags=re.IGNORECASE)
-        address = re.sub(r'\bCAD\.?\b', 'Caddesi', address, flags=re.IGNORECASE)
-        address = re.sub(r'\bSOK\.?\b', 'Sokağı', address, flags=re.IGNORECASE)
-        
-        # Replace / with comma for better geocoding
-        address = re.sub(r'\s*/\s*', ', ', address)
-        
-        # Clean up multiple spaces
-        address = re.sub(r'\s+', ' ', address)
-        
-        return address.strip()
+        Items come from the detected item tables; if none are found, from the word-box column layout;
+        then from text patterns (pages without word boxes). An invoice none of them reads has no items.
+        With a vendor template, the strategy that worked for the vendor before is tried first.
+        """
+        if not self.pages:
+            self.extract_pages()
+        self._segment()
+        self.budget.start('line_items')
+        
+        strategies = [
+            ('table', self._iter_table_items),
+            ('word-layout', lambda: extract_items_from_words(self._item_pages())),
+            ('text-pattern', self._iter_text_items)
+        ]
+        if self._template and self._template['item_strategy']:
+            strategies.sort(key=lambda strategy: strategy[0] != self._template['item_strategy'])
+        for name, strategy in strategies:
+            found = False
+            for item in strategy():
+                found = True
+                yield item
+            if found:
+                logger.info(f"Line items extracted with the {name} strategy")
+                self._item_strategy = name
+                return
+            logger.info(f"No line items from the {name} strategy")
     
-    def _parse_items_section(self, items_text):
-        """Parse items section with enhanced accuracy"""
-        items = []
-        lines = items_text.strip().split('\n')
-        
-        logger.info(f"Parsing items section with {len(lines)} lines")
+    def _iter_table_items(self):
+        """Yield items from the first item table, stitched across pages into one logical table
         
-        # Find header line to understand column structure
-        header_line = None
-        header_index = -1
-        
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in ['malzeme', 'hizmet', 'açıklama', 'miktar', 'fiyat', 'tutar']):
-                header_line = line
-                header_index = i
-                logger.info(f"Found header at line {i}: {line}")
-                break
-        
-        if header_index == -1:
-            logger.warning("No header line found in items section")
-            return items
-        
-        # Analyze header to understand column positions
-        column_positions = self._analyze_header_columns(header_line)
-        logger.info(f"Column positions: {column_positions}")
-        
-        # Parse data lines after header
-        for i in range(header_index + 1, len(lines)):
-            line = lines[i].strip()
-            if not line or len(line) < 5:  # Skip empty or very short lines
+        The column map of the page where the header was found is reused for the tables on the
+        following pages: a repeated identical header row is skipped without re-detecting columns,
+        and a table without any header continues the open table when it has the same column count.
+        """
+        col_map = None
+        header = None
+        table_page = None
+        table_items = 0
+        for page_number, table in self._iter_page_tables():
+            if not table:
                 continue
             
-            # Skip lines that look like separators or totals
-            if any(keyword in line.lower() for keyword in ['vergiler', 'toplam', '---', '___', 'yalnız']):
-                break
+            rows = None
+            if col_map is not None and page_number == table_page + 1 and len(table[0]) == len(header):
+                if list(table[0]) == header:
+                    rows = table[1:]
+                elif not TABLE_HEADER_KEYWORDS.search(' '.join(str(cell) for cell in table[0] if cell)):
+                    rows = table
+                if rows is not None:
+                    logger.info(f"Table on page {page_number} continues the item table from page {table_page}")
+                    table_page = page_number
             
-            # Parse the line based on column positions
-            item = self._parse_item_line(line, column_positions)
-            if item and item.get('description'):
-                items.append(item)
-                logger.info(f"Parsed item: {item}")
-        
-        return items
-    
-    def _analyze_header_columns(self, header_line):
-        """Analyze header line to determine column positions"""
-        column_positions = {}
-        header_lower = header_line.lower()
-        
-        # Common column keywords and their mappings
-        column_keywords = {
-            'description': ['malzeme', 'hizmet', 'açıklama', 'description', 'item'],
-            'quantity': ['miktar', 'adet', 'quantity', 'qty'],
-            'unit': ['birim', 'unit', 'ölçü'],
-            'unit_price': ['birim fiyat', 'fiyat', 'price', 'unit price'],
-            'tax_rate': ['kdv', 'vergi', 'tax', '%'],
-            'amount': ['tutar', 'toplam', 'amount', 'total']
-        }
-        
-        for field, keywords in column_keywords.items():
-            for keyword in keywords:
-                pos = header_lower.find(keyword)
-                if pos != -1:
-                    column_positions[field] = pos
-                    break
+            if rows is None:
+                if table_items:
+                    break  # Found good table, stop processing others
+                if len(table) < 2:
+                    continue
+                known_table = self._template['item_table'] if self._template else None
+                if known_table and list(table[0]) == known_table['header']:
+                    # Same header row as the vendor's learned table: reuse its column map
+                    header_row_idx, col_map = 0, dict(known_table['columns'])
+                else:
+                    header_row_idx, col_map = self._table_column_map(table)
+                if header_row_idx == -1:
+                    logger.warning(f"No header row found in table on page {page_number}")
+                    col_map = None
+                    continue
+                logger.info(f"Item table header on page {page_number} at row {header_row_idx}, column mapping: {col_map}")
+                header = list(table[header_row_idx])
+                self._item_table = {'header': header, 'columns': col_map}
+                table_page = page_number
+                rows = table[header_row_idx + 1:]
+            
+            for item in self._iter_table_rows(rows, list(col_map.items())):
+                table_items += 1
+                yield item
         
-        return column_positions
+        if table_items:
+            logger.info(f"Extracted {table_items} items from the item table")
     
-    def _parse_item_line(self, line, column_positions):
-        """Parse a single item line based on column positions"""
-        item = {}
-        
-        # Try pattern-based extraction first
-        patterns = [
-            # Pattern: Description Quantity Unit UnitPrice %Tax Amount
-            r'^(.+?)\s+(\d+(?:[,.]\d+)?)\s+(\w+)\s+(\d+(?:[,.]\d+)?)\s*%?(\d+(?:[,.]\d+)?)\s+(\d+(?:[,.]\d+)?)$',
-            # Pattern: No Description Quantity Unit UnitPrice %Tax Amount  
-            r'^\d+\s+(.+?)\s+(\d+(?:[,.]\d+)?)\s+(\w+)\s+(\d+(?:[,.]\d+)?)\s*%?(\d+(?:[,.]\d+)?)\s+(\d+(?:[,.]\d+)?)$',
-            # Pattern: Description Amount (simplified)
-            r'^(.+?)\s+(\d+(?:[,.]\d+)?)$'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, line.strip())
-            if match:
-                groups = match.groups()
-                if len(groups) >= 6:  # Full pattern
-                    item = {
-                        'description': groups[0].strip(),
-                        'quantity': self._clean_number(groups[1]),
-                        'unit': groups[2].strip(),
-                        'unit_price': self._clean_number(groups[3]),
-                        'tax_rate': self._clean_number(groups[4]),
-                        'amount': self._clean_number(groups[5])
-                    }
-                elif len(groups) >= 2:  # Simplified pattern
-                    item = {
-                        'description': groups[0].strip(),
-                        'amount': self._clean_number(groups[1]),
-                        'quantity': '1',
-                        'unit': 'ADET',
-                        'unit_price': self._clean_number(groups[1]),
-                        'tax_rate': '18'
-                    }
-                break
-        
-        # If pattern matching failed, try position-based extraction
-        if not item and column_positions:
-            item = self._extract_by_positions(line, column_positions)
-        
-        # Validate and clean the item
-        if item:
-            item = self._validate_and_clean_item(item)
-        
-        return item
+    def _iter_page_tables(self):
+        """Yield (page_number, table) for every detected table in page order"""
+        for page_result in self._item_pages():
+            for table in page_result['tables']:
+                yield page_result['page_number'], table
     
-    def _extract_by_positions(self, line, column_positions):
-        """Extract item data based on column positions"""
-        item = {}
+    @staticmethod
+    def _iter_table_rows(rows, columns):
+        """Yield an item for each data row, given (field, column index) pairs"""
+        for row in rows:
+            if not row:
+                continue
+            
+            item = {}
+            for field, col_idx in columns:
+                if col_idx < len(row) and row[col_idx]:
+                    value = str(row[col_idx]).strip()
+                    if value:
+                        item[field] = value
+            
+            # Keep rows with a real description that is not a repeated header
+            description = item.get('description', '')
+            if len(description) <= 3 or ITEM_HEADER_WORDS.search(casefold_tr(description)):
+                continue
+            if not item.get('quantity'):
+                item['quantity'] = '1'
+            if not item.get('unit'):
+                item['unit'] = 'ADET'
+            # Keep tax_rate exactly as extracted, no normalization
+            if not item.get('tax_rate'):
+                item['tax_rate'] = ''  # Leave empty if not found
+            yield item
+    
+    @staticmethod
+    def _table_column_map(table):
+        """Find the item header row of a table and map item fields to column indexes
         
-        # This is a simplified position-based extraction
-        # In a real implementation, you would need more sophisticated column detection
-        parts = line.split()
+        Returns (header_row_idx, col_map), with header_row_idx -1 when the table has no item header.
+        """
+        header_row_idx = -1
+        for i, row in enumerate(table):
+            if not row:
+                continue
+            row_text = ' '.join([str(cell) for cell in row if cell])
+            if TABLE_HEADER_KEYWORDS.search(row_text):
+                header_row_idx = i
+                break
         
-        if len(parts) >= 2:
-            # Assume last part is amount, first parts are description
-            item['amount'] = self._clean_number(parts[-1])
-            item['description'] = ' '.join(parts[:-1])
-            item['quantity'] = '1'
-            item['unit'] = 'ADET'
-            item['unit_price'] = item['amount']
-            item['tax_rate'] = '18'
+        if header_row_idx == -1:
+            return -1, {}
         
-        return item
+        # Create column mapping with Turkish character handling
+        col_map = {}
+        for i, col_name in enumerate(table[header_row_idx]):
+            if not col_name:
+                continue
+            # Both folds of "I" ("BIRIM" is "bırım" to casefold_tr), each with corrupted Turkish characters repaired
+            found = set()
+            for col_name_folded in (casefold_tr(str(col_name)), str(col_name).lower()):
+                found |= TABLE_COLUMN_KEYWORDS.classes(col_name_folded.replace('n', 'ı').replace('ç', 'c'))
+            
+            if 'description' in found:
+                col_map['description'] = i
+            elif 'quantity' in found:
+                col_map['quantity'] = i
+            elif 'unit' in found and 'price' not in found:
+                col_map['unit'] = i
+            elif 'price' in found:
+                col_map['unit_price'] = i
+            elif 'tax_rate' in found:
+                col_map['tax_rate'] = i
+            elif 'amount' in found:
+                col_map['amount'] = i
+        
+        return header_row_idx, col_map
     
-    def _extract_items_alternative_method(self):
-        """Alternative method to extract items when standard parsing fails"""
-        items = []
-        
-        # Look for any line that contains both text and numbers
-        lines = self.text_content.split('\n')
-        
-        for line in lines:
+    def _iter_text_items(self):
+        """Yield items matched by the text line patterns in the item table region"""
+        for line in self._item_lines():
+            if self.budget.expired():
+                break
             line = line.strip()
-            if len(line) < 10:  # Skip short lines
+            if len(line) < 20:  # Skip short lines
                 continue
             
-            # Look for lines with description + amount pattern
-            if re.search(r'[A-Za-zçğıöşüÇĞİÖŞÜ].+\d+[,.]\d+', line):
-                # Try to extract description and amount
-                match = re.search(r'^(.+?)\s+(\d+[,.]\d+)$', line)
+            for pattern in TEXT_ITEM_PATTERNS:
+                match = pattern.match(line)
                 if match:
-                    description = match.group(1).strip()
-                    amount = self._clean_number(match.group(2))
-                    
-                    # Skip if description looks like a header or total
-                    if any(keyword in description.lower() for keyword in 
-                           ['malzeme', 'hizmet', 'toplam', 'vergiler', 'kdv']):
-                        continue
-                    
-                    item = {
-                        'description': description,
-                        'amount': amount,
-                        'quantity': '1',
-                        'unit': 'ADET',
-                        'unit_price': amount,
-                        'tax_rate': '18'
-                    }
-                    items.append(item)
-        
-        return items
+                    groups = match.groups()
+                    if len(groups) >= 6:
+                        item = {
+                            'description': groups[0].strip(),
+                            'quantity': self._clean_number(groups[1]),
+                            'unit': groups[2].strip(),
+                            'unit_price': self._clean_number(groups[3]),
+                            'tax_rate': groups[4].strip(),  # Keep exact format
+                            'amount': self._clean_number(groups[5])
+                        }
+                        
+                        # Validate item
+                        if len(item['description']) > 5 and float(item['unit_price']) > 0:
+                            yield item
     
-    def _parse_vat_rate(self, vat_str, default_rate='18'):
-        """
-        Parse VAT rate from various formats and prevent absurd values
-        
-        Handles formats like:
-        - "18%", "%18", "KDV %18", "VAT 18%", "Value Added Tax: 20%", etc.
-        - Prevents absurd values like 510% from incorrect parsing
+    def _item_lines(self):
+        """Lines of the item table region
         
-        Args:
-            vat_str: The VAT string to parse
-            default_rate: Default VAT rate to use if parsing fails (default: '18')
-            
-        Returns:
-            A string representation of the VAT rate as a number (e.g., '18', '20', '8.5')
+        In low-memory mode the lines are read page by page from _item_pages: from the first item header
+        line (the first line, when the kept pages have no item header) up to the totals region.
         """
-        if not vat_str:
-            return default_rate
-        
-        # Convert to string if not already
-        vat_str = str(vat_str).strip()
-        logger.debug(f"Parsing VAT from: '{vat_str}'")
-        
-        # Quick check for negative values
-        if '-' in vat_str:
-            logger.warning(f"Negative VAT rate detected in '{vat_str}', using default")
-            return default_rate
-        
-        # First, try to find a percentage pattern (exclude negative numbers)
-        percentage_patterns = [
-            # Common VAT patterns with percentages - exclude negative values
-            r'(?:KDV|VAT|Tax)?\s*[:%=]?\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)\s*%',  # KDV: 18%, VAT: 18%, Tax: 18%
-            r'(?:KDV|VAT|Tax)?\s*%\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)',  # KDV %18, VAT %18, %18
-            r'^(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)\s*%$',  # 18%, 8.5% (start to end, no negatives)
-            r'^%\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)$',  # %18, %8.5 (start to end, no negatives)
-            r'(?:KDV|VAT|Tax)?\s*(?:rate|oran|oranı)?\s*[:%=]?\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)',  # KDV rate: 18, VAT rate: 18
-            r'^(?:KDV|VAT|Tax)?\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)$'  # KDV 18, VAT 18, just 18 (start to end, no negatives)
-        ]
-        
-        for pattern in percentage_patterns:
-            match = re.search(pattern, vat_str, re.IGNORECASE)
-            if match:
-                vat_value = match.group(1).replace(',', '.')
-                # Check for negative values before conversion
-                if vat_value.startswith('-'):
-                    logger.warning(f"Negative VAT rate detected in '{vat_str}', using default")
-                    return default_rate
-                try:
-                    vat_float = float(vat_value)
-                    # Sanity check - VAT rates are typically between 1-30%
-                    if 1 <= vat_float <= 30:
-                        logger.debug(f"Successfully parsed VAT rate '{vat_str}' as {vat_float}%")
-                        return str(vat_float)
-                    elif vat_float == 0:
-                        logger.warning(f"Zero VAT rate detected, using default")
-                        return default_rate
-                    elif vat_float < 0:
-                        logger.warning(f"Negative VAT rate detected, using default")
-                        return default_rate
-                    elif vat_float > 30:
-                        # For very high values like 510%, default to standard rate
-                        if vat_float >= 100:
-                            logger.warning(f"Parsed VAT rate '{vat_str}' as {vat_float}%, which is absurd. Using default.")
-                            return default_rate
-                        # Check if it's a common error case that can be corrected (only for values 31-99)
-                        elif 31 <= vat_float < 100:
-                            logger.warning(f"Parsed VAT rate '{vat_str}' as {vat_float}%, which seems too high. Using default.")
-                            return default_rate
-                        else:
-                            logger.warning(f"Parsed VAT rate '{vat_str}' as {vat_float}%, which seems unreasonable. Using default.")
-                            return default_rate
-                except ValueError:
-                    logger.warning(f"Failed to convert matched VAT value '{vat_value}' to float")
-        
-        # If we get here, try a more generic approach with number cleaning
-        cleaned_vat = self._clean_number(vat_str.replace('%', ''))
+        if not self._streams_items():
+            first, end = self.lines.line_range(self.sections.items)
+            yield from self.lines.lines[first:end]
+            return
         
-        try:
-            vat_float = float(cleaned_vat)
-            
-            # Handle common parsing errors
-            if vat_float > 100:
-                # Could be a case where "18%" was parsed as 1800 (percentage sign treated as 00)
-                if 1000 <= vat_float <= 3000:
-                    corrected = vat_float / 100
-                    logger.info(f"Correcting likely VAT parsing error: {vat_float}% -> {corrected}%")
-                    return str(corrected)
-                # Could be a case where "18" was parsed as 180 (extra 0 added)
-                elif 100 <= vat_float < 1000:
-                    corrected = vat_float / 10
-                    logger.info(f"Correcting likely VAT parsing error: {vat_float}% -> {corrected}%")
-                    return str(corrected)
-                # Could be a case where "18" was parsed as 1800 (two extra 0s added)
-                elif vat_float >= 1000:
-                    possible_correction = vat_float / 100
-                    if possible_correction <= 30:  # Common VAT range
-                        logger.info(f"Correcting likely VAT parsing error: {vat_float}% -> {possible_correction}%")
-                        return str(possible_correction)
-                    else:
-                        logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is out of reasonable range, using default")
-                        return default_rate
-                else:
-                    logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is out of reasonable range, using default")
-                    return default_rate
-            elif vat_float <= 0:
-                logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is non-positive, using default")
-                return default_rate
-            else:
-                # Final sanity check
-                if vat_float > 30:
-                    logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is unusually high, using default")
-                    return default_rate
-                elif 1 <= vat_float <= 30:
-                    return str(vat_float)
-                else:
-                    # Edge case: 0 < vat_float < 1
-                    logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is too low, using default")
-                    return default_rate
-        except ValueError:
-            logger.warning(f"Could not parse VAT rate '{vat_str}', using default")
-            return default_rate
-
+        totals_position = None
+        if self.sections.totals:
+            totals_line = self.lines.line_at(self.sections.totals[0])
+            totals_page = self.lines.pages[totals_line]
+            totals_position = (totals_page, totals_line - self.lines.pages.index(totals_page))
+        in_items = not self.sections.found('items')
+        for page_result in self._item_pages():
+            for line_number, line in enumerate(page_result['text'].split('\n')):
+                if (page_result['page_number'], line_number) == totals_position:
+                    return
+                if not in_items and ITEM_HEADER_ANCHOR.search(line):
+                    in_items = True
+                if in_items:
+                    yield line
+    
+    def _parse_vat_rate(self, vat_str, default_rate='18'):
+        """Parse a VAT rate ("%18", "KDV %20", "18") to a number string, default_rate when absent or absurd"""
+        return parse_vat_rate(vat_str, default_rate)
+    
     def _clean_number(self, number_str):
         """Clean and standardize Turkish number format"""
-        if not number_str:
-            return '0'
-        
-        # Convert to string if not already
-        number_str = str(number_str).strip()
-        
-        # Remove currency symbols
-        number_str = number_str.replace('₺', '').replace('TL', '').replace('$', '').replace('€', '').strip()
-        
-        # Handle Turkish number format: 15.000,00 (thousands separator = dot, decimal = comma)
-        if '.' in number_str and ',' in number_str:
-            # Pattern: 15.000,00 or 1.234.567,89
-            parts = number_str.split(',')
-            if len(parts) == 2 and len(parts[1]) <= 2:  # Valid decimal part
-                # Remove thousand separators (dots) from integer part
-                integer_part = parts[0].replace('.', '')
-                decimal_part = parts[1]
-                number_str = f"{integer_part}.{decimal_part}"
-            else:
-                # Just replace comma with dot
-                number_str = number_str.replace(',', '.')
-        elif ',' in number_str and '.' not in number_str:
-            # Pattern: 1234,56 (only decimal comma)
-            number_str = number_str.replace(',', '.')
-        elif '.' in number_str and ',' not in number_str:
-            # Check if it's likely a thousands separator or decimal point
-            dot_pos = number_str.rfind('.')
-            after_dot = number_str[dot_pos+1:]
-            if len(after_dot) == 3 and after_dot.isdigit():
-                # Likely thousands separator: 15.000 -> 15000
-                number_str = number_str.replace('.', '')
-            # else: assume decimal point
-        
-        # Remove any remaining non-numeric characters except dots
-        cleaned = re.sub(r'[^\d.]', '', number_str)
-        
-        # Handle multiple decimal points (keep only the last one)
-        if cleaned.count('.') > 1:
-            parts = cleaned.split('.')
-            cleaned = ''.join(parts[:-1]) + '.' + parts[-1]
-        
-        # Ensure we have a valid number
-        try:
-            float_val = float(cleaned)
-            return str(float_val)  # Normalize format with dot as decimal separator
-        except ValueError:
-            logger.warning(f"Could not parse number '{number_str}' -> '{cleaned}'")
-            return '0'
-    
-    def _validate_and_clean_item(self, item):
-        """Validate and clean item data"""
-        if not item or not item.get('description'):
-            return None
-        
-        # Clean description
-        item['description'] = item['description'].strip()
-        
-        # Keep values exactly as extracted - no cleaning or normalization
-        # Only strip whitespace for consistency
-        for field in ['description', 'quantity', 'unit_price', 'tax_rate', 'amount']:
-            if field in item and item[field]:
-                item[field] = str(item[field]).strip()
-        
-        # Don't set defaults - leave empty if not found on invoice
-        # Only set quantity to 1 if completely missing (common assumption)
-        if not item.get('quantity'):
-            item['quantity'] = '1'
-        
-        # Calculate amount if missing
-        if not item.get('amount') and item.get('quantity') and item.get('unit_price'):
-            try:
-                qty = float(item['quantity'])
-                price = float(item['unit_price'])
-                item['amount'] = str(qty * price)
-            except:
-                pass
+        return clean_number(number_str)
+    
+    def _iter_item_batches(self):
+        """Yield the line item stream as (items, amounts) batches of up to ITEM_BATCH_ROWS items"""
+        line_items = self.iter_line_items()
+        while True:
+            items = list(islice(line_items, self.ITEM_BATCH_ROWS))
+            if not items:
+                return
+            yield items, self._item_amounts(items)
+    
+    @staticmethod
+    def _item_amounts(items):
+        """Amounts of a batch of items as floats, parsing the amount column once
         
-        return item
+        Items without an amount get quantity * unit price, from the unit price and quantity columns
+        of just those items.
+        """
+        amounts = parse_numbers([item.get('amount') for item in items])
+        missing = [index for index, amount in enumerate(amounts) if amount == 0]
+        if missing:
+            unit_prices = parse_numbers([items[index].get('unit_price') for index in missing])
+            quantities = parse_numbers([items[index].get('quantity', '1') for index in missing])
+            for index, unit_price, quantity in zip(missing, unit_prices, quantities):
+                if unit_price > 0:
+                    amounts[index] = quantity * unit_price
+                    items[index]['amount'] = str(amounts[index])
+        return amounts
+    
+    def _add_item_totals(self, items, amounts, item_totals):
+        """Add a batch of items' parsed amounts and their tax to item_totals ({'subtotal', 'tax'})"""
+        for item, amount in zip(items, amounts):
+            tax_rate = float(self._parse_vat_rate(item.get('tax_rate', '18')))
+            item_totals['subtotal'] += amount
+            item_totals['tax'] += amount * (tax_rate / 100)
     
-    def _calculate_missing_totals(self, invoice_data):
-        """Calculate missing totals from line items"""
+    def _calculate_missing_totals(self, invoice_data, item_totals):
+        """Fill in missing totals from the line items' summed amounts and tax (item_totals)"""
         logger.info("Calculating missing totals from line items...")
         
         line_items = invoice_data.get('line_items', [])
@@ -1329,32 +1328,8 @@ class PDFExtractor:
             logger.warning("No line items available for total calculation")
             return
         
-        calculated_subtotal = 0
-        calculated_tax = 0
-        
-        for item in line_items:
-            try:
-                # Get item values using cleaned numbers
-                quantity = float(self._clean_number(item.get('quantity', '1')))
-                unit_price = float(self._clean_number(item.get('unit_price', '0')))
-                tax_rate = float(self._parse_vat_rate(item.get('tax_rate', '18')))
-                amount = float(self._clean_number(item.get('amount', '0')))
-                
-                # If amount is missing, calculate it
-                if amount == 0 and unit_price > 0:
-                    amount = quantity * unit_price
-                    item['amount'] = str(amount)
-                
-                # Add to subtotal
-                calculated_subtotal += amount
-                
-                # Calculate tax for this item
-                item_tax = amount * (tax_rate / 100)
-                calculated_tax += item_tax
-                
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Error calculating totals for item {item}: {e}")
-                continue
+        calculated_subtotal = item_totals['subtotal']
+        calculated_tax = item_totals['tax']
         
         # Update missing totals
         if not invoice_data.get('subtotal') or float(invoice_data.get('subtotal', '0')) == 0:
@@ -1392,59 +1367,6 @@ class PDFExtractor:
         except (ValueError, TypeError) as e:
             logger.warning(f"Error validating totals consistency: {e}")
     
-    def _manual_extract_common_items(self):
-        """Manual extraction for common e-invoice item patterns"""
-        items = []
-        
-        # Common patterns for Turkish e-invoices
-        common_items = [
-            {
-                'patterns': [
-                    r'Bilgisayar.*?Donanım.*?Hizmet',
-                    r'bilgisayar.*?donanım.*?hizmet'
-                ],
-                'description': 'Bilgisayar Donanım Hizmetleri',
-                'unit_price': '15000.00',
-                'quantity': '1',
-                'unit': 'ADET',
-                'tax_rate': '18'
-            },
-            {
-                'patterns': [
-                    r'Yazılım.*?Lisans.*?Hizmet',
-                    r'yazılım.*?lisans.*?hizmet'
-                ],
-                'description': 'Yazılım Lisans Hizmetleri', 
-                'unit_price': '7500.00',
-                'quantity': '2',
-                'unit': 'ADET',
-                'tax_rate': '18'
-            }
-        ]
-        
-        # Search for these patterns in text
-        for item_template in common_items:
-            for pattern in item_template['patterns']:
-                if re.search(pattern, self.text_content, re.IGNORECASE):
-                    # Calculate amount
-                    qty = float(item_template['quantity'])
-                    price = float(item_template['unit_price'])
-                    amount = qty * price
-                    
-                    item = {
-                        'description': item_template['description'],
-                        'quantity': item_template['quantity'],
-                        'unit': item_template['unit'],
-                        'unit_price': item_template['unit_price'],
-                        'tax_rate': item_template['tax_rate'],
-                        'amount': str(amount)
-                    }
-                    items.append(item)
-                    logger.info(f"Found common item pattern: {item['description']}")
-                    break
-        
-        return items
-    
     def _extract_vendor_fallback(self, invoice_data):
         """Fallback method to extract vendor information from anywhere in the document"""
         # Common vendor patterns to search throughout the document
@@ -1471,12 +1393,8 @@ class PDFExtractor:
             invoice_data['vendor_tax_id'] = vkn_matches[0]  # First VKN is usually vendor
             logger.info(f"Fallback extracted vendor VKN: {vkn_matches[0]}")
         
-        # Set fallback address based on detected company
         if not invoice_data.get('vendor_address'):
-            if 'DEVLET MALZEME' in self.text_content:
-                invoice_data['vendor_address'] = 'İnönü Bulvarı No:18, Yücetepe, 06570 Ankara'
-            else:
-                invoice_data['vendor_address'] = 'Türkiye'
+            invoice_data['vendor_address'] = 'Türkiye'
     
     def _extract_customer_fallback(self, invoice_data):
         """Fallback method to extract customer information from anywhere in the document"""
@@ -1506,9 +1424,5 @@ class PDFExtractor:
             invoice_data['customer_tax_id'] = vkn_matches[1]  # Second VKN is usually customer
             logger.info(f"Fallback extracted customer VKN: {vkn_matches[1]}")
         
-        # Set fallback address based on detected company
         if not invoice_data.get('customer_address'):
-            if 'ETİ MADEN' in self.text_content:
-                invoice_data['customer_address'] = 'Kızılırmak Mahallesi 1443. Cadde No:5, Çukurambar, 06530 Ankara'
-            else:
-                invoice_data['customer_address'] = 'Türkiye'
+            invoice_data['customer_address'] = 'Türkiye'
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The application modules live flat in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
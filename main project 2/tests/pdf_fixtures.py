@@ -0,0 +1,132 @@
+"""Minimal invoice PDFs for the tests, written directly so no PDF library is needed"""
+
+# Column x positions and titles of the item table
+ITEM_COLUMNS = [(40, 'Mal Hizmet'), (260, 'Miktar'), (310, 'Birim'), (360, 'Birim Fiyat'), (440, 'KDV %'), (500, 'Tutar')]
+
+HEADER_LINES = [
+    'SATICI:', 'ORNEK BILISIM LTD. STI.', 'VKN: 1234567890',
+    '06800 KONUTKENT MAH. 3028 CADDE No:16 CANKAYA / ANKARA',
+    'Fatura No: ABC2024000123', 'Fatura Tarihi: 15.03.2024',
+    'ALICI:', 'DENEME ANONIM SIRKETI', 'VKN: 3850001234'
+]
+
+TOTALS_LINES = ['Mal Hizmet Toplam Tutari: 1.000,00', 'Hesaplanan KDV: 200,00', 'Vergiler Dahil Toplam Tutar: 1.200,00']
+
+def _text(x, y, text):
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return f"BT /F1 9 Tf {x} {y} Td ({escaped}) Tj ET"
+
+def _line(x0, y0, x1, y1):
+    return f"{x0} {y0} m {x1} {y1} l S"
+
+# Columns of a bank account table, a table without item header keywords
+BANK_COLUMNS = [(40, 'Banka'), (260, 'Sube'), (310, 'Hesap'), (360, 'IBAN'), (440, 'Doviz'), (500, 'Not')]
+BANK_ROWS = [['Ziraat Bankasi', 'Kizilay', '12345', 'TR12 0001', 'TRY', 'Ana hesap'],
+             ['Halk Bankasi', 'Ulus', '67890', 'TR34 0002', 'EUR', 'Doviz hesabi']]
+
+def _table(ops, y, columns, rows):
+    """Append a ruled table with a title row at y (None: no title row) and return the y below it"""
+    top = y + 10
+    if columns is not None:
+        for x, title in columns:
+            ops.append(_text(x, y, title))
+        ops.append(_line(38, y + 10, 570, y + 10))
+        ops.append(_line(38, y - 4, 570, y - 4))
+        y -= 16
+    else:
+        ops.append(_line(38, y + 10, 570, y + 10))
+    for row in rows:
+        for (x, _), value in zip(ITEM_COLUMNS, row):
+            ops.append(_text(x, y, value))
+        ops.append(_line(38, y - 4, 570, y - 4))
+        y -= 14
+    for x in [x for x, _ in ITEM_COLUMNS] + [572]:
+        ops.append(_line(x - 2, y + 10, x - 2, top))
+    return y
+
+def _item_rows(first_number, count):
+    return [[f'Hizmet kalemi {number}', '2', 'ADET', '1.250,50', '%20', '2.501,00']
+            for number in range(first_number, first_number + count)]
+
+def _page_content(page_index, page_count, rows_per_page, repeat_header=True):
+    ops = []
+    y = 800
+    if page_index == 0:
+        for line in HEADER_LINES:
+            ops.append(_text(40, y, line))
+            y -= 14
+    y -= 10
+    columns = ITEM_COLUMNS if page_index == 0 or repeat_header else None
+    y = _table(ops, y, columns, _item_rows(page_index * rows_per_page + 1, rows_per_page))
+    if page_index == page_count - 1:
+        y -= 20
+        for line in TOTALS_LINES:
+            ops.append(_text(300, y, line))
+            y -= 14
+    return ops
+
+def _content(ops):
+    return ('\n'.join(ops) + '\n').encode('latin-1')
+
+def write_pdf(path, page_contents):
+    """Write an A4 PDF with one page per content stream (bytes) in page_contents"""
+    page_count = len(page_contents)
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        ('<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            ' '.join(f'{4 + 2 * index} 0 R' for index in range(page_count)), page_count)).encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>'
+    ]
+    for index, content in enumerate(page_contents):
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * index} 0 R >>'.encode())
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+        xref = f.tell()
+        f.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b'%010d 00000 n \n' % offset)
+        f.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return path
+
+def write_invoice_pdf(path, page_count, rows_per_page=3, repeat_header=True):
+    """Write an A4 invoice whose item table runs over page_count pages, rows_per_page rows each
+
+    With repeat_header=False only the first page has the table's title row.
+    """
+    return write_pdf(path, [_content(_page_content(index, page_count, rows_per_page, repeat_header))
+                            for index in range(page_count)])
+
+def write_closed_table_pdf(path, rows=3):
+    """Write a two-page invoice whose item table and totals end on the first page, followed by a
+    bank account table (same column count, no item header keywords) on the second page"""
+    first_page = []
+    y = 800
+    for line in HEADER_LINES:
+        first_page.append(_text(40, y, line))
+        y -= 14
+    y = _table(first_page, y - 10, ITEM_COLUMNS, _item_rows(1, rows)) - 20
+    for line in TOTALS_LINES:
+        first_page.append(_text(300, y, line))
+        y -= 14
+
+    second_page = []
+    _table(second_page, 800, BANK_COLUMNS, BANK_ROWS)
+    return write_pdf(path, [_content(first_page), _content(second_page)])
+
+def write_text_invoice_pdf(path, body_lines, header_lines=HEADER_LINES):
+    """Write a one-page invoice with the header, body_lines in place of an item table, and the totals"""
+    ops = []
+    y = 800
+    for line in header_lines + [''] + body_lines + [''] + TOTALS_LINES:
+        if line:
+            ops.append(_text(40, y, line))
+        y -= 14
+    return write_pdf(path, [_content(ops)])
@@ -0,0 +1,53 @@
+import logging
+
+from address_gazetteer import Gazetteer, default_gazetteer, fold
+from pdf_extractor import PDFExtractor
+from pdf_fixtures import write_text_invoice_pdf
+
+logging.disable(logging.CRITICAL)
+
+def party_lines(seller_address, buyer_address):
+    return ['SATICI:', 'ORNEK BILISIM LTD. STI.', 'VKN: 1234567890', *seller_address,
+            'Fatura No: ABC2024000123', 'Fatura Tarihi: 15.03.2024',
+            'ALICI:', 'DENEME ANONIM SIRKETI', 'VKN: 3850001234', *buyer_address]
+
+def test_gazetteer_loads_every_province_and_alias():
+    gazetteer = default_gazetteer()
+
+    assert len(gazetteer.provinces) == 81
+    assert gazetteer.postal_area('61030') == 'Trabzon'
+    assert gazetteer.match_name([fold('Urfa')], 0) == ('province', 'Şanlıurfa', 1)
+    assert gazetteer.match_name([fold('İÇEL')], 0) == ('province', 'Mersin', 1)
+
+def test_gazetteer_load_reads_a_file(tmp_path):
+    path = tmp_path / 'gazetteer.json'
+    path.write_text('{"provinces": {"61": "Trabzon"}, "districts": {"Trabzon": ["Ortahisar"]}}', encoding='utf-8')
+    gazetteer = Gazetteer.load(str(path))
+
+    assert gazetteer.line_components('ORTAHISAR / TRABZON') == {'district': 'Trabzon/Ortahisar', 'province': 'Trabzon'}
+    assert gazetteer.match_name([fold('Ankara')], 0) is None
+
+def test_gazetteer_scan_joins_address_lines():
+    lines = ['ORNEK BILISIM LTD. STI.', '61030 KALKINMA MAH. 12 SOKAK No:4', 'ORTAHISAR / TRABZON', 'Fatura No: 12']
+    candidates = default_gazetteer().scan(lines)
+
+    assert len(candidates) == 1
+    assert candidates[0].line == 1
+    assert candidates[0].text == '61030 KALKINMA MAH. 12 SOKAK No:4 ORTAHISAR / TRABZON'
+    assert candidates[0].components['postal_code'] == '61030'
+    assert candidates[0].components['province'] == 'Trabzon'
+
+def test_party_addresses_outside_the_largest_cities(tmp_path):
+    header = party_lines(['61030 KALKINMA MAH. 12 SOKAK No:4 ORTAHISAR / TRABZON'],
+                         ['38010 SAHABIYE MAH. ATATURK BULVARI No:21 KOCASINAN / KAYSERI'])
+    invoice_data = PDFExtractor(write_text_invoice_pdf(str(tmp_path / 'invoice.pdf'), [], header)).extract_invoice_data()
+
+    assert invoice_data['vendor_address'] == '61030 KALKINMA MAH. 12 SOKAK No:4 ORTAHISAR / TRABZON'
+    assert invoice_data['customer_address'] == '38010 SAHABIYE MAH. ATATURK BULVARI No:21 KOCASINAN / KAYSERI'
+
+def test_party_block_without_an_address(tmp_path):
+    header = party_lines([], [])
+    invoice_data = PDFExtractor(write_text_invoice_pdf(str(tmp_path / 'invoice.pdf'), [], header)).extract_invoice_data()
+
+    assert invoice_data['vendor_address'] == 'Türkiye'
+    assert invoice_data['customer_address'] == 'Türkiye'
@@ -0,0 +1,23 @@
+import pytest
+
+from item_layout import classify_label
+from pdf_extractor import PDFExtractor
+
+# The same item table header in Turkish letters, in Turkish capitals and in ASCII capitals
+HEADERS = [
+    ['Mal Hizmet', 'Miktar', 'Birim', 'Birim Fiyat', 'KDV Oranı', 'Tutar'],
+    ['MAL HİZMET', 'MİKTAR', 'BİRİM', 'BİRİM FİYAT', 'KDV ORANI', 'TUTAR'],
+    ['MAL HIZMET', 'MIKTAR', 'BIRIM', 'BIRIM FIYAT', 'KDV ORANI', 'TUTAR']
+]
+
+@pytest.mark.parametrize('header', HEADERS)
+def test_table_column_map_maps_every_column(header):
+    header_row_idx, col_map = PDFExtractor._table_column_map([header, ['Hizmet', '1', 'ADET', '10,00', '%20', '10,00']])
+
+    assert header_row_idx == 0
+    assert col_map == {'description': 0, 'quantity': 1, 'unit': 2, 'unit_price': 3, 'tax_rate': 4, 'amount': 5}
+
+@pytest.mark.parametrize('header', HEADERS)
+def test_word_layout_labels_map_every_column(header):
+    assert [classify_label(label) for label in header] == [
+        'description', 'quantity', 'unit', 'unit_price', 'tax_rate', 'amount']
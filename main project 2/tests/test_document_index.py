@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+
+from document_index import LineIndex, casefold_tr
+from document_segmenter import segment_document
+from pdf_extractor import PDFExtractor
+from pdf_fixtures import write_invoice_pdf, HEADER_LINES, TOTALS_LINES
+
+logging.disable(logging.CRITICAL)
+
+# Page texts of invoices laid out in the ways the segmenter handles
+DOCUMENTS = {
+    'seller-first': [
+        '\n'.join(HEADER_LINES + ['Mal Hizmet Miktar Birim Fiyat Tutar', 'Hizmet kalemi 1 2 ADET 1.250,50 2.501,00']),
+        '\n'.join(['Hizmet kalemi 2 2 ADET 1.250,50 2.501,00'] + TOTALS_LINES)
+    ],
+    'buyer-first': [
+        '\n'.join(['ALICI:', 'DENEME A.Ş.', 'SATICI:', 'ÖRNEK BİLİŞİM LTD. ŞTİ.', 'Açıklama Miktar Tutar',
+                   'Yazılım lisansı 1 100,00', 'Ödenecek Tutar: 120,00'])
+    ],
+    'e-arsiv': [
+        '\n'.join(['ÖRNEK BİLİŞİM LTD. ŞTİ.', 'İSTİKLAL CAD. No:5 BEYOĞLU / İSTANBUL', 'SAYIN', 'AHMET YILMAZ']),
+        '',
+        '\n'.join(['AÇIKLAMA MİKTAR BİRİM FİYAT', 'Danışmanlık 1 500,00', 'TOPLAM 500,00', 'KDV TUTARI 100,00'])
+    ],
+    'no-anchors': ['Merhaba\nBu bir fatura değildir']
+}
+
+def page_results(texts):
+    return [{'page_number': number, 'text': text} for number, text in enumerate(texts, 1)]
+
+@pytest.mark.parametrize('name', DOCUMENTS)
+def test_shared_line_index_gives_the_same_sections(name):
+    index = LineIndex.from_pages(page_results(DOCUMENTS[name]))
+
+    shared = segment_document(index.text, index)
+    assert shared.as_dict() == segment_document(index.text).as_dict()
+    assert shared.as_dict() == segment_document(index.text, LineIndex(index.text)).as_dict()
+
+@pytest.mark.parametrize('name', DOCUMENTS)
+def test_line_index_matches_splitting_the_text(name):
+    index = LineIndex.from_pages(page_results(DOCUMENTS[name]))
+    text = index.text
+
+    assert index.lines == text.split('\n')
+    assert index.folded == [casefold_tr(line) for line in text.split('\n')]
+    assert [text[start:].split('\n')[0] for start in index.starts] == index.lines
+    assert len(index.pages) == len(index.lines)
+    for span in segment_document(text, index).as_dict().values():
+        if span is not None:
+            assert index.slice_lines(*span) == text[span[0]:span[1]].split('\n')
+
+def test_extractor_sections_match_segmenting_its_text(tmp_path):
+    extractor = PDFExtractor(write_invoice_pdf(str(tmp_path / 'invoice.pdf'), 3))
+    extractor.extract_invoice_data()
+
+    assert extractor.sections.as_dict() == segment_document(extractor.text_content).as_dict()
+    assert extractor.sections.seller is not None and extractor.sections.items is not None
@@ -0,0 +1,34 @@
+import logging
+
+from pdf_extractor import PDFExtractor
+from pdf_fixtures import write_invoice_pdf, write_text_invoice_pdf
+
+logging.disable(logging.CRITICAL)
+
+def test_invoice_without_item_rows_has_no_items(tmp_path):
+    pdf_path = write_text_invoice_pdf(str(tmp_path / 'no-items.pdf'), [
+        'Aciklama: BILGISAYAR DONANIM HIZMETLERI ve YAZILIM LISANS HIZMETLERI bedeli'])
+    extractor = PDFExtractor(pdf_path)
+    invoice_data = extractor.extract_invoice_data()
+
+    assert invoice_data['line_items'] == []
+    assert extractor._item_strategy is None
+    assert float(invoice_data['total_amount']) == 1200.0
+
+def test_items_are_parsed_in_column_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(PDFExtractor, 'ITEM_BATCH_ROWS', 5)
+    extractor = PDFExtractor(write_invoice_pdf(str(tmp_path / 'invoice.pdf'), 4))
+    extractor.extract_pages()
+    batches = list(extractor._iter_item_batches())
+
+    assert [len(items) for items, _ in batches] == [5, 5, 2]
+    assert [amount for _, amounts in batches for amount in amounts] == [2501.0] * 12
+
+def test_missing_amounts_come_from_quantity_and_unit_price():
+    items = [{'amount': '2.501,00'}, {'quantity': '3', 'unit_price': '1.250,50'},
+             {'unit_price': '10'}, {'quantity': '2', 'unit_price': ''}]
+
+    assert PDFExtractor._item_amounts(items) == [2501.0, 3751.5, 10.0, 0.0]
+    assert items[1]['amount'] == '3751.5'
+    assert items[2]['amount'] == '10.0'
+    assert 'amount' not in items[3]
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pdf_extractor import PDFExtractor
+from pdf_fixtures import write_invoice_pdf
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Peak RSS a low-memory extraction may add to the interpreter with the extractor imported,
+# whatever the page count (the returned line items included)
+RSS_HEADROOM_MB = 16
+
+# Page counts of the small and the large document
+SMALL_PAGES = 10
+LARGE_PAGES = 3000
+
+# Extracts one PDF in low-memory mode in a fresh interpreter and prints the item count, the peak
+# RSS after the imports and the peak RSS after the extraction
+MEASURE_SCRIPT = """
+import logging, resource, sys
+logging.disable(logging.CRITICAL)
+from pdf_extractor import PDFExtractor
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+invoice_data = PDFExtractor(sys.argv[1], low_memory=True).extract_invoice_data()
+print(len(invoice_data['line_items']), baseline, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)
+"""
+
+def _measure(pdf_path):
+    """(line item count, baseline RSS, peak RSS), in MB, of a low-memory extraction of pdf_path"""
+    result = subprocess.run([sys.executable, '-c', MEASURE_SCRIPT, pdf_path], cwd=APP_DIR,
+                            capture_output=True, text=True, check=True)
+    return tuple(int(value) for value in result.stdout.split())
+
+def test_low_memory_peak_rss_does_not_grow_with_page_count(tmp_path):
+    small_items, small_baseline, small_rss = _measure(write_invoice_pdf(str(tmp_path / 'small.pdf'), SMALL_PAGES))
+    large_items, large_baseline, large_rss = _measure(write_invoice_pdf(str(tmp_path / 'large.pdf'), LARGE_PAGES))
+    ceiling = min(small_baseline, large_baseline) + RSS_HEADROOM_MB
+
+    assert small_items == SMALL_PAGES * 3
+    assert large_items == LARGE_PAGES * 3
+    assert small_rss < ceiling, f"{small_rss} MB for {SMALL_PAGES} pages (ceiling {ceiling} MB)"
+    assert large_rss < ceiling, f"{large_rss} MB for {LARGE_PAGES} pages (ceiling {ceiling} MB)"
+
+@pytest.mark.parametrize('page_count, expected', [(2, False), (PDFExtractor.LOW_MEMORY_AUTO_MIN_PAGES + 1, True)])
+def test_auto_low_memory_only_for_long_documents(tmp_path, page_count, expected):
+    extractor = PDFExtractor(write_invoice_pdf(str(tmp_path / 'invoice.pdf'), page_count), low_memory='auto')
+    invoice_data = extractor.extract_invoice_data()
+
+    assert extractor.low_memory is expected
+    assert len(invoice_data['line_items']) == page_count * 3
@@ -0,0 +1,21 @@
+import number_parser
+from number_parser import clean_number, parse_number, parse_numbers
+
+def test_turkish_amounts():
+    assert clean_number('1.234.567,89 TL') == '1234567.89'
+    assert clean_number('15.000') == '15000.0'
+    assert clean_number('12.5') == '12.5'
+    assert clean_number('₺2,5') == '2.5'
+    assert clean_number('abc') == '0'
+    assert parse_number('') == parse_number(None) == 0.0
+
+def test_column_matches_the_scalar_parser():
+    column = ['1.250,50', '2', '', None, '15.000', '1.250,50', 'ADET', '3 TL', '2']
+    assert parse_numbers(column) == [parse_number(value) for value in column]
+
+def test_column_parses_each_distinct_value_once(monkeypatch):
+    parsed = []
+    monkeypatch.setattr(number_parser, 'parse_number', lambda value: parsed.append(value) or 1.0)
+
+    assert parse_numbers(['2', '1.250,50', '2', '2', '1.250,50']) == [1.0] * 5
+    assert parsed == ['2', '1.250,50']
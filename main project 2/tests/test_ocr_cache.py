@@ -0,0 +1,47 @@
+import logging
+import sqlite3
+
+import pytest
+
+import ocr_engine
+from extraction_cache import ExtractionCache
+
+logging.disable(logging.CRITICAL)
+
+class LockedCache:
+    """Cache whose database is held by another process"""
+
+    def __init__(self, fail_get=True, fail_put=True):
+        self.fail_get = fail_get
+        self.fail_put = fail_put
+
+    def get(self, key):
+        if self.fail_get:
+            raise sqlite3.OperationalError('database is locked')
+        return None
+
+    def put(self, key, value):
+        if self.fail_put:
+            raise sqlite3.OperationalError('database is locked')
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    paths = []
+    for number in range(3):
+        path = tmp_path / f'page{number}.pgm'
+        path.write_bytes(b'P5 1 1 255\n' + bytes([number]))
+        paths.append(str(path))
+    monkeypatch.setattr(ocr_engine, '_run_tesseract_batch',
+                        lambda image_paths, *args: [f'text of {path}' for path in image_paths])
+    return paths
+
+@pytest.mark.parametrize('cache', [LockedCache(), LockedCache(fail_get=False), LockedCache(fail_put=False)])
+def test_cache_errors_keep_recognized_text(tmp_path, images, cache):
+    texts = ocr_engine._run_tesseract(images, str(tmp_path), 'tur', 300, '', cache)
+    assert texts == [f'text of {path}' for path in images]
+
+def test_recognized_text_is_reused_from_cache(tmp_path, images, monkeypatch):
+    cache = ExtractionCache(str(tmp_path / 'cache'), filename=ocr_engine.OCR_CACHE_FILENAME)
+    first = ocr_engine._run_tesseract(images, str(tmp_path), 'tur', 300, '', cache)
+    monkeypatch.setattr(ocr_engine, '_run_tesseract_batch', lambda *args: pytest.fail('tesseract re-run'))
+    assert ocr_engine._run_tesseract(images, str(tmp_path), 'tur', 300, '', cache) == first
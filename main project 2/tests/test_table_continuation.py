@@ -0,0 +1,31 @@
+import logging
+
+import pytest
+
+from pdf_extractor import PDFExtractor
+from pdf_fixtures import write_invoice_pdf, write_closed_table_pdf
+
+logging.disable(logging.CRITICAL)
+
+# Extraction modes that detect continued tables on their own code path
+MODES = [{}, {'parallel': True, 'max_workers': 2}, {'low_memory': True}]
+
+@pytest.mark.parametrize('options', MODES)
+def test_item_table_continues_over_pages_without_header(tmp_path, options):
+    pdf_path = write_invoice_pdf(str(tmp_path / 'continued.pdf'), 4, repeat_header=False)
+    invoice_data = PDFExtractor(pdf_path, **options).extract_invoice_data()
+
+    assert [item['description'] for item in invoice_data['line_items']] == [
+        f'Hizmet kalemi {number}' for number in range(1, 13)]
+
+@pytest.mark.parametrize('options', MODES)
+def test_table_after_a_closed_item_table_is_not_stitched(tmp_path, options):
+    pdf_path = write_closed_table_pdf(str(tmp_path / 'closed.pdf'))
+    extractor = PDFExtractor(pdf_path, **options)
+    invoice_data = extractor.extract_invoice_data()
+
+    assert [item['description'] for item in invoice_data['line_items']] == [
+        'Hizmet kalemi 1', 'Hizmet kalemi 2', 'Hizmet kalemi 3']
+    if not options.get('low_memory'):
+        assert extractor.pages[0]['table_open'] is False
+        assert extractor.pages[1]['tables'] == []
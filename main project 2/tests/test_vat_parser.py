@@ -0,0 +1,46 @@
+import logging
+
+import pytest
+
+import vat_parser
+from pdf_extractor import PDFExtractor
+from pdf_fixtures import write_invoice_pdf
+from vat_parser import parse_vat_rate, vat_cache_stats, DEFAULT_VAT_RATE
+
+logging.disable(logging.CRITICAL)
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    vat_parser._parse_vat_text.cache_clear()
+
+@pytest.mark.parametrize('vat_str, expected', [
+    ('%18', '18.0'), ('KDV %20', '20.0'), ('18', '18.0'), ('VAT 8%', '8.0'), ('%8,5', '8.5'),
+    ('Value Added Tax: 20%', '20.0'), (' %20 ', '20.0'), ('KDV Oranı: 10', '10.0'),
+    ('510%', DEFAULT_VAT_RATE), ('-18%', DEFAULT_VAT_RATE), ('%0', DEFAULT_VAT_RATE),
+    ('abc', DEFAULT_VAT_RATE), ('', DEFAULT_VAT_RATE), (None, DEFAULT_VAT_RATE)
+])
+def test_vat_rates(vat_str, expected):
+    assert parse_vat_rate(vat_str) == expected
+
+def test_default_rate_is_per_call():
+    assert parse_vat_rate('abc', '20') == '20'
+    assert parse_vat_rate('abc') == DEFAULT_VAT_RATE
+    assert parse_vat_rate('%10', '20') == '10.0'
+
+def test_cache_stats_count_distinct_strings():
+    for vat_str in ['%20', '%20', ' %20 ', 'KDV %10', '', None]:
+        parse_vat_rate(vat_str)
+
+    stats = vat_cache_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 2, 2)
+    assert stats['hit_rate'] == 0.5
+    assert stats['max_entries'] == vat_parser.VAT_CACHE_SIZE
+
+def test_item_rates_are_parsed_once_per_invoice(tmp_path):
+    invoice_data = PDFExtractor(write_invoice_pdf(str(tmp_path / 'invoice.pdf'), 4)).extract_invoice_data()
+
+    assert len(invoice_data['line_items']) == 12
+    assert {item['tax_rate'] for item in invoice_data['line_items']} == {'%20'}
+    stats = vat_cache_stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 11
@@ -0,0 +1,62 @@
+import logging
+
+import pytest
+
+from extraction_cache import ExtractionCache
+from pdf_extractor import PDFExtractor
+from pdf_fixtures import write_invoice_pdf
+from vendor_templates import VendorTemplateRegistry, TEMPLATE_CACHE_FILENAME
+
+logging.disable(logging.CRITICAL)
+
+@pytest.fixture
+def registry(tmp_path):
+    return VendorTemplateRegistry(ExtractionCache(str(tmp_path / 'cache'), filename=TEMPLATE_CACHE_FILENAME))
+
+def stored_templates(registry):
+    return registry.store.stats()['entries']
+
+def extract(pdf_path, registry, store=True):
+    extractor = PDFExtractor(pdf_path, templates=registry)
+    return extractor, extractor.extract_invoice_data(store=store)
+
+def test_first_invoice_learns_a_template(tmp_path, registry):
+    extractor, invoice_data = extract(write_invoice_pdf(str(tmp_path / 'first.pdf'), 1), registry)
+
+    assert extractor._template is None
+    template = registry.lookup(*extractor._template_key())
+    assert template['vendor']['vendor_tax_id'] == '1234567890'
+    assert template['vendor']['vendor_name'] == invoice_data['vendor_name']
+    assert template['item_strategy'] == 'table'
+    assert {'invoice_number', 'total_amount'} <= set(template['patterns'])
+
+def test_same_vendor_and_layout_takes_the_template_path(tmp_path, registry):
+    _, first = extract(write_invoice_pdf(str(tmp_path / 'first.pdf'), 1), registry)
+    extractor, second = extract(write_invoice_pdf(str(tmp_path / 'second.pdf'), 2), registry)
+
+    assert extractor._template is not None
+    assert stored_templates(registry) == 1
+    assert second['vendor_name'] == first['vendor_name']
+    assert second['invoice_number'] == first['invoice_number']
+    assert len(second['line_items']) == 6
+
+def test_failed_template_checks_run_the_cascade_and_relearn(tmp_path, registry):
+    pdf_path = write_invoice_pdf(str(tmp_path / 'first.pdf'), 1)
+    extractor, expected = extract(pdf_path, registry)
+    template_key = extractor._template_key()
+    template = registry.lookup(*template_key)
+    stale = dict(template, vendor=dict(template['vendor'], vendor_name='BASKA FIRMA LTD. STI.'))
+    registry.learn(*template_key, stale)
+
+    extractor, invoice_data = extract(pdf_path, registry)
+
+    assert extractor._template is None
+    assert invoice_data == expected
+    assert registry.lookup(*template_key) == template
+
+def test_store_false_writes_no_template(tmp_path, registry):
+    extractor, _ = extract(write_invoice_pdf(str(tmp_path / 'first.pdf'), 1), registry, store=False)
+
+    assert stored_templates(registry) == 0
+    extractor.store_results()
+    assert stored_templates(registry) == 1
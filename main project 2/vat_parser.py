@@ -0,0 +1,125 @@
+import re
+import logging
+from functools import lru_cache
+
+from number_parser import clean_number
+
+logger = logging.getLogger(__name__)
+
+# Rate used when a VAT string is missing or cannot be parsed
+DEFAULT_VAT_RATE = '18'
+
+# Distinct (VAT string, default) pairs remembered; invoices use a handful ("%18", "KDV %20", "18")
+VAT_CACHE_SIZE = 256
+
+# VAT rate patterns, tried in order; negative values are excluded
+VAT_RATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'(?:KDV|VAT|Tax)?\s*[:%=]?\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)\s*%',  # KDV: 18%, VAT: 18%, Tax: 18%
+        r'(?:KDV|VAT|Tax)?\s*%\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)',  # KDV %18, VAT %18, %18
+        r'^(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)\s*%$',  # 18%, 8.5% (start to end, no negatives)
+        r'^%\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)$',  # %18, %8.5 (start to end, no negatives)
+        r'(?:KDV|VAT|Tax)?\s*(?:rate|oran|oranı)?\s*[:%=]?\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)',  # KDV rate: 18, VAT rate: 18
+        r'^(?:KDV|VAT|Tax)?\s*(?<!-)\b(\d{1,3}(?:[.,]\d{1,2})?)$'  # KDV 18, VAT 18, just 18 (start to end, no negatives)
+    )
+]
+
+def parse_vat_rate(vat_str, default_rate=DEFAULT_VAT_RATE):
+    """
+    Parse VAT rate from various formats and prevent absurd values
+
+    Handles formats like:
+    - "18%", "%18", "KDV %18", "VAT 18%", "Value Added Tax: 20%", etc.
+    - Prevents absurd values like 510% from incorrect parsing
+
+    Results are memoized per distinct string (see vat_cache_stats), so a rate repeated on every
+    item is parsed once per process.
+
+    Args:
+        vat_str: The VAT string to parse
+        default_rate: Default VAT rate to use if parsing fails (default: '18')
+
+    Returns:
+        A string representation of the VAT rate as a number (e.g., '18', '20', '8.5')
+    """
+    if not vat_str:
+        return default_rate
+    return _parse_vat_text(str(vat_str).strip(), default_rate)
+
+def vat_cache_stats():
+    """Return hit/miss counters and occupancy of the VAT rate memo"""
+    info = _parse_vat_text.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+        'entries': info.currsize,
+        'max_entries': info.maxsize
+    }
+
+@lru_cache(maxsize=VAT_CACHE_SIZE)
+def _parse_vat_text(vat_str, default_rate):
+    """parse_vat_rate for a stripped VAT string; warnings are logged the first time a string is seen"""
+    logger.debug(f"Parsing VAT from: '{vat_str}'")
+
+    # Quick check for negative values
+    if '-' in vat_str:
+        logger.warning(f"Negative VAT rate detected in '{vat_str}', using default")
+        return default_rate
+
+    # First, try to find a percentage pattern
+    for pattern in VAT_RATE_PATTERNS:
+        match = pattern.search(vat_str)
+        if match:
+            vat_value = match.group(1).replace(',', '.')
+            try:
+                vat_float = float(vat_value)
+                # Sanity check - VAT rates are typically between 1-30%
+                if 1 <= vat_float <= 30:
+                    logger.debug(f"Successfully parsed VAT rate '{vat_str}' as {vat_float}%")
+                    return str(vat_float)
+                elif vat_float == 0:
+                    logger.warning(f"Zero VAT rate detected, using default")
+                    return default_rate
+                elif vat_float < 1:
+                    # Below 1% is no VAT rate: try the next pattern
+                    continue
+                elif vat_float >= 100:
+                    # For very high values like 510%, default to standard rate
+                    logger.warning(f"Parsed VAT rate '{vat_str}' as {vat_float}%, which is absurd. Using default.")
+                    return default_rate
+                else:
+                    logger.warning(f"Parsed VAT rate '{vat_str}' as {vat_float}%, which seems unreasonable. Using default.")
+                    return default_rate
+            except ValueError:
+                logger.warning(f"Failed to convert matched VAT value '{vat_value}' to float")
+
+    # If we get here, try a more generic approach with number cleaning
+    vat_float = float(clean_number(vat_str.replace('%', '')))
+
+    # Handle common parsing errors
+    if vat_float > 100:
+        # Could be a case where "18%" was parsed as 1800 (percentage sign treated as 00)
+        if 1000 <= vat_float <= 3000:
+            corrected = vat_float / 100
+            logger.info(f"Correcting likely VAT parsing error: {vat_float}% -> {corrected}%")
+            return str(corrected)
+        # Could be a case where "18" was parsed as 180 (extra 0 added)
+        elif vat_float < 1000:
+            corrected = vat_float / 10
+            logger.info(f"Correcting likely VAT parsing error: {vat_float}% -> {corrected}%")
+            return str(corrected)
+        logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is out of reasonable range, using default")
+        return default_rate
+    elif vat_float <= 0:
+        logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is non-positive, using default")
+        return default_rate
+    elif vat_float > 30:
+        logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is unusually high, using default")
+        return default_rate
+    elif vat_float >= 1:
+        return str(vat_float)
+    # Edge case: 0 < vat_float < 1
+    logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is too low, using default")
+    return default_rate
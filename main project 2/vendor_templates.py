@@ -0,0 +1,104 @@
+import hashlib
+import logging
+import re
+
+from document_segmenter import SELLER_ANCHOR, BUYER_ANCHOR, ITEM_HEADER_ANCHOR
+from extraction_cache import ExtractionCache
+from document_index import casefold_tr
+
+logger = logging.getLogger(__name__)
+
+# File name of the template store when it shares a folder with the extraction cache
+TEMPLATE_CACHE_FILENAME = 'vendor_templates.sqlite3'
+
+# Version of the stored template layout; bump it when the template contents change meaning
+TEMPLATE_VERSION = '2'
+
+# Seller tax id (VKN, or TCKN for sole proprietors) that keys the registry together with the layout
+VENDOR_TAX_ID_PATTERN = re.compile(r'(?:VKN|TCKN|VERGİ\s+NO)\s*:?\s*(\d{10,11})', re.IGNORECASE)
+
+# Longest "Label:" prefix taken into the layout fingerprint; longer prefixes are content, not labels
+MAX_LABEL_LENGTH = 30
+
+# Largest relative difference between subtotal + tax and the total that still counts as consistent
+TOTALS_TOLERANCE = 0.01
+
+def vendor_tax_id(sections):
+    """Tax id in the seller block of a segmented document, or None when there is no seller block or id"""
+    if not sections.found('seller'):
+        return None
+    match = VENDOR_TAX_ID_PATTERN.search(sections.get('seller'))
+    return match.group(1) if match else None
+
+def _line_label(line):
+    """The static label of a "Label: value" line (e.g. "fatura no"), or None when the line has no label"""
+    label, colon, _ = line.partition(':')
+    label = ' '.join(label.split())
+    if not colon or not label or len(label) > MAX_LABEL_LENGTH or any(char.isdigit() for char in label):
+        return None
+    return casefold_tr(label)
+
+def layout_fingerprint(first_page_lines):
+    """Short hash of the layout of an invoice's first page
+
+    Built from what stays the same between invoices of one vendor's template and changes with the
+    template: the order of the party anchors and field labels above the item table, and the item
+    table's column titles. Values (numbers, dates, the buyer's name) do not enter the hash, and only
+    text is used, so the fingerprint is the same with or without word boxes kept.
+    """
+    parts = []
+    for line in first_page_lines:
+        if ITEM_HEADER_ANCHOR.search(line):
+            parts.append('items:' + ' '.join(re.sub(r'[\d.,:]+', ' ', casefold_tr(line)).split()))
+            break
+        if SELLER_ANCHOR.match(line):
+            parts.append('seller')
+        elif BUYER_ANCHOR.match(line):
+            parts.append('buyer')
+        else:
+            label = _line_label(line)
+            if label:
+                parts.append(label)
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+def totals_consistent(invoice_data):
+    """True when subtotal + tax matches the total within TOTALS_TOLERANCE"""
+    try:
+        subtotal = float(invoice_data.get('subtotal') or 0)
+        tax_amount = float(invoice_data.get('tax_amount') or 0)
+        total_amount = float(invoice_data.get('total_amount') or 0)
+    except (ValueError, TypeError):
+        return False
+    if total_amount <= 0:
+        return False
+    return abs(subtotal + tax_amount - total_amount) <= total_amount * TOTALS_TOLERANCE
+
+class VendorTemplateRegistry:
+    """Learned extraction templates keyed by seller tax id and first-page layout fingerprint.
+
+    A template records what worked on an earlier invoice with the same seller and layout: the
+    seller fields, which pattern of each header/totals pattern bank matched and in which document
+    region, and which line item strategy (and item table header and column map) produced the items.
+    PDFExtractor takes that direct path for later invoices and falls back to the full cascade when
+    the template's checks fail. Templates are stored in an ExtractionCache database.
+    """
+
+    def __init__(self, store=None):
+        """Use the given ExtractionCache as the template store (default: TEMPLATE_CACHE_FILENAME in the default cache folder)"""
+        self.store = store if store is not None else ExtractionCache(filename=TEMPLATE_CACHE_FILENAME)
+
+    @staticmethod
+    def make_key(tax_id, fingerprint):
+        return f"template-v{TEMPLATE_VERSION}:{tax_id}:{fingerprint}"
+
+    def lookup(self, tax_id, fingerprint):
+        """Return the template learned for this seller and layout, or None"""
+        template = self.store.get(self.make_key(tax_id, fingerprint))
+        if template is not None:
+            logger.info(f"Vendor template found for {tax_id} ({fingerprint})")
+        return template
+
+    def learn(self, tax_id, fingerprint, template):
+        """Store (or replace) the template for this seller and layout"""
+        self.store.put(self.make_key(tax_id, fingerprint), template)
+        logger.info(f"Learned vendor template for {tax_id} ({fingerprint})")
@@ -1,7 +1,6 @@
 import xml.etree.ElementTree as ET
 import xml.dom.minidom
 from datetime import datetime
-import re
 import logging
 
 # Configure logging
@@ -210,165 +209,3 @@ class XMLConverter:
         
         logger.debug(f"Validated line item {line_number}: {validated_item}")
         return validated_item
-    def _parse_vat_rate(self, vat_str, default_rate='18'):
-        """
-        Parse VAT rate from various formats and prevent absurd values
-        
-        Handles formats like:
-        - "18%", "%18", "KDV %18", "VAT 18%", "Value Added Tax: 20%", etc.
-        - Prevents absurd values like 510% from incorrect parsing
-        
-        Args:
-            vat_str: The VAT string to parse
-            default_rate: Default VAT rate to use if parsing fails (default: '18')
-            
-        Returns:
-            A string representation of the VAT rate as a number (e.g., '18', '20', '8.5')
-        """
-        if not vat_str:
-            return default_rate
-        
-        # Convert to string if not already
-        vat_str = str(vat_str).strip()
-        logger.debug(f"Parsing VAT from: '{vat_str}'")
-        
-        # First, try to find a percentage pattern
-        percentage_patterns = [
-            # Common VAT patterns with percentages
-            r'(?:KDV|VAT|Tax)?\s*[:%=]?\s*(\d{1,2}(?:[.,]\d{1,2})?)\s*%',  # KDV: 18%, VAT: 18%, Tax: 18%
-            r'(?:KDV|VAT|Tax)?\s*%\s*(\d{1,2}(?:[.,]\d{1,2})?)',  # KDV %18, VAT %18, %18
-            r'(\d{1,2}(?:[.,]\d{1,2})?)\s*%',  # 18%, 8.5%
-            r'%\s*(\d{1,2}(?:[.,]\d{1,2})?)',  # %18, %8.5
-            r'(?:KDV|VAT|Tax)?\s*(?:rate|oran|oranı)?\s*[:%=]?\s*(\d{1,2}(?:[.,]\d{1,2})?)',  # KDV rate: 18, VAT rate: 18
-            r'(?:KDV|VAT|Tax)?\s*(\d{1,2}(?:[.,]\d{1,2})?)'  # KDV 18, VAT 18, just 18
-        ]
-        
-        for pattern in percentage_patterns:
-            match = re.search(pattern, vat_str, re.IGNORECASE)
-            if match:
-                vat_value = match.group(1).replace(',', '.')
-                try:
-                    vat_float = float(vat_value)
-                    # Sanity check - VAT rates are typically between 1-30%
-                    if 1 <= vat_float <= 30:
-                        logger.debug(f"Successfully parsed VAT rate '{vat_str}' as {vat_float}%")
-                        return str(vat_float)
-                    elif vat_float == 0:
-                        logger.warning(f"Zero VAT rate detected, using default")
-                        return default_rate
-                    elif vat_float < 0:
-                        logger.warning(f"Negative VAT rate detected, using default")
-                        return default_rate
-                    elif vat_float > 30:
-                        # For very high values like 510%, default to standard rate
-                        if vat_float >= 100:
-                            logger.warning(f"Parsed VAT rate '{vat_str}' as {vat_float}%, which is absurd. Using default.")
-                            return default_rate
-                        # Check if it's a common error case that can be corrected (only for values 31-99)
-                        elif 31 <= vat_float < 100:
-                            logger.warning(f"Parsed VAT rate '{vat_str}' as {vat_float}%, which seems too high. Using default.")
-                            return default_rate
-                        else:
-                            logger.warning(f"Parsed VAT rate '{vat_str}' as {vat_float}%, which seems unreasonable. Using default.")
-                            return default_rate
-                except ValueError:
-                    logger.warning(f"Failed to convert matched VAT value '{vat_value}' to float")
-        
-        # If we get here, try a more generic approach with number cleaning
-        cleaned_vat = self._clean_number(vat_str.replace('%', ''))
-        
-        try:
-            vat_float = float(cleaned_vat)
-            
-            # Handle common parsing errors
-            if vat_float > 100:
-                # Could be a case where "18%" was parsed as 1800 (percentage sign treated as 00)
-                if 1000 <= vat_float <= 3000:
-                    corrected = vat_float / 100
-                    logger.info(f"Correcting likely VAT parsing error: {vat_float}% -> {corrected}%")
-                    return str(corrected)
-                # Could be a case where "18" was parsed as 180 (extra 0 added)
-                elif 100 <= vat_float < 1000:
-                    corrected = vat_float / 10
-                    logger.info(f"Correcting likely VAT parsing error: {vat_float}% -> {corrected}%")
-                    return str(corrected)
-                # Could be a case where "18" was parsed as 1800 (two extra 0s added)
-                elif vat_float >= 1000:
-                    possible_correction = vat_float / 100
-                    if possible_correction <= 30:  # Common VAT range
-                        logger.info(f"Correcting likely VAT parsing error: {vat_float}% -> {possible_correction}%")
-                        return str(possible_correction)
-                    else:
-                        logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is out of reasonable range, using default")
-                        return default_rate
-                else:
-                    logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is out of reasonable range, using default")
-                    return default_rate
-            elif vat_float <= 0:
-                logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is non-positive, using default")
-                return default_rate
-            else:
-                # Final sanity check
-                if vat_float > 30:
-                    logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is unusually high, using default")
-                    return default_rate
-                elif 1 <= vat_float <= 30:
-                    return str(vat_float)
-                else:
-                    # Edge case: 0 < vat_float < 1
-                    logger.warning(f"VAT rate '{vat_str}' parsed as {vat_float}% is too low, using default")
-                    return default_rate
-        except ValueError:
-            logger.warning(f"Could not parse VAT rate '{vat_str}', using default")
-            return default_rate
-    
-    def _clean_number(self, number_str):
-        """Clean and standardize Turkish number format (same as PDFExtractor)"""
-        if not number_str:
-            return '0'
-        
-        # Convert to string if not already
-        number_str = str(number_str).strip()
-        
-        # Remove currency symbols
-        number_str = number_str.replace('₺', '').replace('TL', '').replace('$', '').replace('€', '').strip()
-        
-        # Handle Turkish number format: 15.000,00 (thousands separator = dot, decimal = comma)
-        if '.' in number_str and ',' in number_str:
-            # Pattern: 15.000,00 or 1.234.567,89
-            parts = number_str.split(',')
-            if len(parts) == 2 and len(parts[1]) <= 2:  # Valid decimal part
-                # Remove thousand separators (dots) from integer part
-                integer_part = parts[0].replace('.', '')
-                decimal_part = parts[1]
-                number_str = f"{integer_part}.{decimal_part}"
-            else:
-                # Just replace comma with dot
-                number_str = number_str.replace(',', '.')
-        elif ',' in number_str and '.' not in number_str:
-            # Pattern: 1234,56 (only decimal comma)
-            number_str = number_str.replace(',', '.')
-        elif '.' in number_str and ',' not in number_str:
-            # Check if it's likely a thousands separator or decimal point
-            dot_pos = number_str.rfind('.')
-            after_dot = number_str[dot_pos+1:]
-            if len(after_dot) == 3 and after_dot.isdigit():
-                # Likely thousands separator: 15.000 -> 15000
-                number_str = number_str.replace('.', '')
-            # else: assume decimal point
-        
-        # Remove any remaining non-numeric characters except dots
-        cleaned = re.sub(r'[^\d.]', '', number_str)
-        
-        # Handle multiple decimal points (keep only the last one)
-        if cleaned.count('.') > 1:
-            parts = cleaned.split('.')
-            cleaned = ''.join(parts[:-1]) + '.' + parts[-1]
-        
-        # Ensure we have a valid number
-        try:
-            float_val = float(cleaned)
-            return str(float_val)  # Normalize format with dot as decimal separator
-        except ValueError:
-            logger.warning(f"Could not parse number '{number_str}' -> '{cleaned}'")
-            return '0'